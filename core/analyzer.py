@@ -1,6 +1,6 @@
+import asyncio
 import socket
 import re
-import ssl
 import logging
 from utils.logger import app_logger as logger
 
@@ -10,14 +10,29 @@ from core.protocols.dns import DnsProtocol
 from core.protocols.smb import SmbProtocol
 from core.protocols.http import HttpProtocol
 from core.protocols.ssh import SshProtocol
+from core.probes import ProbeDatabase
+from core.signatures import SignatureMatcher
+from core.tls import TLS_PORTS, TlsInspector, format_tls_info
+
+# TLS 레코드 헤더(handshake, 3.x): 이 바이트로 시작하는 프로브는 ClientHello로 간주
+TLS_CLIENT_HELLO = b'\x16\x03'
 
 # logger = setup_logger(__name__)
 # logger = setup_logger(name="ConfigLoader", log_file="logs/analyzer.log", level=logging.DEBUG)
 
 
 class ServiceDetector:
-    def __init__(self):
+    def __init__(self, cache=None, probe_db=None, max_probes=4, handler_options=None):
         logger.debug("Initializing ServiceDetector")
+        # (ip, port, handler) -> 서비스 정보 캐시 (FingerprintCache, 옵션)
+        self.cache = cache
+        # 전담 핸들러가 없는 포트에서 사용할 프로브 DB와 포트당 최대 프로브 수
+        self.probe_db = probe_db or ProbeDatabase()
+        self.max_probes = max_probes
+        # 핸들러 클래스 이름 -> 생성자 추가 인자 (예: {'SshProtocol': {'deep': True}})
+        self.handler_options = handler_options or {}
+        # TLS 세션 재개 + 인증서 지문 캐시
+        self.tls = TlsInspector()
         # 정규식 패턴 (기존 유지)
         self.signatures = [
             # ('SSH', re.compile(r'SSH-([\d.]+)-([^\r\n]+)', re.IGNORECASE)),
@@ -27,12 +42,8 @@ class ServiceDetector:
             ('MySQL', re.compile(r'(\d\.\d\.\d+[\w\-.+]*)', re.IGNORECASE)), 
             ('POP3', re.compile(r'\+OK\s+(.*)', re.IGNORECASE)),
         ]
-
-        # Probes (기존 유지)
-        self.probes = {
-            # 80: b"GET / HTTP/1.0\r\n\r\n",
-            # 8080: b"GET / HTTP/1.0\r\n\r\n",
-        }
+        # 시그니처 전체를 한 번에 대조하도록 컴파일
+        self.signature_matcher = SignatureMatcher(self.signatures)
 
         # 프로토콜 핸들러 매핑
         self.protocol_map = {
@@ -46,87 +57,242 @@ class ServiceDetector:
             445: SmbProtocol,
         }
 
-    def get_banner(self, ip, port, timeout=2):
-        logger.debug(f"Starting banner detection for IP: {ip}, Port: {port}, Timeout: {timeout}")
+    def get_banner(self, ip, port, timeout=2, sock=None):
+        """
+        :param sock: 스캔 엔진이 이미 연결해 둔 소켓 (있으면 새로 연결하지 않고 재사용)
+        핑거프린트 캐시가 있으면 유효한 이전 결과를 돌려주고 프로토콜 교환을 생략합니다.
+        """
+        handler = self._handler_name(port)
+        cached = self._cached(ip, port, handler, sock)
+        if cached is not None:
+            return cached
+
+        try:
+            service_info = self._detect(ip, port, timeout, sock)
+        except Exception as e:
+            logger.error(f"Error during banner detection: {e}")
+            return f"Unknown ({str(e)})"
+
+        # 오류 없이 끝난 탐지 결과만 캐시
+        if self.cache is not None:
+            self.cache.put(ip, port, handler, service_info)
+        return service_info
+
+    async def get_banner_async(self, ip, port, timeout=2, sock=None, executor=None):
+        """
+        이벤트 루프에서 실행하는 get_banner
+        handle_async를 구현한 프로토콜 핸들러는 루프 안에서 직접 통신하고,
+        그 외(TLS, 프로브 DB, 블로킹 핸들러)는 executor 스레드 풀에서 get_banner를 실행합니다.
+        """
+        handler = None
+        if port in self.protocol_map and port not in TLS_PORTS:
+            handler = self._make_handler(port, timeout)
+        if handler is None or not handler.supports_async():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, self.get_banner, ip, port, timeout, sock)
+
+        handler_name = self._handler_name(port)
+        cached = self._cached(ip, port, handler_name, sock)
+        if cached is not None:
+            return cached
+
+        logger.debug(f"Starting async banner detection for IP: {ip}, Port: {port}, Timeout: {timeout}")
         try:
-            # 1. SSL/TLS 확인 (HTTPS)
-            if port in [443, 8443]:
-                logger.debug("Checking for SSL/TLS on port 443 or 8443")
-                cert_info = self._get_ssl_info(ip, port, timeout)
-                if cert_info:
-                    logger.debug(f"SSL/TLS info detected: {cert_info}")
-                    return cert_info
-
-            # 2. 소켓 생성
+            if sock is not None:
+                logger.debug(f"Reusing scan connection to {ip}:{port}")
+                reader, writer = await asyncio.open_connection(sock=sock)
+            else:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+            try:
+                raw_data = await handler.handle_async(reader, writer)
+            finally:
+                writer.close()
+            service_info = handler.parse(raw_data)
+            logger.info(f"Protocol {type(handler).__name__} detected: {service_info}")
+        except Exception as e:
+            logger.error(f"Error during banner detection: {e}")
+            return f"Unknown ({str(e) or type(e).__name__})"
+
+        if self.cache is not None:
+            self.cache.put(ip, port, handler_name, service_info)
+        return service_info
+
+    def _cached(self, ip, port, handler, sock=None):
+        """유효한 캐시 결과 (있으면 넘겨받은 소켓은 쓰지 않고 닫음)"""
+        if self.cache is None:
+            return None
+        cached = self.cache.get(ip, port, handler)
+        if cached is not None:
+            logger.debug(f"Fingerprint cache hit for {ip}:{port} ({handler})")
+            if sock is not None:
+                sock.close()
+        return cached
+
+    def _make_handler(self, port, timeout):
+        handler_class = self.protocol_map[port]
+        return handler_class(port, timeout, **self.handler_options.get(handler_class.__name__, {}))
+
+    def _handler_name(self, port):
+        """
+        캐시 키에 쓰는 탐지 방식 이름
+        핸들러 옵션도 이름에 붙여(예: SshProtocol+deep, HttpProtocol+paths=/,/admin)
+        옵션이 다른 스캔이 서로의 결과를 재사용하지 않게 합니다.
+        """
+        if port in TLS_PORTS:
+            return "TLS"
+        if port not in self.protocol_map:
+            return "Generic"
+        name = self.protocol_map[port].__name__
+        options = self.handler_options.get(name, {})
+        for key in sorted(options):
+            value = options[key]
+            if value is True:
+                name += f"+{key}"
+            elif isinstance(value, (list, tuple)):
+                name += f"+{key}=" + ','.join(str(item) for item in value)
+            elif value:
+                name += f"+{key}={value}"
+        return name
+
+    def _detect(self, ip, port, timeout, sock=None):
+        """실제 프로토콜 교환으로 서비스 정보를 수집 (실패 시 예외 발생)"""
+        logger.debug(f"Starting banner detection for IP: {ip}, Port: {port}, Timeout: {timeout}")
+        # 1. SSL/TLS 확인 (HTTPS)
+        if port in TLS_PORTS:
+            logger.debug(f"Checking for SSL/TLS on port {port}")
+            cert_info = self._get_ssl_info(ip, port, timeout, sock)
+            # 넘겨받은 소켓은 TLS 시도에 사용되었으므로 이후에는 새로 연결
+            sock = None
+            if cert_info:
+                logger.debug(f"SSL/TLS info detected: {cert_info}")
+                return cert_info
+
+        # 2. 소켓 생성 (스캔 단계의 연결이 있으면 재사용)
+        if sock is not None:
+            logger.debug(f"Reusing scan connection to {ip}:{port}")
+            s = sock
+        else:
             logger.debug("Creating socket connection")
             s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            if port == 445:
-                s.settimeout(timeout + 2.0)
-            else:
-                s.settimeout(timeout)
-            
+        if port == 445:
+            s.settimeout(timeout + 2.0)
+        else:
+            s.settimeout(timeout)
+
+        if sock is None:
             logger.debug(f"Connecting to {ip}:{port}")
             s.connect((ip, port))
+        
+        # =========================================================
+        # [CASE A] 전담 프로토콜 핸들러가 있는 경우 (예: Telnet)
+        # =========================================================
+        if port in self.protocol_map:
+            logger.debug(f"Using protocol handler for port {port}")
+            handler_class = self.protocol_map[port]
+            handler = self._make_handler(port, timeout)
             
-            # =========================================================
-            # [CASE A] 전담 프로토콜 핸들러가 있는 경우 (예: Telnet)
-            # =========================================================
-            if port in self.protocol_map:
-                logger.debug(f"Using protocol handler for port {port}")
-                handler_class = self.protocol_map[port]
-                handler = handler_class(port, timeout)
-                
-                # 위임: 통신 수행
-                logger.debug("Delegating communication to protocol handler")
-                raw_data = handler.handle(s)
-                s.close()
-                
-                # 위임: 데이터 해석
-                logger.debug("Parsing data using protocol handler")
-                parsed_data = handler.parse(raw_data)
-                logger.info(f"Protocol {handler_class.__name__} detected: {parsed_data}")
-                return parsed_data
+            # 위임: 통신 수행
+            logger.debug("Delegating communication to protocol handler")
+            raw_data = handler.handle(s)
+            s.close()
             
-            # =========================================================
-            # [CASE B] 일반적인 포트 (FTP, SSH, HTTP 등)
-            # =========================================================
-            else:
-                logger.debug(f"No specific protocol handler for port {port}, using generic probe")
-                # 1. Active Probe 전송 (HTTP, SMB 등 말을 먼저 걸어야 하는 경우)
-                if port in self.probes:
-                    logger.debug(f"Sending probe for port {port}")
-                    s.send(self.probes[port])
-
-                # 2. 데이터 수신
-                logger.debug("Receiving data from socket")
-                banner_bytes = s.recv(4096)
+            # 위임: 데이터 해석
+            logger.debug("Parsing data using protocol handler")
+            parsed_data = handler.parse(raw_data)
+            logger.info(f"Protocol {handler_class.__name__} detected: {parsed_data}")
+            return parsed_data
+        
+        # =========================================================
+        # [CASE B] 일반적인 포트 (FTP, SSH, HTTP 등)
+        # =========================================================
+        else:
+            logger.debug(f"No specific protocol handler for port {port}, using probe database")
+            analyzed_data = self._probe_service(ip, port, s, timeout)
+            logger.info(f"Generic protocol detected: {analyzed_data}")
+            return analyzed_data
+
+    def _probe_service(self, ip, port, s, timeout):
+        """
+        프로브 DB 순서대로 프로브를 보내고 응답이 매칭 규칙에 걸리면 바로 종료
+        - NULL 프로브에 응답이 없으면 같은 연결에 다음 프로브를 보냄 (연결 1회로 2개 프로브)
+        - 데이터를 보낸 뒤에는 서버 상태가 바뀌므로 다음 프로브는 새 연결 사용
+        - 서버가 먼저 보낸 배너가 있거나 max_probes개를 시도해도 매칭되지 않으면 처음 받은 응답을 기존 시그니처로 분석
+        """
+        responses = []
+        matched = None
+        for probe in self.probe_db.probes_for(port)[:self.max_probes]:
+            if s is None:
+                try:
+                    s = socket.create_connection((ip, port), timeout=timeout)
+                except OSError as e:
+                    logger.debug(f"Reconnect for probe {probe.name} failed: {e}")
+                    break
+
+            # TLS ClientHello 프로브는 보내지 않고, 열린 연결에서 바로 실제 핸드셰이크 (인증서까지 연결 1회로)
+            if probe.payload.startswith(TLS_CLIENT_HELLO):
+                logger.debug(f"Probe {probe.name} is a TLS ClientHello, handshaking on the open connection")
+                ssl_info = self._get_ssl_info(ip, port, timeout, s)
+                s = None
+                if ssl_info:
+                    return ssl_info
+                continue
+
+            logger.debug(f"Sending probe {probe.name} to {ip}:{port}")
+            if probe.payload:
+                s.sendall(probe.payload)
+            data = self._recv_probe(s, min(timeout, probe.wait) if probe.wait else timeout)
+            if probe.payload or data:
                 s.close()
+                s = None
 
-                # 3. 기존 분석 로직 재사용 (_analyze_generic 대신 기존 메서드 활용)
-                logger.debug("Cleaning and analyzing received data")
-                banner_str = self._clean_binary(banner_bytes)
-                analyzed_data = self._analyze(banner_str, port)
-                logger.info(f"Generic protocol detected: {analyzed_data}")
-                return analyzed_data
+            if data:
+                responses.append(data)
+                matched = self.probe_db.match(data)
+                if matched:
+                    logger.debug(f"Probe {probe.name} matched: {matched}")
+                    break
+                # 서버가 먼저 보낸 배너가 규칙에 없으면 다른 프로브도 같은 배너를 받으므로 중단
+                if not probe.payload:
+                    break
+        if s is not None:
+            s.close()
 
-        except Exception as e:
-            logger.error(f"Error during banner detection: {e}")
-            return f"Unknown ({str(e)})"
+        # 다른 프로브의 응답(TLS alert 등)으로 TLS임을 알게 된 경우: 그 연결은 이미 닫았으므로 새 연결로 핸드셰이크
+        if matched and matched.startswith("TLS"):
+            return self._get_ssl_info(ip, port, timeout) or matched
+        if matched:
+            return matched
+        return self._analyze(responses[0] if responses else b"", port)
+
+    def _recv_probe(self, s, wait):
+        """wait초 동안 응답을 기다림 (응답이 없거나 연결이 끊기면 b'')"""
+        s.settimeout(wait)
+        try:
+            return s.recv(4096)
+        except socket.timeout:
+            return b""
+        except OSError as e:
+            logger.debug(f"Probe receive failed: {e}")
+            return b""
 
     # ---------------------------------------------------------
     # 기존 헬퍼 메서드들 (이전 코드 복구)
     # ---------------------------------------------------------
-    def _get_ssl_info(self, ip, port, timeout):
+    def _get_ssl_info(self, ip, port, timeout, sock=None):
+        """
+        TLS 핸드셰이크 한 번으로 버전/암호와 인증서(subject, SAN, issuer, 만료일, 지문)를 수집
+        (스캔 단계의 연결이 있으면 그 위에서 핸드셰이크)
+        """
         logger.debug(f"Attempting to retrieve SSL/TLS info for {ip}:{port}")
         try:
-            context = ssl.create_default_context()
-            context.check_hostname = False
-            context.verify_mode = ssl.CERT_NONE
-            with socket.create_connection((ip, port), timeout=timeout) as sock:
-                with context.wrap_socket(sock, server_hostname=ip) as ssock:
-                    ssl_info = f"HTTPS ({ssock.version()}, {ssock.cipher()[0]})"
-                    logger.debug(f"SSL/TLS info: {ssl_info}")
-                    return ssl_info
+            if sock is not None:
+                sock.settimeout(timeout)
+            else:
+                sock = socket.create_connection((ip, port), timeout=timeout)
+            info = self.tls.inspect(sock, ip, port)
+            ssl_info = format_tls_info(info, "HTTPS" if port in [443, 8443] else "TLS")
+            logger.debug(f"SSL/TLS info: {ssl_info} (resumed: {info['resumed']})")
+            return ssl_info
         except Exception as e:
             logger.error(f"Failed to retrieve SSL/TLS info: {e}")
             return None
@@ -142,19 +308,22 @@ class ServiceDetector:
                 return b' '.join(clean).decode('utf-8', errors='ignore')
             return str(data[:20])
 
-    def _analyze(self, banner, port):
+    def _analyze(self, data, port):
+        """
+        받은 응답(bytes)을 그대로 시그니처와 대조하고,
+        표시용 문자열 정리(_clean_binary)는 시그니처에 걸리지 않은 경우에만 수행
+        """
         logger.debug(f"Analyzing banner for port {port}")
-        if not banner:
+        if not data:
             logger.info("No banner received, port is open but no data")
             return "Open (Empty Banner)"
-        banner = banner.strip()
-        for service, regex in self.signatures:
-            match = regex.search(banner)
-            if match:
-                logger.debug(f"Service match found: {service}")
-                if match.groups():
-                    return f"{service} ({match.group(1).strip('() 'r'n')})"
-                return service
+        hit = self.signature_matcher.first(data.strip())
+        if hit:
+            logger.debug(f"Service match found: {hit.service}")
+            if hit.match.groups():
+                return f"{hit.service} ({hit.match.group(1).decode('utf-8', errors='ignore').strip('() 'r'n')})"
+            return hit.service
+        banner = self._clean_binary(data).strip()
         if port == 445 and ("SMB" in banner or "Samba" in banner):
             return "SMB (Windows/Samba)"
         if port == 3306 and len(banner) > 5:
@@ -0,0 +1,92 @@
+# 장시간 스캔의 진행 상태 저장 및 재개
+import json
+import os
+import tempfile
+import threading
+
+from utils.logger import app_logger as logger
+
+CHECKPOINT_VERSION = 1
+
+
+def write_json_atomic(path, data, prefix='.tmp.'):
+    """
+    data를 JSON으로 같은 디렉터리의 임시 파일에 쓰고 fsync한 뒤 os.replace로 바꿔치기
+    (저장 도중 중단되어도 이전 파일이 온전히 남고, 실패하면 임시 파일은 지움)
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=prefix, dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ProgressTracker:
+    """
+    스캔 순서상 위치(position)의 완료 여부를 추적합니다.
+    엔진은 결과를 순서와 다르게 돌려줄 수 있으므로,
+    '여기까지는 모두 끝남'을 뜻하는 watermark와 그 위에서 먼저 끝난 위치들만 보관합니다.
+    (보관량은 동시에 진행 중인 프로브 수 정도로 제한됨)
+    엔진 스레드(호스트 탐색으로 건너뛴 위치)와 메인 스레드(결과, 체크포인트 저장)가 함께 쓰므로 lock으로 보호합니다.
+    """
+    def __init__(self, watermark=0, completed=()):
+        self.watermark = watermark
+        self.completed = set(completed)
+        self._lock = threading.Lock()
+        self._advance()
+
+    def complete(self, position):
+        with self._lock:
+            if position < self.watermark:
+                return
+            self.completed.add(position)
+            self._advance()
+
+    def _advance(self):
+        while self.watermark in self.completed:
+            self.completed.remove(self.watermark)
+            self.watermark += 1
+
+    def is_done(self, position):
+        with self._lock:
+            return position < self.watermark or position in self.completed
+
+    def snapshot(self):
+        """체크포인트 저장용 (watermark, 정렬된 completed 목록) - 같은 시점의 값"""
+        with self._lock:
+            return self.watermark, sorted(self.completed)
+
+
+class ScanCheckpoint:
+    """
+    스캔 상태를 작은 JSON 파일로 저장합니다.
+    임시 파일에 쓴 뒤 os.replace로 바꿔치기하므로, 저장 도중 중단되어도 이전 파일이 온전히 남습니다.
+    """
+    def __init__(self, path="logs/scan_state.json"):
+        self.path = path
+
+    def save(self, state):
+        write_json_atomic(self.path, dict(state, version=CHECKPOINT_VERSION), prefix='.scan_state.')
+        logger.debug(f"Checkpoint saved: watermark={state.get('watermark')}")
+
+    def load(self):
+        """저장된 상태 (없으면 None)"""
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('version') != CHECKPOINT_VERSION:
+            raise ValueError(f"지원하지 않는 체크포인트 형식입니다: {self.path}")
+        return state
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,236 @@
+# 포트 스캔 전에 살아있는 호스트만 골라내는 호스트 탐색 단계
+import errno
+import ipaddress
+import os
+import random
+import select
+import socket
+import threading
+import time
+
+from core.scan_types.async_connect import AsyncConnectScanner
+from core.scan_types.packet import (
+    ICMP_ECHO_REPLY, TCP_ACK, TCP_RST, TCP_SYN, ProbeCookie, build_icmp_echo, build_tcp_packet,
+    local_ip_for, parse_icmp_packet, parse_tcp_packet,
+)
+from core.targets import TargetSet
+from utils.logger import app_logger as logger
+
+DEFAULT_METHODS = ('icmp', 'tcp_syn', 'tcp_ack', 'arp')
+DEFAULT_TCP_PORTS = (80, 443, 22)
+
+
+class HostDiscovery:
+    """
+    ICMP Echo, TCP SYN/ACK ping, (로컬 세그먼트의) ARP를 동시에 보내 응답한 호스트만 모읍니다.
+    - 송신 루프 하나가 모든 대상에 프로브를 연속 전송하고, ICMP/TCP 수신 스레드가 응답을 검증합니다.
+      (SYN 엔진과 같은 ProbeCookie 방식이라 호스트별 상태 테이블이 없음)
+    - ARP는 직접 연결된 대역의 대상만 scapy로 묶어서 보냅니다.
+    - raw 소켓 권한이 없으면 tcp_ports로의 CONNECT ping으로 대체합니다.
+    """
+    def __init__(self, timeout=1.0, methods=DEFAULT_METHODS, tcp_ports=DEFAULT_TCP_PORTS, rate=None):
+        self.timeout = timeout
+        self.methods = [m.lower() for m in methods]
+        self.tcp_ports = list(tcp_ports)
+        self.rate = rate
+
+    def discover(self, targets):
+        """
+        :param targets: TargetSet
+        :return: 살아있는 호스트만 담은 TargetSet (없으면 None)
+        """
+        live = set()
+        lock = threading.Lock()
+
+        def mark(ip):
+            if ip in targets:
+                with lock:
+                    live.add(ip)
+
+        threads = []
+        if 'arp' in self.methods:
+            thread = threading.Thread(target=self._arp_sweep, args=(targets, mark), name="ArpDiscovery", daemon=True)
+            thread.start()
+            threads.append(thread)
+
+        raw_methods = [m for m in self.methods if m in ('icmp', 'tcp_syn', 'tcp_ack')]
+        if raw_methods:
+            try:
+                self._raw_sweep(targets, raw_methods, mark, live)
+            except PermissionError:
+                # raw 소켓을 만들 수 없는 경우만 (패킷 단위 전송 오류는 _send에서 처리)
+                logger.warning("Raw socket unavailable, falling back to TCP connect ping for host discovery")
+                self._connect_sweep(targets, mark)
+
+        for thread in threads:
+            thread.join()
+
+        logger.info(f"Host discovery: {len(live)}/{len(targets)} hosts alive")
+        if not live:
+            return None
+        return TargetSet(sorted(live, key=lambda ip: int(ipaddress.IPv4Address(ip))))
+
+    # ------------------------------------------------------------------
+    # ICMP / TCP ping (raw socket)
+    # ------------------------------------------------------------------
+    def _raw_sweep(self, targets, methods, mark, live):
+        cookie = ProbeCookie()
+        ident = os.getpid() & 0xffff
+        stop = threading.Event()
+
+        sockets = []
+        receiver = None
+        try:
+            # 하나라도 만들다 실패하면 이미 만든 소켓은 finally에서 닫음
+            icmp_skt = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+            sockets.append(icmp_skt)
+            send_skt = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_RAW)
+            sockets.append(send_skt)
+            send_skt.setsockopt(socket.IPPROTO_IP, socket.IP_HDRINCL, 1)
+            tcp_skt = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP)
+            sockets.append(tcp_skt)
+
+            receiver = threading.Thread(
+                target=self._receive_loop, args=(icmp_skt, tcp_skt, cookie, mark, stop),
+                name="DiscoveryReceiver", daemon=True)
+            receiver.start()
+            src_cache = {}
+            for target_ip in targets:
+                if target_ip in live:
+                    continue    # ARP로 이미 확인된 호스트
+                src_ip = src_cache.get(target_ip)
+                if src_ip is None:
+                    if len(src_cache) > 4096:
+                        src_cache.clear()
+                    src_ip = src_cache[target_ip] = local_ip_for(target_ip)
+
+                if 'icmp' in methods:
+                    self._pace()
+                    payload = cookie.make_bytes(target_ip)
+                    self._send(icmp_skt, build_icmp_echo(ident, random.getrandbits(16), payload), target_ip)
+                for port in self.tcp_ports:
+                    src_port = random.randint(1024, 65535)
+                    probe = cookie.make(target_ip, port, src_port)
+                    if 'tcp_syn' in methods:
+                        self._pace()
+                        packet = build_tcp_packet(src_ip, target_ip, src_port, port, probe, flags=TCP_SYN)
+                        self._send(send_skt, packet, target_ip)
+                    if 'tcp_ack' in methods:
+                        # ACK ping: 상대는 RST(seq = 우리가 보낸 ack)로 응답
+                        self._pace()
+                        packet = build_tcp_packet(src_ip, target_ip, src_port, port,
+                                                  random.getrandbits(32), ack=probe, flags=TCP_ACK)
+                        self._send(send_skt, packet, target_ip)
+            # 마지막 프로브의 응답까지 대기
+            time.sleep(self.timeout)
+        finally:
+            stop.set()
+            if receiver is not None:
+                receiver.join()
+            for skt in sockets:
+                skt.close()
+
+    def _send(self, skt, packet, target_ip):
+        """
+        패킷 하나 전송: 송신 버퍼가 가득 차면(ENOBUFS/EAGAIN) 잠깐 쉬었다가 재시도하고,
+        보낼 수 없는 주소(대역의 브로드캐스트 주소 -> EACCES, 방화벽 -> EPERM 등)는 그 패킷만 건너뜀
+        """
+        while True:
+            try:
+                skt.sendto(packet, (target_ip, 0))
+                return
+            except OSError as e:
+                if e.errno in (errno.ENOBUFS, errno.EAGAIN):
+                    time.sleep(0.001)
+                    continue
+                logger.debug(f"Discovery probe to {target_ip} not sent: {e}")
+                return
+
+    def _pace(self):
+        if self.rate is not None:
+            self.rate.acquire()
+
+    def _receive_loop(self, icmp_skt, tcp_skt, cookie, mark, stop):
+        while not stop.is_set():
+            readable, _, _ = select.select([icmp_skt, tcp_skt], [], [], 0.2)
+            for skt in readable:
+                try:
+                    data = skt.recv(65535)
+                except OSError:
+                    continue
+                if skt is icmp_skt:
+                    parsed = parse_icmp_packet(data)
+                    if parsed is None:
+                        continue
+                    src_ip, icmp_type, _, rest = parsed
+                    # rest = id(2) + seq(2) + payload
+                    if icmp_type == ICMP_ECHO_REPLY and rest[4:8] == cookie.make_bytes(src_ip):
+                        mark(src_ip)
+                else:
+                    parsed = parse_tcp_packet(data)
+                    if parsed is None:
+                        continue
+                    src_ip, _, sport, dport, seq, ack, flags, _ = parsed
+                    expected = cookie.make(src_ip, sport, dport)
+                    if flags & TCP_ACK and (expected + 1) & 0xffffffff == ack:
+                        mark(src_ip)    # SYN ping에 대한 SYN-ACK 또는 RST-ACK
+                    elif flags & TCP_RST and seq == expected:
+                        mark(src_ip)    # ACK ping에 대한 RST
+
+    # ------------------------------------------------------------------
+    # ARP (로컬 세그먼트)
+    # ------------------------------------------------------------------
+    def _local_networks(self):
+        """직접 연결된 (게이트웨이 없는) IPv4 대역 목록: [(network, mask, iface)]"""
+        from scapy.all import conf
+        networks = []
+        for net, mask, gateway, iface, _, _ in conf.route.routes:
+            if gateway != '0.0.0.0' or not mask or net == 0 or iface == conf.loopback_name:
+                continue
+            if ipaddress.IPv4Address(net).is_multicast:
+                continue
+            networks.append((net, mask, iface))
+        return networks
+
+    def _arp_sweep(self, targets, mark):
+        try:
+            from scapy.all import ARP, Ether, srp
+            networks = self._local_networks()
+        except Exception as e:
+            logger.warning(f"ARP discovery unavailable: {e}")
+            return
+        if not networks:
+            return
+
+        batches = {}
+        for target_ip in targets:
+            value = int(ipaddress.IPv4Address(target_ip))
+            for net, mask, iface in networks:
+                if value & mask == net:
+                    batch = batches.setdefault(iface, [])
+                    batch.append(target_ip)
+                    if len(batch) >= 256:
+                        self._arp_batch(srp, ARP, Ether, iface, batches.pop(iface), mark)
+                    break
+        for iface, batch in batches.items():
+            self._arp_batch(srp, ARP, Ether, iface, batch, mark)
+
+    def _arp_batch(self, srp, ARP, Ether, iface, batch, mark):
+        try:
+            answered, _ = srp(Ether(dst="ff:ff:ff:ff:ff:ff") / ARP(pdst=batch),
+                              timeout=self.timeout, iface=iface, verbose=0)
+        except Exception as e:
+            logger.warning(f"ARP sweep failed on {iface}: {e}")
+            return
+        for _, reply in answered:
+            mark(reply[ARP].psrc)
+
+    # ------------------------------------------------------------------
+    # 권한이 없을 때: CONNECT ping
+    # ------------------------------------------------------------------
+    def _connect_sweep(self, targets, mark):
+        engine = AsyncConnectScanner(timeout=self.timeout, rate=self.rate)
+        probes = ((target_ip, port) for target_ip in targets for port in self.tcp_ports)
+        for target_ip, _, status in engine.scan_batch(probes):
+            if status in ("Open", "Closed"):
+                mark(target_ip)
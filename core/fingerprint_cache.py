@@ -0,0 +1,163 @@
+# 서비스 탐지 결과(핑거프린트) 디스크 캐시
+import collections
+import json
+import os
+import tempfile
+import threading
+import time
+
+from utils.logger import app_logger as logger
+
+CACHE_VERSION = 1
+
+
+class FingerprintCache:
+    """
+    (ip, port, handler) -> 서비스 정보 캐시
+    - ttl: 이 시간(초)이 지난 항목은 다시 탐지
+    - max_entries: 항목 수 상한. 넘치면 가장 오래 사용하지 않은 항목부터 제거 (LRU)
+    - 포트 상태가 Open이 아니게 되면 invalidate()로 해당 포트의 항목을 지움
+    save()는 임시 파일에 쓴 뒤 os.replace로 바꿔치기합니다 (체크포인트와 같은 방식).
+    탐지 워커 여러 개가 동시에 접근하므로 lock으로 보호합니다.
+    """
+    def __init__(self, path="logs/fingerprint_cache.json", ttl=86400, max_entries=10000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max(1, int(max_entries))
+        # key -> {'service', 'stored_at'} (앞쪽일수록 오래 사용하지 않은 항목)
+        self.entries = collections.OrderedDict()
+        # "ip:port" -> 그 포트의 key 집합 (invalidate가 전체 key를 훑지 않도록)
+        self._by_port = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(ip, port, handler):
+        return f"{ip}:{port}:{handler}"
+
+    @staticmethod
+    def _port_of(key):
+        """'ip:port:handler' -> 'ip:port' (handler 이름에 ':'가 있어도 앞의 두 필드만)"""
+        return ':'.join(key.split(':', 2)[:2])
+
+    # 아래 세 함수는 lock을 잡은 상태에서만 호출
+    def _store(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        self._by_port.setdefault(self._port_of(key), set()).add(key)
+
+    def _discard(self, key):
+        del self.entries[key]
+        port_key = self._port_of(key)
+        keys = self._by_port.get(port_key)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_port[port_key]
+
+    def _evict(self):
+        """max_entries를 넘는 만큼 가장 오래 사용하지 않은 항목부터 제거"""
+        while len(self.entries) > self.max_entries:
+            self._discard(next(iter(self.entries)))
+
+    def get(self, ip, port, handler):
+        """유효한 캐시 항목의 서비스 정보 (없거나 만료되면 None)"""
+        key = self._key(ip, port, handler)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if self.ttl and time.time() - entry['stored_at'] > self.ttl:
+                self._discard(key)
+                self._dirty = True
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry['service']
+
+    def put(self, ip, port, handler, service):
+        key = self._key(ip, port, handler)
+        with self._lock:
+            self._store(key, {'service': service, 'stored_at': time.time()})
+            self._evict()
+            self._dirty = True
+
+    def invalidate(self, ip, port):
+        """포트 상태가 바뀌었을 때 해당 (ip, port)의 모든 핸들러 항목 삭제"""
+        with self._lock:
+            stale = self._by_port.get(f"{ip}:{port}")
+            if not stale:
+                return
+            for key in list(stale):
+                self._discard(key)
+            self._dirty = True
+            logger.debug(f"Fingerprint cache invalidated: {ip}:{port}")
+
+    def stored_since(self, since):
+        """since(time.time()) 이후 저장된 항목들 [(key, entry)] (병렬 스캔 워커 -> 부모 전달용)"""
+        with self._lock:
+            return [(key, entry) for key, entry in self.entries.items() if entry['stored_at'] >= since]
+
+    def merge(self, entries):
+        """다른 프로세스가 저장한 항목들을 합침 (같은 키는 더 최근 항목 우선)"""
+        with self._lock:
+            for key, entry in entries:
+                current = self.entries.get(key)
+                if current is not None and current['stored_at'] > entry['stored_at']:
+                    continue
+                self._store(key, entry)
+                self._dirty = True
+            self._evict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def load(self):
+        """저장된 캐시를 읽어옴 (파일이 없거나 형식이 다르면 빈 캐시로 시작)"""
+        if not os.path.exists(self.path):
+            return self
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to load fingerprint cache {self.path}: {e}")
+            return self
+        if data.get('version') != CACHE_VERSION:
+            logger.warning(f"Ignoring fingerprint cache with unsupported version: {self.path}")
+            return self
+
+        now = time.time()
+        with self._lock:
+            # 파일에는 LRU 순서대로 저장되어 있음
+            for key, entry in data.get('entries', []):
+                if self.ttl and now - entry['stored_at'] > self.ttl:
+                    continue
+                self._store(key, entry)
+            self._evict()
+        logger.info(f"Fingerprint cache loaded: {len(self.entries)} entries")
+        return self
+
+    def save(self):
+        """변경된 내용이 있으면 원자적으로 저장"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {'version': CACHE_VERSION, 'entries': list(self.entries.items())}
+            self._dirty = False
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.fingerprint_cache.', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        logger.debug(f"Fingerprint cache saved: {len(data['entries'])} entries")
@@ -0,0 +1,214 @@
+# 차등(Delta) 스캔 및 연속 모니터링 모드
+import copy
+import datetime
+import json
+import os
+import time
+
+from core.checkpoint import write_json_atomic
+from core.output import JsonlSink, ResultWriter
+from core.scanner import PortScanner
+from utils.logger import app_logger as logger
+
+
+def _port_key(host, port, proto):
+    """상태 파일의 포트 키 (예: '10.0.0.1:53/udp') - 같은 번호의 TCP/UDP 결과를 구분"""
+    return f"{host}:{port}/{proto}"
+
+
+def _parse_port_key(key):
+    """'host:port/proto' -> (host, port) (proto가 없는 이전 형식 키도 허용)"""
+    address = key.partition('/')[0]
+    host, port = address.rsplit(':', 1)
+    return host, int(port)
+
+
+class ScanMonitor:
+    """
+    같은 대상을 주기적으로 다시 스캔하면서 바뀐 점만 알려주는 모니터링 모드
+    - 이전 라운드까지의 결과(열린 포트와 서비스 정보)를 상태 파일에 보관
+    - 매 라운드: 알려진 Open 포트와 최근에 변화가 있던 포트(및 그 주변 neighbourhood개 포트)를 먼저 확인한 뒤,
+      전체 호스트 x 포트 공간을 slices개로 나눈 조각 하나만 스캔
+      (주변 포트 재확인은 조각 하나 크기를 넘지 않으므로 라운드당 스캔량이 일정하게 유지됨)
+      (고정 seed의 순열 위에서 조각을 나누므로 slices 라운드가 지나면 전체를 한 번 훑음)
+    - 새로 열린 포트, 닫힌 포트, 배너가 바뀐 포트만 출력/기록
+    - 상태는 (호스트, 포트, proto) 단위로 보관하므로 같은 번호의 TCP/UDP 결과가 서로 덮어쓰지 않음
+    - shard(i/N)가 있으면 전체 공간 중 그 샤드의 위치만 조각으로 나눠 돌고, 상태 파일도 샤드별로 따로 씀
+      (모든 샤드가 대상/포트로 정해지는 같은 seed를 쓰므로 장비별 모니터가 겹치거나 빠지는 위치가 없음)
+    """
+    def __init__(self, config):
+        monitor_cfg = config.get('monitor') or {}
+        self.state_path = monitor_cfg.get('state', "logs/monitor_state.json")
+        self.interval = monitor_cfg.get('interval', 3600)
+        self.slices = max(1, int(monitor_cfg.get('slices', 24)))
+        self.recent_rounds = monitor_cfg.get('recent_rounds', 3)
+        self.neighbourhood = max(0, int(monitor_cfg.get('neighbourhood', 8)))
+        self.delta_output = monitor_cfg.get('delta_output')
+
+        # 모니터링 라운드는 조각 단위로 돌기 때문에 호스트 탐색/체크포인트는 사용하지 않음
+        # 조각은 항상 랜덤 순열 위에서 나눔 (샤드가 있으면 PortScanner가 샤드 공통 seed를 정함)
+        scan_config = copy.deepcopy(config)
+        scan_config.setdefault('discovery', {})['enabled'] = False
+        scan_config.pop('checkpoint', None)
+        scan_config['scan_options']['randomize_order'] = True
+        self.scanner = PortScanner(scan_config)
+        if self.scanner.shards:
+            root, ext = os.path.splitext(self.state_path)
+            for index, count in self.scanner.shards:
+                root += f".shard{index + 1}of{count}"
+            self.state_path = root + ext
+        self.state = self._load_state()
+
+    # ------------------------------------------------------------------
+    # 상태 파일
+    # ------------------------------------------------------------------
+    def _load_state(self):
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            # 이전 형식(호스트 단위 변경 기록)은 포트 단위 기록으로 대체
+            state.pop('changed_hosts', None)
+            state.setdefault('changed_ports', {})
+            # proto가 없는 이전 형식의 키는 TCP 결과로 간주
+            for name in ('ports', 'changed_ports'):
+                state[name] = {key if '/' in key else f"{key}/tcp": value for key, value in state[name].items()}
+            return state
+        return {'round': 0, 'seed': None, 'ports': {}, 'changed_ports': {}}
+
+    def _save_state(self):
+        write_json_atomic(self.state_path, self.state, prefix='.monitor_state.')
+
+    # ------------------------------------------------------------------
+    # 라운드 실행
+    # ------------------------------------------------------------------
+    def _neighbours(self, port, ports):
+        """port에 가까운 순서로 앞뒤 neighbourhood개씩의 포트 (스캔 대상 포트 집합 안에서만)"""
+        yield port
+        for offset in range(1, self.neighbourhood + 1):
+            for candidate in (port - offset, port + offset):
+                if 0 < candidate < 65536 and candidate in ports:
+                    yield candidate
+
+    def _round_targets(self, scheduler, round_no):
+        """이번 라운드에 확인할 (host, port): 우선순위 목록 -> 전체 공간의 조각"""
+        seen = set()
+        known_open = [_parse_port_key(key) for key in self.state['ports']]
+        recent_ports = [_parse_port_key(key) for key, changed in self.state['changed_ports'].items()
+                        if round_no - changed <= self.recent_rounds]
+
+        for target in known_open:
+            if target not in seen and self._in_scope(scheduler, *target):
+                seen.add(target)
+                yield target
+
+        total = len(scheduler)
+        slice_no = round_no % self.slices
+        start, end = total * slice_no // self.slices, total * (slice_no + 1) // self.slices
+
+        # 최근 바뀐 포트와 주변 포트 재확인 (조각 하나 크기까지만)
+        budget = end - start
+        for host, port in recent_ports:
+            if host not in scheduler.targets:
+                continue
+            for neighbour in self._neighbours(port, scheduler.ports):
+                if budget <= 0:
+                    break
+                if (host, neighbour) not in seen and self._in_scope(scheduler, host, neighbour):
+                    seen.add((host, neighbour))
+                    budget -= 1
+                    yield host, neighbour
+        for position in range(start, end):
+            target = scheduler.at(position)
+            if target not in seen:
+                yield target
+
+    def _in_scope(self, scheduler, host, port):
+        """(host, port)가 이번 모니터가 맡은 공간(대상, 포트, 샤드) 안에 있는지"""
+        if host not in scheduler.targets or port not in scheduler.ports:
+            return False
+        try:
+            scheduler.position_of(host, port)
+        except ValueError:
+            return False
+        return True
+
+    def run_once(self):
+        """라운드 하나를 실행하고 변경 사항 목록을 돌려줌"""
+        round_no = self.state['round']
+        scheduler = self.scanner.make_scheduler(self.state['seed'])
+        self.state['seed'] = scheduler.seed
+
+        observed = {}
+        self.scanner.listeners = [
+            lambda record: observed.__setitem__((record['host'], record['port'], record['proto']), record)]
+        self.scanner.results = {}
+        shard = f", 샤드 {self.scanner.shard_label}" if self.scanner.shards else ""
+        print(f"[*] 모니터링 라운드 {round_no} (조각 {round_no % self.slices + 1}/{self.slices}{shard})")
+        self.scanner.scan_targets(self._round_targets(scheduler, round_no))
+
+        deltas = self._diff(observed, round_no)
+        self.state['round'] = round_no + 1
+        self._save_state()
+        self._emit(deltas)
+        return deltas
+
+    def _diff(self, observed, round_no):
+        now = datetime.datetime.now().isoformat(timespec='seconds')
+        known = self.state['ports']
+        deltas = []
+        for (host, port, proto), record in observed.items():
+            key = _port_key(host, port, proto)
+            previous = known.get(key)
+            if record['state'] == "Open":
+                service = record['service']
+                if previous is None:
+                    deltas.append({'change': 'opened', 'host': host, 'port': port, 'proto': proto,
+                                   'service': service})
+                elif previous['service'] != service:
+                    deltas.append({'change': 'banner_changed', 'host': host, 'port': port, 'proto': proto,
+                                   'previous': previous['service'], 'service': service})
+                else:
+                    previous['last_seen'] = now
+                    continue
+                known[key] = {'service': service, 'last_seen': now}
+            elif previous is not None and record['state'] != "Open|Filtered":
+                # UDP의 무응답(Open|Filtered)은 닫힘으로 보지 않음 (ICMP 속도 제한 등)
+                deltas.append({'change': 'closed', 'host': host, 'port': port, 'proto': proto,
+                               'state': record['state'], 'previous': previous['service']})
+                del known[key]
+            else:
+                continue
+            self.state['changed_ports'][key] = round_no
+
+        # 오래전에 바뀐 포트는 우선순위 목록에서 제외
+        self.state['changed_ports'] = {key: changed for key, changed in self.state['changed_ports'].items()
+                                       if round_no - changed <= self.recent_rounds}
+        for delta in deltas:
+            delta['timestamp'] = now
+            delta['round'] = round_no
+        return deltas
+
+    def _emit(self, deltas):
+        marks = {'opened': '[+]', 'closed': '[-]', 'banner_changed': '[~]'}
+        for delta in deltas:
+            detail = delta.get('service') if delta['change'] != 'closed' else delta['state']
+            print(f"{marks[delta['change']]} {delta['host']}:{delta['port']}/{delta['proto']} "
+                  f"{delta['change']} - {detail}")
+        if not deltas:
+            print("[*] 변경 사항 없음")
+        if self.delta_output and deltas:
+            writer = ResultWriter([JsonlSink(self.delta_output)]).start()
+            for delta in deltas:
+                writer.submit(delta)
+            writer.close()
+
+    def run_forever(self):
+        """interval 초마다 라운드 반복 (전체 공간은 slices 라운드에 나눠서 고르게 스캔)"""
+        while True:
+            started = time.monotonic()
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Monitoring round failed: {e}")
+                print(f"[!] 모니터링 라운드 실패: {e}")
+            time.sleep(max(0, self.interval - (time.monotonic() - started)))
@@ -0,0 +1,209 @@
+# 스캔 결과를 구조화된 형식으로 스트리밍 저장하는 결과 싱크들
+import csv
+import json
+import os
+import queue
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+
+from utils.logger import app_logger as logger
+
+# 결과 레코드 필드 순서 (CSV 헤더 / SQLite 컬럼)
+FIELDS = ('timestamp', 'host', 'port', 'proto', 'state', 'service', 'rtt', 'detect_time')
+
+# writer 스레드 종료 표식
+_STOP = object()
+
+
+class BaseSink(ABC):
+    """
+    결과 싱크 기본 클래스 (하위 클래스는 write를 반드시 구현)
+    open/write/flush/close는 모두 ResultWriter의 writer 스레드에서만 호출됩니다.
+    states를 지정하면 해당 상태(Open, Closed, Filtered ...)의 레코드만 기록합니다.
+    """
+    def __init__(self, path, states=None):
+        self.path = path
+        self.states = set(states) if states else None
+
+    def accepts(self, record):
+        return self.states is None or record['state'] in self.states
+
+    def open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @abstractmethod
+    def write(self, record):
+        """레코드 한 건 기록 (dict, 키는 FIELDS)"""
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class JsonlSink(BaseSink):
+    """한 줄에 JSON 객체 하나 (line-buffered - 줄 단위로 바로 디스크에 반영)"""
+    def open(self):
+        super().open()
+        self._file = open(self.path, 'a', encoding='utf-8', buffering=1)
+
+    def write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def close(self):
+        self._file.close()
+
+
+class CsvSink(BaseSink):
+    """CSV (새 파일이면 헤더부터 기록)"""
+    def open(self):
+        super().open()
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self._file = open(self.path, 'a', encoding='utf-8', newline='', buffering=1)
+        self._writer = csv.DictWriter(self._file, fieldnames=FIELDS, extrasaction='ignore')
+        if new_file:
+            self._writer.writeheader()
+
+    def write(self, record):
+        self._writer.writerow(record)
+
+    def close(self):
+        self._file.close()
+
+
+class SqliteSink(BaseSink):
+    """SQLite (batch_size 건씩 묶어 한 트랜잭션으로 INSERT)"""
+    def __init__(self, path, states=None, batch_size=500):
+        super().__init__(path, states)
+        self.batch_size = batch_size
+        self._pending = []
+
+    def open(self):
+        super().open()
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "timestamp TEXT, host TEXT, port INTEGER, proto TEXT, state TEXT, "
+            "service TEXT, rtt REAL, detect_time REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_host_port ON results (host, port)")
+        self._conn.commit()
+
+    def write(self, record):
+        self._pending.append(tuple(record.get(field) for field in FIELDS))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        with self._conn:    # 트랜잭션 (성공 시 commit, 실패 시 rollback)
+            self._conn.executemany(
+                f"INSERT INTO results ({', '.join(FIELDS)}) VALUES ({', '.join('?' * len(FIELDS))})",
+                self._pending,
+            )
+        self._pending = []
+
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+
+SINK_TYPES = {
+    'jsonl': JsonlSink,
+    'csv': CsvSink,
+    'sqlite': SqliteSink,
+}
+
+
+def create_sinks(output_config):
+    """
+    설정의 output 목록으로 싱크 생성
+    예: [{'type': 'jsonl', 'path': 'results/scan.jsonl'}, {'type': 'sqlite', 'path': 'results/scan.db'}]
+    """
+    sinks = []
+    for entry in output_config or []:
+        sink_type = str(entry.get('type', '')).lower()
+        if sink_type not in SINK_TYPES:
+            raise ValueError(f"지원하지 않는 출력 형식입니다: {sink_type}")
+        options = {key: value for key, value in entry.items() if key not in ('type', 'path')}
+        sinks.append(SINK_TYPES[sink_type](entry['path'], **options))
+    return sinks
+
+
+class ResultWriter:
+    """
+    결과 레코드를 큐에 받아 별도 스레드에서 모든 싱크에 기록
+    submit()은 큐에 넣기만 하므로 디스크가 느려도 스캔 경로는 기다리지 않습니다.
+    """
+    def __init__(self, sinks):
+        self.sinks = sinks
+        self.queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="ResultWriter", daemon=True)
+        self._thread.start()
+        return self
+
+    def submit(self, record):
+        self.queue.put(record)
+
+    def close(self):
+        if self._thread is not None:
+            self.queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def _flush(self, sinks):
+        for sink in sinks:
+            try:
+                sink.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush result sink {sink.path}: {e}")
+
+    def _run(self):
+        opened = []
+        for sink in self.sinks:
+            try:
+                sink.open()
+                opened.append(sink)
+            except Exception as e:
+                logger.error(f"Failed to open result sink {sink.path}: {e}")
+
+        running = True
+        while running:
+            try:
+                batch = [self.queue.get(timeout=1.0)]
+            except queue.Empty:
+                # 한동안 새 결과가 없으면 모아둔 배치를 기록
+                self._flush(opened)
+                continue
+            # 쌓여 있는 레코드는 한 번에 처리
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for record in batch:
+                if record is _STOP:
+                    running = False
+                    continue
+                for sink in opened:
+                    if sink.accepts(record):
+                        try:
+                            sink.write(record)
+                        except Exception as e:
+                            logger.error(f"Failed to write result to {sink.path}: {e}")
+
+        for sink in opened:
+            try:
+                sink.close()
+            except Exception as e:
+                logger.error(f"Failed to close result sink {sink.path}: {e}")
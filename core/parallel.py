@@ -0,0 +1,343 @@
+# 멀티 프로세스 샤드 스캔 (CPU 코어마다 스캐너 프로세스 하나)
+import contextlib
+import copy
+import heapq
+import itertools
+import multiprocessing
+import os
+import queue
+import random
+import signal
+import threading
+import time
+
+from core.checkpoint import ProgressTracker, ScanCheckpoint
+from core.output import ResultWriter
+from core.scanner import PortScanner
+from core.targets import TargetSet
+from utils.logger import app_logger as logger
+
+# 워커가 결과 레코드를 모아서 보내는 단위 (개수 / 최대 대기 시간 초)
+BATCH_SIZE = 256
+BATCH_INTERVAL = 0.2
+# 중단(Ctrl-C) 후 워커들이 체크포인트를 저장하고 끝낼 때까지 기다리는 시간 (초)
+SHUTDOWN_TIMEOUT = 10.0
+
+
+def resolve_processes(value):
+    """scan_options.processes 값 -> 프로세스 수 ('auto'는 CPU 코어 수)"""
+    if value in (None, ''):
+        return 1
+    if str(value).lower() == 'auto':
+        return os.cpu_count() or 1
+    return max(1, int(value))
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def worker_config(config, processes):
+    """
+    워커용 설정: 호스트 탐색/결과 저장/콘솔 출력은 부모가 맡고,
+    전송 속도(pps)와 동시 연결 수는 프로세스 수로 나눠 전체 합이 설정값을 넘지 않게 함
+    """
+    config = copy.deepcopy(config)
+    config.setdefault('discovery', {})['enabled'] = False
+    config.pop('output', None)
+    config['logging']['console_output'] = 'none'
+    options = config['scan_options']
+    options['concurrency'] = max(1, options.get('concurrency', 1000) // processes)
+    rate_cfg = options.get('rate') or {}
+    if rate_cfg.get('pps'):
+        rate_cfg['pps'] = rate_cfg['pps'] / processes
+    return config
+
+
+class _ShardWorker:
+    """
+    워커 프로세스 하나: 전체 공간 중 index/processes 샤드를 스캔하고 결과를 부모에게 보냄
+    보내는 메시지
+    - ('records', index, [(위치, 레코드)], bound): 위치는 부모 공간의 순서상 위치 (샤드 밖 결과는 None),
+      bound 미만의 위치는 이 워커가 모두 보고를 마쳤다는 뜻 (서비스 탐지 결과까지 포함)
+    - ('done', index, 새 캐시 항목, 오류 메시지 또는 None)
+    """
+    def __init__(self, config, index, processes, seed, alive, results):
+        self.index = index
+        self.results = results
+        self.scanner = PortScanner(config)
+        self.scanner.seed = seed
+        self.scanner.add_shard(index, processes)
+        self.scanner.alive = TargetSet(alive) if alive is not None else None
+        self.scanner.persist_cache = False
+        self.scanner.listeners.append(self._on_record)
+        self.scanner.on_skip = self._on_skip
+
+        # 부모에게 알리는 진행 위치는 포트 상태 확정이 아니라 레코드 보고 시점 기준으로 따로 추적
+        state = None
+        if self.scanner.checkpoint and self.scanner.resume:
+            with contextlib.suppress(ValueError):
+                state = self.scanner.checkpoint.load()
+        self.tracker = ProgressTracker(state['watermark'], state['completed']) if state else ProgressTracker()
+        self._batch = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _local_position(self, record):
+        if record['proto'] != self.scanner.scanner_engine.proto or self.scanner.scheduler is None:
+            return None
+        try:
+            return self.scanner.scheduler.position_of(record['host'], record['port'])
+        except ValueError:
+            return None
+
+    def _on_record(self, record):
+        position = self._local_position(record)
+        with self._lock:
+            if position is not None:
+                self.tracker.complete(position)
+                position = self.scanner.scheduler.base_position(position)
+            self._batch.append((position, record))
+            self._maybe_flush()
+
+    def _on_skip(self, position):
+        with self._lock:
+            self.tracker.complete(position)
+            self._maybe_flush()
+
+    def _maybe_flush(self):
+        if len(self._batch) >= BATCH_SIZE or time.monotonic() - self._last_flush >= BATCH_INTERVAL:
+            self._flush()
+
+    def _flush(self):
+        scheduler = self.scanner.scheduler
+        bound = scheduler.base_position(self.tracker.watermark) if scheduler else 0
+        self.results.put(('records', self.index, self._batch, bound))
+        self._batch = []
+        self._last_flush = time.monotonic()
+
+    def run(self):
+        # Ctrl-C는 부모가 받아서 SIGTERM으로 전달 (워커는 KeyboardInterrupt로 처리해 체크포인트를 저장)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, _interrupt)
+        started = time.time()
+        error = None
+        try:
+            # 헤더/진행 메시지는 부모가 출력
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                self.scanner.run()
+        except KeyboardInterrupt:
+            error = "interrupted"
+        except Exception as e:
+            logger.error(f"Shard worker {self.index} failed: {e}")
+            error = str(e)
+        with self._lock:
+            self._flush()
+        cache = self.scanner.fingerprint_cache
+        entries = cache.stored_since(started) if cache is not None else []
+        self.results.put(('done', self.index, entries, error))
+
+
+def _worker_main(config, index, processes, seed, alive, results):
+    _ShardWorker(config, index, processes, seed, alive, results).run()
+
+
+class ParallelScan:
+    """
+    호스트 x 포트 공간을 processes개의 샤드로 나눠 프로세스마다 스캐너를 하나씩 돌림
+    - 샤드는 순서상 위치를 processes칸 간격으로 나눈 것 (ShardedScheduler)이고, 모든 워커가 같은 seed를 씀
+    - 호스트 탐색은 부모가 한 번만 하고 결과(alive)를 워커에 넘김
+    - 워커들의 결과는 위치 순서대로 다시 합쳐 하나의 출력(콘솔/결과 싱크)으로 내보냄:
+      모든 워커가 '여기까지 끝남'이라고 알린 위치(bound)의 최솟값 미만인 레코드만 순서대로 내보내므로,
+      단일 프로세스 스캔과 같은 순서가 되고 늦은 워커가 있으면 그만큼만 버퍼에 쌓임
+    --shard i/N과 함께 쓰면 장비별 샤드를 다시 프로세스별로 나눔 (중첩 샤드)
+    """
+    def __init__(self, config, processes):
+        self.config = config
+        self.processes = max(1, int(processes))
+        # 결과 출력/저장과 핑거프린트 캐시만 담당 (직접 스캔하지 않음)
+        self.scanner = PortScanner(config)
+        self._pending = []
+        self._order = itertools.count()
+        # 부모 체크포인트: 모든 워커가 같은 seed/탐색 결과로 재개하고, 이미 끝난 샤드는 다시 돌리지 않도록 보관
+        # (워커는 자기 샤드를 끝내면 샤드 체크포인트를 지우므로 그 정보만으로는 재개할 수 없음)
+        self.checkpoint = None
+        if self.scanner.checkpoint:
+            root, ext = os.path.splitext(self.scanner.checkpoint.path)
+            self.checkpoint = ScanCheckpoint(f"{root}.parallel{ext}")
+        self.state = None
+
+    def _load_checkpoint(self):
+        """--resume 시 부모 체크포인트를 읽고 현재 설정과 같은 병렬 스캔인지 확인"""
+        state = self.checkpoint.load()
+        if state is None:
+            print(f"[!] 재개할 체크포인트가 없습니다: {self.checkpoint.path} (처음부터 스캔합니다)")
+            return None
+        scanner = self.scanner
+        if state['config_target'] != scanner.target_ip_str or state['ports'] != scanner.ports_str \
+                or state['mode'] != scanner.scan_mode or state['randomize'] != bool(scanner.randomize) \
+                or state['shard'] != scanner.shard_label or state['processes'] != self.processes:
+            raise ValueError("체크포인트와 현재 설정(대상/포트/모드/순서/샤드/프로세스 수)이 달라 재개할 수 없습니다.")
+        return state
+
+    def _save_checkpoint(self):
+        if self.checkpoint:
+            self.checkpoint.save(self.state)
+
+    def _on_finished(self, index):
+        """샤드 하나가 끝까지 스캔됨 -> 재개 시 건너뛰도록 기록"""
+        if index not in self.state['finished']:
+            self.state['finished'].append(index)
+            self._save_checkpoint()
+
+    def _publish(self, record):
+        cache = self.scanner.fingerprint_cache
+        if cache is not None and record['state'] != "Open" and record['proto'] == 'tcp':
+            cache.invalidate(record['host'], record['port'])
+        self.scanner._publish(record)
+
+    def _release(self, bound):
+        while self._pending and self._pending[0][0] < bound:
+            self._publish(heapq.heappop(self._pending)[2])
+
+    def run(self):
+        scanner = self.scanner
+        alive = None
+        state = self._load_checkpoint() if self.checkpoint and scanner.resume else None
+        if state:
+            # 재개: 처음 실행 때의 seed와 탐색 결과를 그대로 쓰고, 끝난 샤드는 건너뜀
+            # (진행 중이던 샤드는 각 워커가 자기 샤드 체크포인트에서 이어서 스캔)
+            alive = state['alive']
+            print(f"[*] 체크포인트에서 재개합니다: {len(state['finished'])}/{self.processes} 샤드 완료")
+        elif scanner.discovery_enabled:
+            print(f"[*] 호스트 탐색 중... ({len(scanner.targets)} hosts)")
+            live_targets = scanner.discovery.discover(scanner.targets)
+            if live_targets is None:
+                print("[!] 살아있는 호스트가 없습니다.")
+                return scanner.results
+            print(f"[*] 살아있는 호스트: {len(live_targets)}/{len(scanner.targets)}")
+            alive = str(live_targets)
+
+        # 모든 워커가 같은 순열을 쓰도록 seed를 여기서 정함
+        seed = state['seed'] if state else scanner.seed
+        if scanner.randomize and seed is None:
+            seed = random.getrandbits(32)
+            logger.info(f"Randomized scan order seed: {seed}")
+        self.state = state or {
+            'config_target': scanner.target_ip_str,
+            'ports': scanner.ports_str,
+            'mode': scanner.scan_mode,
+            'randomize': bool(scanner.randomize),
+            'shard': scanner.shard_label,
+            'processes': self.processes,
+            'seed': seed,
+            'alive': alive,
+            'finished': [],
+        }
+        self._save_checkpoint()
+
+        shard = f", Shard: {scanner.shard_label}" if scanner.shards else ""
+        print(f"[*] Target: {scanner.target_ip_str} ({len(scanner.targets)} hosts), Mode: {scanner.scan_mode}"
+              f"{shard}, Processes: {self.processes}")
+        print("-" * 76)
+        print(f"{'HOST':<16} {'PORT':<10} {'STATUS':<20} {'SERVICE'}")
+        print("-" * 76)
+
+        # fork는 부모의 스레드/소켓 상태를 그대로 복사하므로 spawn으로 깨끗한 프로세스를 띄움
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        config = worker_config(self.config, self.processes)
+        # 이미 끝난 샤드는 워커를 띄우지 않음 (None)
+        workers = [context.Process(target=_worker_main, args=(config, index, self.processes, seed, alive, results),
+                                   daemon=True) if index not in self.state['finished'] else None
+                   for index in range(self.processes)]
+
+        if scanner.sinks:
+            scanner.writer = ResultWriter(scanner.sinks).start()
+        completed = False
+        try:
+            for worker in workers:
+                if worker is not None:
+                    worker.start()
+            completed = self._merge(results, workers)
+        finally:
+            for worker in workers:
+                if worker is None:
+                    continue
+                worker.join(timeout=SHUTDOWN_TIMEOUT)
+                if worker.is_alive():
+                    worker.kill()
+            # 중단된 경우에도 받아 둔 결과는 순서대로 내보냄
+            self._release(float('inf'))
+            if scanner.writer:
+                scanner.writer.close()
+                scanner.writer = None
+            if scanner.fingerprint_cache is not None:
+                scanner.fingerprint_cache.save()
+            if self.checkpoint and completed:
+                self.checkpoint.clear()
+
+        return scanner.results
+
+    def _merge(self, results, workers):
+        """
+        워커 메시지를 받아 bound 최솟값 미만의 레코드를 위치 순서대로 내보냄
+        :return: 모든 샤드가 끝까지 스캔되었는지 여부
+        """
+        finished = [worker is None for worker in workers]
+        bounds = [float('inf') if done else 0 for done in finished]
+        failed = []
+        interrupted = False
+        deadline = None
+
+        while not all(finished):
+            try:
+                message = results.get(timeout=0.5)
+            except KeyboardInterrupt:
+                # 워커들에게 중단을 알리고, 체크포인트를 저장하고 끝날 때까지 잠시 더 받음
+                interrupted = True
+                deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+                for worker in workers:
+                    if worker is not None and worker.is_alive():
+                        worker.terminate()
+                continue
+            except queue.Empty:
+                if deadline is not None and time.monotonic() > deadline:
+                    break
+                for index, worker in enumerate(workers):
+                    if not finished[index] and not worker.is_alive():
+                        finished[index] = True
+                        bounds[index] = float('inf')
+                        failed.append((index, f"exit code {worker.exitcode}"))
+                self._release(min(bounds))
+                continue
+
+            kind, index = message[0], message[1]
+            if kind == 'records':
+                _, _, batch, bound = message
+                for position, record in batch:
+                    if position is None:
+                        self._publish(record)
+                    else:
+                        heapq.heappush(self._pending, (position, next(self._order), record))
+                bounds[index] = bound
+            else:
+                _, _, entries, error = message
+                finished[index] = True
+                bounds[index] = float('inf')
+                if entries and self.scanner.fingerprint_cache is not None:
+                    self.scanner.fingerprint_cache.merge(entries)
+                if error is None:
+                    self._on_finished(index)
+                elif error != "interrupted":
+                    failed.append((index, error))
+            self._release(min(bounds))
+
+        for index, error in failed:
+            logger.error(f"Shard worker {index + 1}/{len(workers)} failed: {error}")
+            print(f"[!] 워커 {index + 1}/{len(workers)} 실패: {error}")
+        if interrupted:
+            if self.scanner.checkpoint:
+                print("\n[!] 워커별 진행 상태를 저장했습니다 (--resume으로 재개)")
+            raise KeyboardInterrupt
+        return not failed
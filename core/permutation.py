@@ -0,0 +1,75 @@
+# 메모리를 쓰지 않는 랜덤 스캔 순서 (Feistel 순열)
+import random
+
+_MASK64 = (1 << 64) - 1
+
+
+class Permutation:
+    """
+    [0, size) 구간의 일대일 의사 난수 순열
+    2^bits(>= size) 크기의 균형 Feistel 네트워크로 섞고, 범위를 벗어난 값은
+    다시 섞는 cycle-walking으로 [0, size) 안에 가둡니다.
+    목록을 만들지 않으므로 수백만 개의 (호스트, 포트) 조합도 O(1) 메모리로 순회하며,
+    같은 seed라면 항상 같은 순서가 나오므로 중간 인덱스부터 이어서 돌릴 수 있습니다.
+    """
+    def __init__(self, size, seed=None, rounds=4):
+        if size < 0:
+            raise ValueError("permutation size must be >= 0")
+        self.size = size
+        self.seed = seed if seed is not None else random.getrandbits(32)
+
+        bits = max(2, (size - 1).bit_length())
+        bits += bits % 2    # 좌/우 절반의 비트 수를 같게
+        self.half_bits = bits // 2
+        self.half_mask = (1 << self.half_bits) - 1
+
+        rng = random.Random(self.seed)
+        self.keys = [rng.getrandbits(64) for _ in range(rounds)]
+
+    def _round(self, key, value):
+        # splitmix64 계열의 정수 섞기 함수
+        h = (value + key) & _MASK64
+        h = ((h ^ (h >> 30)) * 0xbf58476d1ce4e5b9) & _MASK64
+        h = ((h ^ (h >> 27)) * 0x94d049bb133111eb) & _MASK64
+        return (h ^ (h >> 31)) & self.half_mask
+
+    def _encrypt(self, value):
+        left, right = value >> self.half_bits, value & self.half_mask
+        for key in self.keys:
+            left, right = right, left ^ self._round(key, right)
+        return (left << self.half_bits) | right
+
+    def _decrypt(self, value):
+        left, right = value >> self.half_bits, value & self.half_mask
+        for key in reversed(self.keys):
+            left, right = right ^ self._round(key, left), left
+        return (left << self.half_bits) | right
+
+    def forward(self, index):
+        """순회 순서상 index번째에 오는 원소"""
+        if not 0 <= index < self.size:
+            raise IndexError("permutation index out of range")
+        value = self._encrypt(index)
+        while value >= self.size:
+            value = self._encrypt(value)
+        return value
+
+    def inverse(self, value):
+        """forward의 역함수 (원소가 몇 번째로 나오는지)"""
+        if not 0 <= value < self.size:
+            raise IndexError("permutation value out of range")
+        index = self._decrypt(value)
+        while index >= self.size:
+            index = self._decrypt(index)
+        return index
+
+    def iter_from(self, start=0):
+        """start번째부터 순서대로 원소를 생성 (중단된 스캔 재개용)"""
+        for index in range(start, self.size):
+            yield self.forward(index)
+
+    def __iter__(self):
+        return self.iter_from(0)
+
+    def __len__(self):
+        return self.size
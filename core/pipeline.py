@@ -0,0 +1,164 @@
+# 포트 탐색과 서비스 탐지를 분리하는 파이프라인 단계
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.logger import app_logger as logger
+
+# 워커 종료 표식
+_STOP = object()
+
+
+class DetectionPipeline:
+    """
+    Open 포트를 큐에 받아 여러 워커 스레드가 서비스 탐지(get_banner)를 수행하는 단계
+    - workers: 동시에 진행할 배너 수집 개수 (포트 스캔 동시성과 별개)
+    - queue_size: 대기열 상한. 가득 차면 submit()이 기다리며 상류에 배압(backpressure)을 겁니다.
+    탐지가 끝날 때마다 on_result(host, port, service_info, 소요 시간)를 호출하고,
+    결과는 (host, port) 키로 results에 합쳐집니다.
+    """
+    def __init__(self, detector, on_result=None, workers=16, queue_size=256, timeout_for=None):
+        self.detector = detector
+        self.on_result = on_result
+        # host -> 배너 수집 timeout(초) 을 돌려주는 함수 (없으면 get_banner 기본값)
+        self.timeout_for = timeout_for
+        self.workers = max(1, int(workers))
+        self.queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self.results = {}
+        # 제출되었지만 아직 끝나지 않은 (host, port) - 체크포인트의 탐지 대기 목록
+        self.pending = set()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"Detector-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def submit(self, host, port, sock=None):
+        """
+        탐지 대상 추가 (대기열이 가득 차면 자리가 날 때까지 대기)
+        :param sock: 스캔 단계에서 연결해 둔 소켓 (연결 재사용 시)
+        """
+        with self._lock:
+            self.pending.add((host, port))
+        self.queue.put((host, port, sock))
+
+    def backlog(self):
+        """아직 탐지가 끝나지 않은 (host, port) 목록"""
+        with self._lock:
+            return sorted(self.pending)
+
+    def close(self):
+        """남은 작업을 모두 처리한 뒤 워커 종료"""
+        for _ in self._threads:
+            self.queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _worker(self):
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                break
+            host, port, sock = item
+            started = time.monotonic()
+            try:
+                if self.timeout_for:
+                    service_info = self.detector.get_banner(host, port, timeout=self.timeout_for(host), sock=sock)
+                else:
+                    service_info = self.detector.get_banner(host, port, sock=sock)
+            except Exception as e:
+                logger.error(f"Service detection failed for {host}:{port}: {e}")
+                service_info = f"Unknown ({e})"
+            self._finish(host, port, service_info, started)
+
+    def _finish(self, host, port, service_info, started):
+        with self._lock:
+            self.results[(host, port)] = service_info
+            self.pending.discard((host, port))
+        if self.on_result:
+            # 콜백 오류로 워커가 죽으면 대기열이 줄지 않아 submit()이 영원히 기다리므로 항목 단위로 기록만 함
+            try:
+                self.on_result(host, port, service_info, time.monotonic() - started)
+            except Exception as e:
+                logger.error(f"Detection result handler failed for {host}:{port}: {e}")
+
+
+class AsyncDetectionPipeline(DetectionPipeline):
+    """
+    이벤트 루프 하나에서 서비스 탐지를 동시에 진행하는 파이프라인 (get_banner_async 사용)
+    - concurrency: 동시에 진행할 배너 교환 수 (수천 개도 스레드 하나로 처리)
+    - workers: handle_async가 없는 핸들러(TLS, 프로브 DB, 블로킹 핸들러)를 실행할 스레드 풀 크기
+    - queue_size: 진행 중인 것 외에 대기할 수 있는 개수. 넘치면 submit()이 기다림 (배압)
+    """
+    def __init__(self, detector, on_result=None, workers=16, queue_size=256, timeout_for=None, concurrency=1000):
+        super().__init__(detector, on_result, workers, queue_size, timeout_for)
+        self.concurrency = max(1, int(concurrency))
+        self._slots = threading.Semaphore(self.concurrency + self.queue.maxsize)
+        self._idle = threading.Condition(self._lock)
+        # 진행 중인 탐지 수 (같은 (host, port)가 두 번 들어와도 정확히 세기 위해 pending과 별도로 관리)
+        self._inflight = 0
+        self._loop = None
+        self._executor = None
+        self._limit = None
+
+    def start(self):
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="Detector")
+        self._loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run_loop():
+            asyncio.set_event_loop(self._loop)
+            self._limit = asyncio.Semaphore(self.concurrency)
+            ready.set()
+            self._loop.run_forever()
+
+        thread = threading.Thread(target=run_loop, name="Detector-loop", daemon=True)
+        thread.start()
+        ready.wait()
+        self._threads.append(thread)
+        return self
+
+    def submit(self, host, port, sock=None):
+        self._slots.acquire()
+        with self._lock:
+            self.pending.add((host, port))
+            self._inflight += 1
+        asyncio.run_coroutine_threadsafe(self._detect(host, port, sock), self._loop)
+
+    async def _detect(self, host, port, sock):
+        async with self._limit:
+            started = time.monotonic()
+            try:
+                timeout = self.timeout_for(host) if self.timeout_for else 2
+                service_info = await self.detector.get_banner_async(host, port, timeout=timeout, sock=sock,
+                                                                    executor=self._executor)
+            except Exception as e:
+                logger.error(f"Service detection failed for {host}:{port}: {e}")
+                service_info = f"Unknown ({e})"
+        try:
+            self._finish(host, port, service_info, started)
+        finally:
+            self._slots.release()
+            with self._idle:
+                self._inflight -= 1
+                if not self._inflight:
+                    self._idle.notify_all()
+
+    def close(self):
+        """진행 중인 탐지를 모두 마친 뒤 이벤트 루프와 스레드 풀 종료"""
+        with self._idle:
+            while self._inflight:
+                self._idle.wait()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self._loop.close()
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,155 @@
+# 포트 명세(1-1024,8080,!25,top100)를 구간 목록으로 보관하는 집합
+import bisect
+
+from utils.validator import is_valid_port
+
+# Nmap의 TCP 상위 100개 포트 (nmap -F 와 동일)
+TOP100_TCP = (
+    "7,9,13,21-23,25-26,37,53,79-81,88,106,110-111,113,119,135,139,143-144,179,199,"
+    "389,427,443-445,465,513-515,543-544,548,554,587,631,646,873,990,993,995,1025-1029,"
+    "1110,1433,1720,1723,1755,1900,2000-2001,2049,2121,2717,3000,3128,3306,3389,3986,"
+    "4899,5000,5009,5051,5060,5101,5190,5357,5432,5631,5666,5800,5900,6000-6001,6646,"
+    "7070,8000,8008-8009,8080-8081,8443,8888,9100,9999-10000,32768,49152-49157"
+)
+
+# 이름으로 참조할 수 있는 포트 묶음
+NAMED_PORT_SETS = {
+    'top100': TOP100_TCP,
+    'well-known': '1-1023',
+    'all': '1-65535',
+}
+
+
+class PortSet:
+    """
+    겹치지 않게 합쳐진 (start, end) 구간 목록으로 표현한 포트 집합
+    - 1-65535 전체도 구간 1개로 저장되므로 호스트가 많아져도 메모리가 늘지 않음
+    - 포함 여부/인덱스 조회는 bisect로 O(log 구간 수)
+    - 순회는 오름차순으로 필요할 때 하나씩 생성
+    명세 문법: 쉼표로 구분된 포트(22), 범위(1-1024), 이름(top100),
+    앞에 '!'를 붙이면 제외(!25, !6000-6063). 제외만 있으면 전체 포트에서 뺍니다.
+    """
+    def __init__(self, spec='', ranges=None):
+        # 해석하지 못한 항목 (호출 측에서 경고 출력용)
+        self.rejected = []
+        if ranges is None:
+            ranges = self._parse(str(spec))
+        self.ranges = self._coalesce(ranges)
+        self._starts = [start for start, _ in self.ranges]
+        self._offsets = []
+        total = 0
+        for start, end in self.ranges:
+            self._offsets.append(total)
+            total += end - start + 1
+        self._size = total
+
+    def _parse(self, spec, depth=0):
+        include, exclude = [], []
+        for part in spec.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            negate = part.startswith('!')
+            if negate:
+                part = part[1:].strip()
+            parsed = self._parse_part(part, depth)
+            if parsed is None:
+                self.rejected.append(part)
+                continue
+            (exclude if negate else include).extend(parsed)
+
+        if not include and exclude:
+            include = [(1, 65535)]
+        return self._subtract(self._coalesce(include), self._coalesce(exclude))
+
+    def _parse_part(self, part, depth):
+        name = part.lower()
+        if name in NAMED_PORT_SETS:
+            if depth > 2:
+                return None
+            return self._parse(NAMED_PORT_SETS[name], depth + 1)
+        try:
+            if '-' in part:
+                start, end = map(int, part.split('-', 1))
+            else:
+                start = end = int(part)
+        except ValueError:
+            return None
+        if not (is_valid_port(start) and is_valid_port(end)) or start > end:
+            return None
+        return [(start, end)]
+
+    @staticmethod
+    def _coalesce(ranges):
+        merged = []
+        for start, end in sorted(ranges):
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    @staticmethod
+    def _subtract(include, exclude):
+        result = []
+        for start, end in include:
+            for ex_start, ex_end in exclude:
+                if ex_end < start or ex_start > end:
+                    continue
+                if ex_start > start:
+                    result.append((start, ex_start - 1))
+                start = max(start, ex_end + 1)
+                if start > end:
+                    break
+            if start <= end:
+                result.append((start, end))
+        return result
+
+    def __or__(self, other):
+        return PortSet(ranges=self.ranges + other.ranges)
+
+    def __sub__(self, other):
+        return PortSet(ranges=self._subtract(self.ranges, other.ranges))
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    def __contains__(self, port):
+        slot = bisect.bisect_right(self._starts, port) - 1
+        return slot >= 0 and port <= self.ranges[slot][1]
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("port index out of range")
+        slot = bisect.bisect_right(self._offsets, index) - 1
+        return self.ranges[slot][0] + index - self._offsets[slot]
+
+    def index(self, port):
+        """port가 오름차순으로 몇 번째인지 (__getitem__의 역함수)"""
+        slot = bisect.bisect_right(self._starts, port) - 1
+        if slot < 0 or port > self.ranges[slot][1]:
+            raise ValueError(f"{port} is not in port set")
+        return self._offsets[slot] + port - self.ranges[slot][0]
+
+    def iter_from(self, index=0):
+        """index번째 포트부터 오름차순으로 생성"""
+        if index >= self._size:
+            return
+        slot = bisect.bisect_right(self._offsets, index) - 1
+        first = self.ranges[slot][0] + index - self._offsets[slot]
+        for start, end in self.ranges[slot:]:
+            yield from range(max(start, first), end + 1)
+
+    def __iter__(self):
+        return self.iter_from(0)
+
+    def __str__(self):
+        return ','.join(str(s) if s == e else f"{s}-{e}" for s, e in self.ranges)
+
+    def __repr__(self):
+        return f"PortSet('{self}')"
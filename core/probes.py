@@ -0,0 +1,114 @@
+# 포트 번호와 무관하게 서비스를 식별하기 위한 프로브/응답 매칭 데이터베이스
+import yaml
+
+from core.portset import PortSet
+from core.signatures import SignatureMatcher
+from utils.logger import app_logger as logger
+
+# 기본 프로브 목록 (Nmap service-probes 형식을 단순화)
+# - payload: 연결 후 보낼 데이터 (b''는 아무것도 보내지 않고 서버가 먼저 말하기를 기다리는 NULL 프로브)
+# - ports: 이 프로브에 응답할 가능성이 높은 포트 (해당 포트에서는 rarity와 관계없이 먼저 시도)
+# - rarity: 1(흔함) ~ 9(드묾). 낮은 순서로 시도하며 intensity보다 큰 프로브는 시도하지 않음
+# - wait: 응답 대기 상한(초). 없으면 배너 수집 timeout 전체를 기다림
+DEFAULT_PROBES = [
+    {'name': 'NULL', 'payload': b'', 'rarity': 1, 'wait': 0.5},
+    {'name': 'GetRequest', 'payload': b'GET / HTTP/1.0\r\n\r\n', 'rarity': 1,
+     'ports': '80-85,591,2301,3000,5000,8000-8010,8080-8090,8888,9000,9090,9443'},
+    {'name': 'GenericLines', 'payload': b'\r\n\r\n', 'rarity': 1,
+     'ports': '21,23,25,110,113,143,513-514,2323,5555,9999'},
+    {'name': 'TLSSessionReq', 'rarity': 2,
+     'ports': '443,465,636,853,993,995,5061,8443,9443',
+     'payload': (b'\x16\x03\x01\x00\x2d\x01\x00\x00\x29\x03\x03' + b'\x00' * 32 +
+                 b'\x00\x00\x02\x00\x2f\x01\x00')},
+    {'name': 'RTSPRequest', 'payload': b'OPTIONS / RTSP/1.0\r\n\r\n', 'rarity': 5,
+     'ports': '554,8554'},
+    {'name': 'RedisPing', 'payload': b'*1\r\n$4\r\nPING\r\n', 'rarity': 6, 'ports': '6379-6380'},
+    {'name': 'DNSVersionBindReqTCP', 'rarity': 5, 'ports': '53',
+     'payload': (b'\x00\x1e\x00\x06\x01\x00\x00\x01\x00\x00\x00\x00\x00\x00'
+                 b'\x07version\x04bind\x00\x00\x10\x00\x03')},
+    {'name': 'Memcached', 'payload': b'stats\r\n', 'rarity': 7, 'ports': '11211'},
+]
+
+# 응답 매칭 규칙 (위에서부터 처음 일치하는 규칙 사용)
+# - pattern: 응답 바이트에 적용할 정규식 (latin-1로 해석)
+# - version: 버전 문자열 템플릿. {1}, {2}... 는 캡처 그룹 (없으면 서비스 이름만 표시)
+DEFAULT_MATCHES = [
+    {'service': 'SSH', 'pattern': r'^SSH-([\d.]+)-([^\r\n]+)', 'version': '{2}'},
+    {'service': 'HTTP', 'pattern': r'^HTTP/1\.[01] \d\d\d[\s\S]*?\r\nServer: *([^\r\n]+)', 'version': '{1}'},
+    {'service': 'HTTP', 'pattern': r'^HTTP/1\.[01] \d\d\d'},
+    {'service': 'RTSP', 'pattern': r'^RTSP/1\.0 \d\d\d[\s\S]*?\r\nServer: *([^\r\n]+)', 'version': '{1}'},
+    {'service': 'RTSP', 'pattern': r'^RTSP/1\.0 \d\d\d'},
+    {'service': 'FTP', 'pattern': r'^220[- ]([^\r\n]*FTP[^\r\n]*)', 'version': '{1}'},
+    {'service': 'SMTP', 'pattern': r'^220[- ]([^\r\n]*?) *E?SMTP', 'version': '{1}'},
+    {'service': 'POP3', 'pattern': r'^\+OK ([^\r\n]*)', 'version': '{1}'},
+    {'service': 'IMAP', 'pattern': r'^\* OK ([^\r\n]*)', 'version': '{1}'},
+    {'service': 'MySQL', 'pattern': r'^[\s\S]\x00\x00\x00\x0a([\d.]+[\w.+-]*)\x00', 'version': '{1}'},
+    {'service': 'Redis', 'pattern': r'^\+PONG\r\n'},
+    {'service': 'Redis', 'pattern': r'^-NOAUTH ', 'version': 'auth required'},
+    {'service': 'Redis', 'pattern': r"^-ERR (wrong number of arguments for 'get'|unknown command)"},
+    {'service': 'Memcached', 'pattern': r'^STAT pid \d+\r\nSTAT uptime'},
+    {'service': 'VNC', 'pattern': r'^RFB (\d+\.\d+)\n', 'version': 'protocol {1}'},
+    {'service': 'Telnet', 'pattern': r'^\xff[\xfb-\xfe]'},
+    {'service': 'TLS', 'pattern': r'^\x16\x03[\x00-\x04]'},
+    {'service': 'TLS', 'pattern': r'^\x15\x03[\x00-\x04]\x00\x02'},
+    {'service': 'DNS', 'pattern': r'^\x00[\s\S]\x00\x06\x81'},
+]
+
+
+def _to_bytes(value):
+    """YAML 문자열("\\x16\\x03...")은 latin-1로 바이트 변환"""
+    if isinstance(value, bytes):
+        return value
+    return str(value or '').encode('latin-1')
+
+
+class Probe:
+    def __init__(self, name, payload=b'', ports='', rarity=5, wait=None):
+        self.name = name
+        self.payload = _to_bytes(payload)
+        self.ports = PortSet(ports) if ports else None
+        self.rarity = int(rarity)
+        self.wait = wait
+
+    def likely_for(self, port):
+        return self.ports is not None and port in self.ports
+
+
+class ProbeDatabase:
+    """
+    프로브 목록과 응답 매칭 규칙
+    probes_for(port): NULL 프로브 -> 해당 포트에 흔한 프로브 -> 나머지 (각각 rarity 순)
+    match(data): 응답을 모든 규칙에 대조해 처음 일치한 결과 (어떤 프로브의 응답이든 같은 규칙 사용)
+    """
+    def __init__(self, probes=None, matches=None, intensity=7):
+        self.probes = [Probe(**spec) for spec in (DEFAULT_PROBES if probes is None else probes)]
+        self.matches = DEFAULT_MATCHES if matches is None else matches
+        # 모든 매칭 규칙을 하나의 사전 필터로 컴파일
+        self.matcher = SignatureMatcher(
+            [(spec['service'], _to_bytes(spec['pattern']), spec.get('version')) for spec in self.matches])
+        self.intensity = intensity
+
+    @classmethod
+    def load(cls, path, intensity=7):
+        """
+        YAML 파일에서 프로브 DB 로드
+        파일 형식: {probes: [...], matches: [...]} (항목은 DEFAULT_PROBES/DEFAULT_MATCHES와 같음)
+        한쪽만 적으면 나머지는 기본값 사용
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = yaml.safe_load(f) or {}
+        db = cls(data.get('probes'), data.get('matches'), intensity)
+        logger.info(f"Probe database loaded from {path}: {len(db.probes)} probes, {len(db.matches)} match rules")
+        return db
+
+    def probes_for(self, port):
+        null_probes = [probe for probe in self.probes if not probe.payload]
+        likely = [probe for probe in self.probes if probe.payload and probe.likely_for(port)]
+        others = [probe for probe in self.probes
+                  if probe.payload and not probe.likely_for(port) and probe.rarity <= self.intensity]
+        return (sorted(null_probes, key=lambda p: p.rarity) + sorted(likely, key=lambda p: p.rarity)
+                + sorted(others, key=lambda p: p.rarity))
+
+    def match(self, data):
+        hit = self.matcher.first(data)
+        return str(hit) if hit else None
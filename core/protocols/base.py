@@ -1,5 +1,16 @@
 # core/protocols/base.py
+import asyncio
+
+
 class BaseProtocol:
+    """
+    프로토콜 핸들러 기본 클래스
+    - 새 핸들러는 async def handle_async(reader, writer)를 구현합니다.
+      이벤트 루프 하나에서 수천 개의 배너 교환을 동시에 진행할 수 있습니다.
+    - handle(socket)은 블로킹 소켓용 진입점으로, handle_async를 임시 이벤트 루프에서 실행합니다.
+    - handle(socket)만 구현한 기존(블로킹) 핸들러도 그대로 동작하며,
+      비동기 탐지에서는 스레드 풀에서 실행됩니다 (supports_async() == False).
+    """
     def __init__(self, port, timeout):
         self.port = port
         self.timeout = timeout
@@ -8,10 +19,57 @@ class BaseProtocol:
         """서버에 먼저 보낼 데이터가 있다면 구현 (예: HTTP GET)"""
         pass
 
+    def supports_async(self):
+        """handle_async로 실행할 수 있는지 (MRO에서 handle_async보다 handle을 먼저 재정의했으면 블로킹 핸들러)"""
+        for klass in type(self).__mro__:
+            if 'handle_async' in vars(klass):
+                return True
+            if 'handle' in vars(klass):
+                return False
+        return False
+
     def handle(self, socket):
-        """소켓 통신을 수행하고 배너 문자열을 리턴"""
+        """소켓 통신을 수행하고 배너 문자열을 리턴 (블로킹 소켓용)"""
+        return asyncio.run(self._handle_socket(socket))
+
+    async def _handle_socket(self, sock):
+        reader, writer = await asyncio.open_connection(sock=sock)
+        try:
+            return await self.handle_async(reader, writer)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def handle_async(self, reader, writer):
+        """스트림으로 통신을 수행하고 받은 데이터를 리턴"""
         # 기본 동작: 그냥 받기
-        return socket.recv(4096)
+        return await self.read(reader, 4096)
+
+    # ---------------------------------------------------------
+    # handle_async 구현용 헬퍼
+    # ---------------------------------------------------------
+    async def read(self, reader, size=4096, timeout=None):
+        """최대 size 바이트 수신 (timeout 안에 응답이 없거나 연결이 끊기면 b'')"""
+        try:
+            return await asyncio.wait_for(reader.read(size), timeout or self.timeout)
+        except (asyncio.TimeoutError, OSError):
+            return b''
+
+    async def read_exact(self, reader, size, timeout=None):
+        """정확히 size 바이트 수신 (중간에 끊기거나 timeout이면 받은 만큼만)"""
+        try:
+            return await asyncio.wait_for(reader.readexactly(size), timeout or self.timeout)
+        except asyncio.IncompleteReadError as e:
+            return e.partial
+        except (asyncio.TimeoutError, OSError):
+            return b''
+
+    async def send(self, writer, data):
+        writer.write(data)
+        await writer.drain()
 
     def parse(self, data):
         """받은 데이터를 해석해서 버전 정보 리턴"""
@@ -19,4 +77,4 @@ class BaseProtocol:
         try:
             return data.decode('utf-8').strip()
         except:
-            return str(data)
\ No newline at end of file
+            return str(data)
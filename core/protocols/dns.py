@@ -1,75 +1,276 @@
+import collections
+import random
+import select
 import socket
 import struct
+import time
+from core.protocols.base import BaseProtocol
+from utils.logger import app_logger as logger
 
-class DnsProtocol:
-    def __init__(self, port, timeout):
-        self.port = port
-        self.timeout = timeout
+# CHAOS 클래스 TXT 질의로 서버 소프트웨어/인스턴스 정보 확인
+CHAOS_NAMES = ('version.bind', 'hostname.bind', 'id.server')
+QTYPE_TXT = 16
+QCLASS_CH = 3
+FLAG_TRUNCATED = 0x0200
+RECV_BUFFER_SIZE = 4 * 1024 * 1024
+NON_PRINTABLE = bytes(range(0, 32)) + bytes(range(127, 256))
+
+
+def build_query(txid, name, qtype=QTYPE_TXT, qclass=QCLASS_CH):
+    """DNS 질의 패킷 (헤더 + Question 1개, RD 비트 설정)"""
+    qname = b''.join(bytes([len(label)]) + label.encode() for label in name.split('.')) + b'\x00'
+    header = struct.pack('!HHHHHH', txid, 0x0100, 1, 0, 0, 0)
+    return header + qname + struct.pack('!HH', qtype, qclass)
+
+
+def _read_name(view, pos, decode=True):
+    """
+    압축 포인터를 따라가며 이름 읽기 -> (이름, 이름 다음 위치). 패킷 범위를 벗어나면 ValueError
+    decode=False면 이름을 만들지 않고 건너뛰기만 함 (이름은 None)
+    """
+    labels = [] if decode else None
+    end = None
+    size = len(view)
+    for _ in range(64):
+        if pos >= size:
+            raise ValueError("truncated DNS name")
+        length = view[pos]
+        if length >= 0xC0:
+            if pos + 2 > size:
+                raise ValueError("truncated DNS name pointer")
+            if not decode:
+                return None, pos + 2
+            if end is None:
+                end = pos + 2
+            pos = ((length & 0x3F) << 8) | view[pos + 1]
+            continue
+        if length == 0:
+            name = b'.'.join(labels).decode('ascii', 'replace') if decode else None
+            return name, end if end is not None else pos + 1
+        if pos + 1 + length > size:
+            raise ValueError("truncated DNS label")
+        if decode:
+            labels.append(view[pos + 1:pos + 1 + length].tobytes())
+        pos += 1 + length
+    raise ValueError("DNS name pointer loop")
+
+
+def parse_response(data, want_name=True):
+    """
+    DNS 응답 해석 (bytes/bytearray/memoryview 모두 복사 없이 처리)
+    :param want_name: False면 질의 이름을 해석하지 않음 (None)
+    :return: (txid, flags, 질의 이름, TXT 문자열 목록)
+    :raises ValueError: 잘렸거나 형식이 맞지 않는 패킷
+    """
+    view = memoryview(data)
+    size = len(view)
+    if size < 12:
+        raise ValueError("short DNS response")
+    txid, flags, qdcount, ancount = struct.unpack_from('!HHHH', view, 0)
+    pos = 12
+    qname = None
+    for _ in range(qdcount):
+        name, pos = _read_name(view, pos, want_name and qname is None)
+        qname = qname or name
+        pos += 4
+    texts = []
+    for _ in range(ancount):
+        _, pos = _read_name(view, pos, False)
+        if pos + 10 > size:
+            raise ValueError("truncated DNS answer")
+        rtype, _, _, rd_len = struct.unpack_from('!HHIH', view, pos)
+        pos += 10
+        rd_end = pos + rd_len
+        if rd_end > size:
+            raise ValueError("truncated DNS RDATA")
+        if rtype == QTYPE_TXT:
+            # TXT RDATA: (길이 1바이트 + 문자열)의 반복, 출력 가능한 ASCII만 남김
+            offset = pos
+            while offset < rd_end:
+                text_end = min(offset + 1 + view[offset], rd_end)
+                texts.append(bytes(view[offset + 1:text_end]).translate(None, NON_PRINTABLE).decode('ascii'))
+                offset = text_end
+        pos = rd_end
+    return txid, flags, qname, texts
 
-    def handle(self, sock):
+
+class DnsProtocol(BaseProtocol):
+    def __init__(self, port, timeout, name='version.bind'):
+        super().__init__(port, timeout)
+        self.name = name
+
+    async def handle_async(self, reader, writer):
         # version.bind 쿼리용 DNS 패킷 생성 (TCP)
         # DNS 헤더 + Question: version.bind, class=CH, type=TXT
         # TCP는 2바이트 길이 prefix 필요
-        qname = b'\x07version\x04bind\x00'  # version.bind
-        qtype = 16  # TXT
-        qclass = 3  # CH (Chaosnet)
-        header = struct.pack('!HHHHHH', 0x1234, 0x0100, 1, 0, 0, 0)
-        question = qname + struct.pack('!HH', qtype, qclass)
-        dns_packet = header + question
+        dns_packet = build_query(random.randint(0, 0xffff), self.name)
         tcp_packet = struct.pack('!H', len(dns_packet)) + dns_packet
-        sock.sendall(tcp_packet)
+        await self.send(writer, tcp_packet)
         # TCP DNS 응답: 2바이트 길이 prefix 후 데이터
-        resp_len = sock.recv(2)
-        if not resp_len:
+        resp_len = await self.read_exact(reader, 2)
+        if len(resp_len) < 2:
             return b''
         resp_len = struct.unpack('!H', resp_len)[0]
-        data = b''
-        while len(data) < resp_len:
-            chunk = sock.recv(resp_len - len(data))
-            if not chunk:
-                break
-            data += chunk
-        return data
+        return await self.read_exact(reader, resp_len)
 
     def parse(self, data):
         if not data or len(data) < 12:
             return 'DNS (No Response)'
-            
-        pos = 12
-        # Question Section 스킵
-        while data[pos] != 0:
-            pos += 1
-        pos += 5 
-        
-        # Answer Section
-        if pos >= len(data): return 'DNS (No Answer)'
-
-        # Name 필드 스킵 (압축 포인터 C0 xx 또는 일반 라벨)
-        # BIND 응답은 보통 C0 0C (2바이트)로 오지만, 안전하게 처리하려면:
-        if (data[pos] & 0xC0) == 0xC0:
-            pos += 2 # 포인터인 경우 2바이트 스킵
-        else:
-            while data[pos] != 0: pos += 1 # 포인터가 아니면 null 만날때까지
-            pos += 1
-            
-        # Type(2) + Class(2) + TTL(4) 스킵 = 8바이트
-        pos += 8
-        
-        # RDLENGTH (데이터 길이) 읽기 - 2바이트 Big Endian!
-        if pos + 2 > len(data): return 'DNS (Malformed)'
-        rd_len = struct.unpack('!H', data[pos:pos+2])[0]
-        pos += 2
-        
-        # 실제 TXT 데이터 읽기
-        # TXT 레코드는 맨 앞에 '문자열 길이(1byte)'가 포함될 수 있음 (BIND 버전에 따라 다름)
-        # 단순히 남은 데이터를 다 읽거나, rd_len 만큼 읽어서 출력 가능한 것만 필터링하는 게 안전
         try:
-            txt_data = data[pos:pos+rd_len]
-            # TXT 레코드 내부의 첫 바이트가 길이일 수 있으므로 제거하거나 무시
-            if len(txt_data) > 0:
-                # 출력 가능한 문자만 필터링 (바이너리 찌꺼기 제거)
-                version = ''.join([chr(b) for b in txt_data if 32 <= b <= 126])
-                return f'DNS Version: {version}'
-            return 'DNS Version: (Empty)'
-        except Exception:
-            return 'DNS Version: (Parse Error)'
\ No newline at end of file
+            _, _, _, texts = parse_response(data, want_name=False)
+        except ValueError:
+            return 'DNS (Malformed)'
+        if not texts:
+            return 'DNS (No Answer)'
+        version = ' '.join(texts)
+        return f'DNS Version: {version}' if version else 'DNS Version: (Empty)'
+
+
+class DnsUdpProber:
+    """
+    UDP 소켓 하나로 여러 호스트에 CHAOS TXT 질의(version.bind 등)를 보내고 응답을 비동기로 매칭
+    - 질의마다 고유한 트랜잭션 ID를 쓰고, (응답 IP, ID, 질의 이름)이 맞는 응답만 인정
+    - 보내는 동안에도 수신을 계속하며, window개 이상 응답을 기다리는 중이면 전송을 잠시 멈춤
+    - timeout 안에 응답이 없으면 retries번까지 다시 보냄
+    - TC(잘림) 비트가 선 응답만 TCP로 다시 질의
+    """
+    def __init__(self, timeout=2.0, names=CHAOS_NAMES, retries=1, window=4096, rate=None):
+        self.timeout = timeout
+        # 응답의 질의 이름은 소문자로 비교하므로 설정값도 소문자로 (끝의 '.'은 제외)
+        self.names = tuple(name.lower().rstrip('.') for name in names)
+        self.retries = retries
+        self.window = window
+        self.rate = rate
+        self._next_id = random.randint(0, 0xffff)
+        # 응답 수신용 버퍼 (패킷마다 새로 할당하지 않음)
+        self._buffer = bytearray(4096)
+        self._view = memoryview(self._buffer)
+
+    def _txid(self):
+        self._next_id = (self._next_id + 1) & 0xffff
+        return self._next_id
+
+    def probe(self, hosts, port=53):
+        """
+        :param hosts: IP 문자열 iterable (필요할 때 하나씩 꺼냄)
+        :return: {ip: {질의 이름: 응답 문자열}} (응답한 호스트만)
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER_SIZE)
+        sock.setblocking(False)
+
+        queries = ((ip, name, 0) for ip in hosts for name in self.names)
+        retry_queue = collections.deque()
+        # (ip, txid) -> (질의 이름, 시도 횟수)
+        pending = {}
+        # 보낸 순서 = 만료 순서 (timeout이 일정하므로)
+        deadlines = collections.deque()
+        results = {}
+        truncated = []
+        exhausted = False
+
+        try:
+            while True:
+                # 1. 전송 (대기 중인 질의가 window를 넘지 않는 범위에서)
+                while len(pending) < self.window:
+                    if retry_queue:
+                        query = retry_queue.popleft()
+                    elif not exhausted:
+                        query = next(queries, None)
+                        if query is None:
+                            exhausted = True
+                            continue
+                    else:
+                        break
+                    if self.rate:
+                        delay = self.rate.try_acquire()
+                        while delay is None:
+                            self._receive(sock, pending, results, truncated, 0.001)
+                            delay = self.rate.try_acquire()
+                        if delay > 0:
+                            time.sleep(delay)
+                    ip, name, attempt = query
+                    txid = self._txid()
+                    try:
+                        sock.sendto(build_query(txid, name), (ip, port))
+                    except BlockingIOError:
+                        retry_queue.appendleft(query)
+                        break
+                    except OSError as e:
+                        logger.debug(f"DNS UDP send to {ip} failed: {e}")
+                        continue
+                    pending[(ip, txid)] = (name, attempt)
+                    deadlines.append((time.monotonic() + self.timeout, ip, txid))
+
+                if exhausted and not retry_queue and not pending:
+                    break
+
+                # 2. 수신
+                wait = max(0.0, deadlines[0][0] - time.monotonic()) if deadlines else 0.05
+                self._receive(sock, pending, results, truncated, min(wait, 0.05))
+
+                # 3. 만료 처리 (재전송 또는 포기)
+                now = time.monotonic()
+                while deadlines and deadlines[0][0] <= now:
+                    _, ip, txid = deadlines.popleft()
+                    entry = pending.pop((ip, txid), None)
+                    if entry is None:
+                        continue
+                    name, attempt = entry
+                    if self.rate:
+                        self.rate.on_drop()
+                    if attempt < self.retries:
+                        retry_queue.append((ip, name, attempt + 1))
+        finally:
+            sock.close()
+
+        # 4. 잘린 응답은 TCP로 다시 질의
+        for ip, name in truncated:
+            value = self._query_tcp(ip, port, name)
+            if value:
+                results.setdefault(ip, {})[name] = value
+        return results
+
+    def _receive(self, sock, pending, results, truncated, wait):
+        readable, _, _ = select.select([sock], [], [], wait)
+        if not readable:
+            return
+        while True:
+            try:
+                size, (ip, _) = sock.recvfrom_into(self._buffer)
+            except BlockingIOError:
+                return
+            except OSError:
+                # ICMP port unreachable 등
+                continue
+            try:
+                txid, flags, qname, texts = parse_response(self._view[:size])
+            except ValueError:
+                continue
+            entry = pending.get((ip, txid))
+            if entry is None or (qname or '').lower() != entry[0]:
+                continue
+            del pending[(ip, txid)]
+            if self.rate:
+                self.rate.on_response()
+            if flags & FLAG_TRUNCATED:
+                truncated.append((ip, entry[0]))
+            elif texts:
+                results.setdefault(ip, {})[entry[0]] = ' '.join(texts)
+
+    def _query_tcp(self, ip, port, name):
+        handler = DnsProtocol(port, self.timeout, name=name)
+        try:
+            with socket.create_connection((ip, port), timeout=self.timeout) as sock:
+                data = handler.handle(sock)
+            _, _, _, texts = parse_response(data)
+            return ' '.join(texts)
+        except Exception as e:
+            logger.debug(f"DNS TCP fallback to {ip} failed: {e}")
+            return None
+
+    @staticmethod
+    def format(answers):
+        """{이름: 값} -> 배너 문자열"""
+        parts = [f"{name}={value}" for name, value in answers.items()]
+        return f"DNS ({', '.join(parts)})"
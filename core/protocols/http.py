@@ -1,63 +1,245 @@
+import asyncio
+import hashlib
 import re
 from core.protocols.base import BaseProtocol
 
+USER_AGENT = b"Mozila/5.0 (Compatible; SecurityScanner/1.0)"
+# 헤더 블록 상한 / 본문을 읽는 상한 (바이트)
+HTTP_MAX_HEADER = 16384
+HTTP_MAX_BODY = 65536
+TITLE_PATTERN = re.compile(rb'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+TITLE_END = b'</title>'
+
+
+class HttpResponseParser:
+    """
+    HTTP 응답을 받는 대로 넣으면(feed) 상태 코드, 헤더, Title을 점진적으로 추출하는 파서
+    - headers_done: 헤더 블록(\\r\\n\\r\\n)까지 받음
+    - complete: 응답 본문 끝까지 받음 (Content-Length / chunked 기준) -> 같은 연결로 다음 요청 가능
+    - enough: 배너에 필요한 정보를 모두 얻음 (헤더 + Title 또는 본문 끝) -> 더 읽을 필요 없음
+    본문은 HTTP_MAX_BODY까지만 보관하며, Title은 새로 들어온 부분만 검사합니다.
+    """
+    HEADERS, BODY_LENGTH, CHUNK_SIZE, CHUNK_DATA, CHUNK_CRLF, TRAILER, UNTIL_CLOSE, DONE = range(8)
+
+    def __init__(self, keep_body=False):
+        # keep_body: 본문 전체가 필요한 경우 (예: favicon 해시) - Title을 찾아도 멈추지 않음
+        self.keep_body = keep_body
+        self.state = self.HEADERS
+        self.buffer = bytearray()
+        self.status_code = None
+        self.headers = {}
+        self.body = bytearray()
+        self.title = None
+        self.truncated = False
+        # 본문 길이 정보가 없어 서버가 연결을 닫을 때까지 읽는 응답인지
+        self.until_close = False
+        self._remaining = 0
+        self._title_scanned = 0
+
+    @property
+    def headers_done(self):
+        return self.state != self.HEADERS
+
+    @property
+    def complete(self):
+        return self.state == self.DONE
+
+    @property
+    def enough(self):
+        if self.complete or self.truncated:
+            return True
+        if not self.headers_done or self.keep_body:
+            return False
+        # HTML이 아니면 헤더만으로 충분, HTML이면 Title까지
+        return self.title is not None or 'html' not in self.headers.get('content-type', 'html')
+
+    @property
+    def reusable(self):
+        """keep-alive로 다음 요청을 보낼 수 있는지 (연결 종료로 끝난 응답은 불가)"""
+        return (self.complete and not self.until_close
+                and 'close' not in self.headers.get('connection', '').lower())
+
+    def feed(self, data):
+        self.buffer += data
+        while self.buffer and self.state != self.DONE:
+            if not self._step():
+                break
+        if self.state == self.HEADERS and len(self.buffer) > HTTP_MAX_HEADER:
+            self.truncated = True
+
+    def eof(self):
+        """서버가 연결을 닫음 - 길이 정보 없이 닫힐 때까지 보내는 응답의 끝"""
+        if self.state == self.UNTIL_CLOSE:
+            self.state = self.DONE
+
+    def _step(self):
+        """현재 상태에서 처리할 수 있는 만큼 처리 (더 받아야 하면 False)"""
+        if self.state == self.HEADERS:
+            end = self.buffer.find(b'\r\n\r\n')
+            if end < 0:
+                return False
+            self._parse_headers(bytes(self.buffer[:end]))
+            del self.buffer[:end + 4]
+            return True
+
+        if self.state == self.BODY_LENGTH or self.state == self.CHUNK_DATA:
+            take = min(self._remaining, len(self.buffer))
+            self._append_body(self.buffer[:take])
+            del self.buffer[:take]
+            self._remaining -= take
+            if self._remaining:
+                return False
+            self.state = self.DONE if self.state == self.BODY_LENGTH else self.CHUNK_CRLF
+            return True
+
+        if self.state == self.UNTIL_CLOSE:
+            self._append_body(self.buffer)
+            self.buffer.clear()
+            return False
+
+        # chunked 인코딩의 줄 단위 부분
+        end = self.buffer.find(b'\r\n')
+        if end < 0:
+            return False
+        line = bytes(self.buffer[:end])
+        del self.buffer[:end + 2]
+        if self.state == self.CHUNK_SIZE:
+            try:
+                self._remaining = int(line.split(b';', 1)[0].strip() or b'0', 16)
+            except ValueError:
+                self.truncated = True
+                return False
+            self.state = self.CHUNK_DATA if self._remaining else self.TRAILER
+        elif self.state == self.CHUNK_CRLF:
+            self.state = self.CHUNK_SIZE
+        elif self.state == self.TRAILER and not line:
+            self.state = self.DONE
+        return True
+
+    def _parse_headers(self, block):
+        lines = block.decode('latin-1').split('\r\n')
+        # 1. 상태 코드 (첫 줄) 예: HTTP/1.1 200 OK
+        parts = lines[0].split(' ', 2)
+        if len(parts) > 1 and parts[1].isdigit():
+            self.status_code = int(parts[1])
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                self.headers[name.strip().lower()] = value.strip()
+
+        if self.status_code is not None and (100 <= self.status_code < 200 or self.status_code in (204, 304)):
+            self.state = self.DONE
+        elif 'chunked' in self.headers.get('transfer-encoding', '').lower():
+            self.state = self.CHUNK_SIZE
+        elif self.headers.get('content-length', '').isdigit():
+            self._remaining = int(self.headers['content-length'])
+            self.state = self.BODY_LENGTH if self._remaining else self.DONE
+        else:
+            self.state = self.UNTIL_CLOSE
+            self.until_close = True
+
+    def _append_body(self, data):
+        room = HTTP_MAX_BODY - len(self.body)
+        if len(data) > room:
+            # 상한을 넘는 본문은 더 읽지 않음 (이 연결은 재사용하지 않음)
+            self.truncated = True
+        self.body += data[:room]
+        if self.title is None:
+            # 직전 검사 위치에서 '</title>' 길이만큼 겹쳐서 새로 들어온 부분만 검사
+            start = max(0, self._title_scanned - len(TITLE_END))
+            if self.body[start:].lower().find(TITLE_END) >= 0:
+                match = TITLE_PATTERN.search(self.body)
+                if match:
+                    self.title = match.group(1).decode('utf-8', errors='ignore').strip()
+            self._title_scanned = len(self.body)
+
+
 class HttpProtocol(BaseProtocol):
-    def handle(self, sock):
+    def __init__(self, port, timeout, paths=('/',)):
+        """
+        :param paths: 요청할 경로 목록. 서버가 keep-alive를 지원하면 연결 하나로 차례대로 요청
+                      ('/favicon.ico'는 본문 MD5를 기록)
         """
-        HTTP GET 요청 전송
+        super().__init__(port, timeout)
+        self.paths = list(paths) or ['/']
+
+    async def handle_async(self, reader, writer):
+        """
+        경로마다 HTTP GET 요청 전송 후 응답을 점진적으로 해석
+        - 마지막 요청은 헤더 + Title을 얻으면 바로 종료
+        - 뒤에 요청이 남아 있으면 본문 끝까지 읽어 연결을 재사용 (불가능하면 새로 연결)
         """
-        # HTTP 1.1은 Host 헤더가 필수입니다. (IP라도 넣어주는 게 정석)
-        # Connection: close를 명시해서 서버가 응답 후 바로 끊게 유도합니다.
-        request = (
-            b"GET / HTTP/1.1\r\n"
-            b"Host: target\r\n"
-            b"User-Agent: Mozila/5.0 (Compatible; SecurityScanner/1.0)\r\n"
-            b"Connection: close\r\n"
-            b"\r\n"
-        )
-        sock.sendall(request)
-        
-        # 데이터 수신 (HTTP는 헤더+바디가 있어서 4096보다 클 수 있음)
-        # 여기서는 간단히 앞부분(헤더 포함)만 받아서 분석
+        peer = writer.get_extra_info('peername')
+        host = peer[0].encode() if peer else b"target"
+        responses = []
+        opened = []
         try:
-            return sock.recv(8192)
-        except:
-            return b""
+            for index, path in enumerate(self.paths):
+                last = index == len(self.paths) - 1
+                if writer is None:
+                    if not peer:
+                        break
+                    reader, writer = await asyncio.wait_for(asyncio.open_connection(peer[0], peer[1]), self.timeout)
+                    opened.append(writer)
+
+                # HTTP 1.1은 Host 헤더가 필수입니다. (IP라도 넣어주는 게 정석)
+                # 마지막 요청은 Connection: close로 서버가 응답 후 바로 끊게 유도합니다.
+                request = (
+                    b"GET " + path.encode() + b" HTTP/1.1\r\n"
+                    b"Host: " + host + b"\r\n"
+                    b"User-Agent: " + USER_AGENT + b"\r\n"
+                    b"Connection: " + (b"close" if last else b"keep-alive") + b"\r\n"
+                    b"\r\n"
+                )
+                await self.send(writer, request)
+
+                response = HttpResponseParser(keep_body=not last or path == '/favicon.ico')
+                while not (response.complete or response.truncated or (last and response.enough)):
+                    chunk = await self.read(reader, 4096)
+                    if not chunk:
+                        response.eof()
+                        break
+                    response.feed(chunk)
+                responses.append((path, response))
+
+                if not response.reusable:
+                    writer = None
+        finally:
+            for extra in opened:
+                extra.close()
+        return responses
 
     def parse(self, data):
         """
-        HTTP 응답에서 Server 헤더, Title, 상태 코드 추출
+        HTTP 응답에서 Server 헤더, Title, 상태 코드, 리다이렉트 위치 추출
+        data: handle 결과 [(경로, HttpResponseParser)] 또는 원본 응답 바이트
         """
-        if not data:
+        if isinstance(data, (bytes, bytearray)):
+            response = HttpResponseParser()
+            response.feed(data)
+            response.eof()
+            data = [('/', response)] if data else []
+        if not data or data[0][1].status_code is None:
             return "HTTP (No Response)"
-            
+
         try:
-            text = data.decode('utf-8', errors='ignore')
-            lines = text.split('\r\n')
-            
-            # 1. 상태 코드 (첫 줄) 예: HTTP/1.1 200 OK
-            status_line = lines[0] if lines else "Unknown"
-            status_code = "Unknown"
-            if " " in status_line:
-                parts = status_line.split(" ")
-                if len(parts) > 1:
-                    status_code = parts[1] # 200, 404 등
-
-            # 2. Server 헤더 찾기
-            server_info = "Unknown Server"
-            for line in lines:
-                if line.lower().startswith("server:"):
-                    server_info = line.split(":", 1)[1].strip()
-                    break
-            
-            # 3. HTML Title 태그 찾기 (간단한 정규식)
-            title = "No Title"
-            title_match = re.search(r'<title>(.*?)</title>', text, re.IGNORECASE | re.DOTALL)
-            if title_match:
-                title = title_match.group(1).strip()[:30] # 너무 길면 자름
+            path, response = data[0]
+            status_code = response.status_code
+            server_info = response.headers.get('server', "Unknown Server")
+            title = response.title[:30] if response.title else "No Title" # 너무 길면 자름
 
             # 결과 조합
-            return f"HTTP ({server_info} | Status: {status_code} | Title: {title})"
+            result = f"HTTP ({server_info} | Status: {status_code} | Title: {title}"
+            if 300 <= status_code < 400 and 'location' in response.headers:
+                result += f" | Redirect: {response.headers['location']}"
+            for path, extra in data[1:]:
+                if extra.status_code is None:
+                    continue
+                if path == '/favicon.ico' and extra.status_code == 200 and extra.body:
+                    result += f" | Favicon MD5: {hashlib.md5(bytes(extra.body)).hexdigest()}"
+                else:
+                    result += f" | {path}: {extra.status_code}"
+            return result + ")"
 
         except Exception as e:
-            return f"HTTP (Parse Error: {e})"
\ No newline at end of file
+            return f"HTTP (Parse Error: {e})"
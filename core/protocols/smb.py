@@ -1,80 +1,385 @@
-import socket
 import struct
-import re
+import uuid
 from core.protocols.base import BaseProtocol
 
+# Negotiate 응답 대기 시 timeout에 더하는 시간 (초)
+SMB_EXTRA_WAIT = 2.0
+# NetBIOS 세션 메시지 하나로 받을 최대 크기 (이보다 크면 잘못된 응답으로 봄)
+SMB_MAX_MESSAGE = 131072
+
+SMB1_MAGIC = b'\xffSMB'
+SMB2_MAGIC = b'\xfeSMB'
+SMB1_NEGOTIATE, SMB1_SESSION_SETUP = 0x72, 0x73
+SMB2_NEGOTIATE, SMB2_SESSION_SETUP = 0x0000, 0x0001
+
+# SMB1 Negotiate에 보내는 dialect 목록 (응답의 DialectIndex가 이 순서를 가리킴)
+# SMB 2.002 / SMB 2.???가 있으면 SMB2를 지원하는 서버는 SMB2 Negotiate 응답으로 답함
+SMB1_DIALECTS = (
+    'PC NETWORK PROGRAM 1.0', 'LANMAN1.0', 'Windows for Workgroups 3.1a', 'LM1.2X002',
+    'LANMAN2.1', 'NT LM 0.12', 'SMB 2.002', 'SMB 2.???',
+)
+SMB2_DIALECTS = {
+    0x0202: 'SMB 2.0.2', 0x0210: 'SMB 2.1', 0x0300: 'SMB 3.0', 0x0302: 'SMB 3.0.2',
+    0x0311: 'SMB 3.1.1', 0x02ff: 'SMB 2.???',
+}
+# 두 번째 SMB2 Negotiate에서 제안할 dialect (3.1.1은 negotiate context가 필요해 제외)
+SMB2_REQUEST_DIALECTS = (0x0202, 0x0210, 0x0300, 0x0302)
+
+FLAGS2_LONG_NAMES = 0x0001
+FLAGS2_EXTENDED_SECURITY = 0x0800
+FLAGS2_NT_STATUS = 0x4000
+FLAGS2_UNICODE = 0x8000
+CAP_NT_STATUS = 0x00000040
+CAP_EXTENDED_SECURITY = 0x80000000
+
+NTLMSSP_SIGNATURE = b'NTLMSSP\x00'
+# UNICODE | OEM | REQUEST_TARGET | NTLM | ALWAYS_SIGN | EXTENDED_SESSIONSECURITY | VERSION | 128 | 56
+NTLMSSP_NEGOTIATE_FLAGS = 0xA2088207
+NTLMSSP_NEGOTIATE_VERSION = 0x02000000
+# NTLMSSP CHALLENGE의 AV pair 종류 -> 결과 키
+NTLM_AV_FIELDS = {1: 'netbios_name', 2: 'netbios_domain', 3: 'dns_name', 4: 'dns_domain'}
+# SPNEGO / NTLMSSP 메커니즘 OID (DER)
+SPNEGO_OID = bytes.fromhex('06062b0601050502')
+NTLMSSP_OID = bytes.fromhex('060a2b06010401823702020a')
+
+
+# ---------------------------------------------------------
+# 요청 패킷 생성
+# ---------------------------------------------------------
+def _netbios(message):
+    """NetBIOS Session Service 헤더 (type 0, 길이 3바이트)"""
+    return b'\x00' + len(message).to_bytes(3, 'big') + message
+
+
+def _smb1_header(command, flags2):
+    # Protocol, Command, Status, Flags, Flags2, PID High, Signature, Reserved, TID, PID, UID, MID
+    return struct.pack('<4sBIBHH8sHHHHH', SMB1_MAGIC, command, 0, 0x18, flags2, 0, b'\x00' * 8, 0, 0,
+                       0x4b2f, 0, 0)
+
+
+def _smb2_header(command, message_id):
+    # ProtocolId, StructureSize, CreditCharge, Status, Command, CreditRequest, Flags, NextCommand,
+    # MessageId, Reserved(ProcessId), TreeId, SessionId, Signature
+    return struct.pack('<4sHHIHHIIQIIQ16s', SMB2_MAGIC, 64, 0, 0, command, 1, 0, 0, message_id, 0, 0, 0,
+                       b'\x00' * 16)
+
+
+def _der(tag, content):
+    length = len(content)
+    if length < 0x80:
+        encoded = bytes([length])
+    else:
+        size = (length.bit_length() + 7) // 8
+        encoded = bytes([0x80 | size]) + length.to_bytes(size, 'big')
+    return bytes([tag]) + encoded + content
+
+
+def _ntlm_negotiate_token():
+    """SPNEGO NegTokenInit으로 감싼 NTLMSSP NEGOTIATE (익명 세션 설정 1단계)"""
+    ntlm = NTLMSSP_SIGNATURE + struct.pack('<II8s8s', 1, NTLMSSP_NEGOTIATE_FLAGS, b'\x00' * 8, b'\x00' * 8)
+    neg_token_init = _der(0x30, _der(0xa0, _der(0x30, NTLMSSP_OID)) + _der(0xa2, _der(0x04, ntlm)))
+    return _der(0x60, SPNEGO_OID + _der(0xa0, neg_token_init))
+
+
+def build_smb1_negotiate():
+    dialects = b''.join(b'\x02' + name.encode() + b'\x00' for name in SMB1_DIALECTS)
+    flags2 = FLAGS2_LONG_NAMES | FLAGS2_EXTENDED_SECURITY | 0x2000
+    return _netbios(_smb1_header(SMB1_NEGOTIATE, flags2) + struct.pack('<BH', 0, len(dialects)) + dialects)
+
+
+def build_smb1_session_setup(extended):
+    """
+    익명 Session Setup AndX (NativeOS/NativeLanMan은 문자열 필드를 ASCII로 받도록 UNICODE 플래그 없이)
+    :param extended: 서버가 확장 보안(CAP_EXTENDED_SECURITY)을 쓰면 NTLMSSP 토큰을 실어 보냄
+    """
+    if extended:
+        blob = _ntlm_negotiate_token()
+        words = struct.pack('<BBHHHHIHII', 0xff, 0, 0, 4356, 10, 0, 0, len(blob), 0,
+                            CAP_NT_STATUS | CAP_EXTENDED_SECURITY)
+        data = blob + b'\x00\x00'
+        flags2 = FLAGS2_LONG_NAMES | FLAGS2_EXTENDED_SECURITY | FLAGS2_NT_STATUS
+    else:
+        # 빈 계정/비밀번호 (null session)
+        words = struct.pack('<BBHHHHIHHII', 0xff, 0, 0, 4356, 10, 0, 0, 0, 0, 0, CAP_NT_STATUS)
+        data = b'\x00\x00\x00\x00'
+        flags2 = FLAGS2_LONG_NAMES | FLAGS2_NT_STATUS
+    body = bytes([len(words) // 2]) + words + struct.pack('<H', len(data)) + data
+    return _netbios(_smb1_header(SMB1_SESSION_SETUP, flags2) + body)
+
+
+def build_smb2_negotiate(message_id):
+    body = struct.pack('<HHHHI16sQ', 36, len(SMB2_REQUEST_DIALECTS), 1, 0, 0, b'\x00' * 16, 0)
+    body += struct.pack(f'<{len(SMB2_REQUEST_DIALECTS)}H', *SMB2_REQUEST_DIALECTS)
+    return _netbios(_smb2_header(SMB2_NEGOTIATE, message_id) + body)
+
+
+def build_smb2_session_setup(message_id):
+    blob = _ntlm_negotiate_token()
+    body = struct.pack('<HBBIIHHQ', 25, 0, 1, 0, 0, 64 + 24, len(blob), 0) + blob
+    return _netbios(_smb2_header(SMB2_SESSION_SETUP, message_id) + body)
+
+
+# ---------------------------------------------------------
+# 응답 해석 (memoryview + struct.unpack_from, 범위를 벗어나면 ValueError)
+# ---------------------------------------------------------
+def _unpack(fmt, view, offset, what):
+    if offset + struct.calcsize(fmt) > len(view):
+        raise ValueError(f"truncated {what}")
+    return struct.unpack_from(fmt, view, offset)
+
+
+def _read_string(view, pos, end, unicode, align=True):
+    """
+    NUL로 끝나는 문자열 -> (문자열, 다음 위치). 끝에 NUL이 없으면 남은 부분 전체
+    align: UTF-16 문자열 앞에 2바이트 정렬용 패딩이 있는지 (Negotiate 응답의 도메인/서버 이름은 패딩 없음)
+    """
+    if unicode:
+        if align:
+            pos += pos & 1
+        raw = view[pos:end].tobytes()
+        for index in range(0, len(raw) - 1, 2):
+            if raw[index] == 0 and raw[index + 1] == 0:
+                return raw[:index].decode('utf-16-le', 'replace'), pos + index + 2
+        return raw.decode('utf-16-le', 'replace'), end
+    raw = view[pos:end].tobytes()
+    index = raw.find(b'\x00')
+    if index < 0:
+        return raw.decode('latin-1'), end
+    return raw[:index].decode('latin-1'), pos + index + 1
+
+
+def _signing(enabled, required):
+    return 'required' if required else ('enabled' if enabled else 'disabled')
+
+
+def _guid(raw):
+    raw = bytes(raw)
+    return None if raw == b'\x00' * 16 else str(uuid.UUID(bytes_le=raw))
+
+
+def parse_smb1_negotiate(view):
+    """SMB1 Negotiate 응답 -> dialect, signing, guid, domain, server, extended_security"""
+    if len(view) < 35 or view[:4] != SMB1_MAGIC:
+        raise ValueError("not an SMB1 response")
+    (status,) = _unpack('<I', view, 5, "SMB1 header")
+    (flags2,) = _unpack('<H', view, 10, "SMB1 header")
+    word_count = view[32]
+    (dialect_index,) = _unpack('<H', view, 33, "negotiate words")
+    info = {'version': 1, 'status': status}
+    if dialect_index >= len(SMB1_DIALECTS):
+        info['dialect'] = 'No common dialect'
+        return info
+    info['dialect'] = SMB1_DIALECTS[dialect_index]
+
+    if word_count == 17:
+        # NT LM 0.12: DialectIndex, SecurityMode, MaxMpx, MaxVcs, MaxBuffer, MaxRaw, SessionKey,
+        # Capabilities, SystemTime, ServerTimeZone, ChallengeLength
+        (_, security_mode, _, _, _, _, _, capabilities, _, _,
+         challenge_length) = _unpack('<HBHHIIIIQhB', view, 33, "negotiate words")
+        (byte_count,) = _unpack('<H', view, 67, "negotiate byte count")
+        pos, end = 69, min(69 + byte_count, len(view))
+        info['signing'] = _signing(security_mode & 0x04, security_mode & 0x08)
+        info['extended_security'] = bool(capabilities & CAP_EXTENDED_SECURITY)
+        if info['extended_security']:
+            if end - pos >= 16:
+                info['guid'] = _guid(view[pos:pos + 16])
+        else:
+            pos += challenge_length
+            unicode = bool(flags2 & FLAGS2_UNICODE)
+            if pos < end:
+                info['domain'], pos = _read_string(view, pos, end, unicode, align=False)
+            if pos < end:
+                info['server'], pos = _read_string(view, pos, end, unicode, align=False)
+    elif word_count == 13:
+        # LANMAN 2.1 이하: DialectIndex, SecurityMode(2바이트) ...
+        (_, security_mode) = _unpack('<HH', view, 33, "negotiate words")
+        info['signing'] = 'disabled'
+        info['user_level'] = bool(security_mode & 0x01)
+    return info
+
+
+def parse_smb2_negotiate(view):
+    """SMB2 Negotiate 응답 -> dialect, signing, guid"""
+    if len(view) < 64 or view[:4] != SMB2_MAGIC:
+        raise ValueError("not an SMB2 response")
+    (status,) = _unpack('<I', view, 8, "SMB2 header")
+    (structure_size, security_mode, dialect, _, guid, capabilities) = \
+        _unpack('<HHHH16sI', view, 64, "SMB2 negotiate")
+    if structure_size != 65:
+        raise ValueError(f"unexpected SMB2 negotiate size {structure_size}")
+    return {
+        'version': 2,
+        'status': status,
+        'dialect_code': dialect,
+        'dialect': SMB2_DIALECTS.get(dialect, f'SMB2 0x{dialect:04x}'),
+        'signing': _signing(security_mode & 0x01, security_mode & 0x02),
+        'guid': _guid(guid),
+        'capabilities': capabilities,
+    }
+
+
+def parse_negotiate(data):
+    """NetBIOS 헤더를 뗀 Negotiate 응답 (SMB1/SMB2 자동 판별)"""
+    view = memoryview(data)
+    if view[:4] == SMB2_MAGIC:
+        return parse_smb2_negotiate(view)
+    return parse_smb1_negotiate(view)
+
+
+def parse_ntlm_challenge(blob):
+    """보안 blob 안의 NTLMSSP CHALLENGE -> OS 빌드, NetBIOS/DNS 이름"""
+    raw = bytes(blob)
+    start = raw.find(NTLMSSP_SIGNATURE)
+    if start < 0:
+        return {}
+    view = memoryview(raw)[start:]
+    (message_type,) = _unpack('<I', view, 8, "NTLMSSP")
+    if message_type != 2:
+        return {}
+    (_, _, _, flags) = _unpack('<HHII', view, 12, "NTLMSSP challenge")
+    (info_length, _, info_offset) = _unpack('<HHI', view, 40, "NTLMSSP target info")
+    info = {}
+    if flags & NTLMSSP_NEGOTIATE_VERSION and len(view) >= 56:
+        major, minor, build = struct.unpack_from('<BBH', view, 48)
+        info['os_build'] = f"{major}.{minor}.{build}"
+
+    pos, end = info_offset, min(info_offset + info_length, len(view))
+    while pos + 4 <= end:
+        av_id, av_length = struct.unpack_from('<HH', view, pos)
+        pos += 4
+        if av_id == 0 or pos + av_length > end:
+            break
+        if av_id in NTLM_AV_FIELDS:
+            info[NTLM_AV_FIELDS[av_id]] = view[pos:pos + av_length].tobytes().decode('utf-16-le', 'replace')
+        pos += av_length
+    return info
+
+
+def parse_smb1_session_setup(view):
+    """SMB1 Session Setup AndX 응답 -> NativeOS, NativeLanMan, PrimaryDomain (+ NTLMSSP 정보)"""
+    if len(view) < 35 or view[:4] != SMB1_MAGIC:
+        raise ValueError("not an SMB1 response")
+    (flags2,) = _unpack('<H', view, 10, "SMB1 header")
+    word_count = view[32]
+    pos = 33 + word_count * 2
+    (byte_count,) = _unpack('<H', view, pos, "session setup byte count")
+    pos += 2
+    end = min(pos + byte_count, len(view))
+    info = {}
+    if word_count == 4:
+        # 확장 보안: AndX(4), Action, SecurityBlobLength 다음 bytes에 보안 blob
+        (blob_length,) = _unpack('<H', view, 39, "session setup words")
+        info.update(parse_ntlm_challenge(view[pos:min(pos + blob_length, end)]))
+        pos += blob_length
+    elif word_count != 3:
+        return info
+    unicode = bool(flags2 & FLAGS2_UNICODE)
+    for key in ('native_os', 'native_lanman', 'primary_domain'):
+        if pos >= end:
+            break
+        value, pos = _read_string(view, pos, end, unicode)
+        if value:
+            info[key] = value
+    return info
+
+
+def parse_smb2_session_setup(view):
+    """SMB2 Session Setup 응답의 보안 버퍼 (NTLMSSP CHALLENGE)"""
+    if len(view) < 64 or view[:4] != SMB2_MAGIC:
+        raise ValueError("not an SMB2 response")
+    (_, _, offset, length) = _unpack('<HHHH', view, 64, "SMB2 session setup")
+    if offset + length > len(view):
+        raise ValueError("truncated SMB2 security buffer")
+    return parse_ntlm_challenge(view[offset:offset + length])
+
+
+def format_smb_info(info):
+    parts = [info.get('dialect', 'Unknown Dialect')]
+    if info.get('signing'):
+        parts.append(f"Signing: {info['signing']}")
+    if info.get('guid'):
+        parts.append(f"GUID: {info['guid']}")
+    if info.get('native_os'):
+        parts.append(f"OS: {info['native_os']}")
+    if info.get('native_lanman'):
+        parts.append(f"LanMan: {info['native_lanman']}")
+    if info.get('os_build'):
+        parts.append(f"Build: {info['os_build']}")
+    name = info.get('netbios_name') or info.get('server')
+    if name:
+        parts.append(f"Name: {name}")
+    domain = info.get('netbios_domain') or info.get('primary_domain') or info.get('domain')
+    if domain:
+        parts.append(f"Domain: {domain}")
+    if info.get('dns_domain'):
+        parts.append(f"DNS: {info['dns_domain']}")
+    return f"SMB ({' | '.join(parts)})"
+
+
 class SmbProtocol(BaseProtocol):
-    def handle(self, sock):
+    async def handle_async(self, reader, writer):
         """
         SMBv1/v2 Negotiate Protocol Packet 전송
         이 패킷은 서버에게 "나 이런 언어(Dialect)들을 아는데, 넌 뭐야?"라고 물어봅니다.
+        이어서 익명 Session Setup 1단계만 보내 OS/LanMan 문자열과 NTLM 서버 정보(이름, 도메인, OS 빌드)를 받습니다.
+        (인증은 완료하지 않음)
         """
-        # SMB Negotiate Request (Multi-Protocol)
-        # PC NETWORK, LANMAN, NT LM 0.12 등을 포함
-        probe = (
-            b'\x00\x00\x00\x85'  # NetBIOS Session Service (Length=133)
-            b'\xff\x53\x4d\x42'  # SMB Header Protocol ID
-            b'\x72'              # Command: Negotiate Protocol
-            b'\x00\x00\x00\x00'  # Status
-            b'\x18'              # Flags
-            b'\x01\x28'          # Flags2
-            b'\x00\x00'          # PID High
-            b'\x00\x00\x00\x00\x00\x00\x00\x00' # Signature
-            b'\x00\x00'          # Reserved
-            b'\x00\x00'          # TID
-            b'\x2f\x4b'          # PID
-            b'\x00\x00'          # UID
-            b'\x00\x00'          # MID
-            b'\x00\x54'          # Word Count (0) + Byte Count (84)
-            # Dialects
-            b'\x02\x50\x43\x20\x4e\x45\x54\x57\x4f\x52\x4b\x20\x50\x52\x4f\x47\x52\x41\x4d\x20\x31\x2e\x30\x00'
-            b'\x02\x4c\x41\x4e\x4d\x41\x4e\x31\x2e\x30\x00'
-            b'\x02\x57\x69\x6e\x64\x6f\x77\x73\x20\x66\x6f\x72\x20\x57\x6f\x72\x6b\x67\x72\x6f\x75\x70\x73\x20\x33\x2e\x31\x61\x00'
-            b'\x02\x4c\x4d\x31\x2e\x32\x58\x30\x30\x32\x00'
-            b'\x02\x4c\x41\x4e\x4d\x41\x4e\x32\x2e\x31\x00'
-            b'\x02\x4e\x54\x20\x4c\x4d\x20\x30\x2e\x31\x32\x00'
-        )
-        
-        sock.sendall(probe)
-        
-        # 응답 수신 (충분히 크게 잡음)
+        response = await self._exchange(reader, writer, build_smb1_negotiate())
+        if not response:
+            return b''
+        try:
+            info = parse_negotiate(response)
+        except ValueError:
+            return response
+
         try:
-            return sock.recv(1024)
-        except socket.timeout:
+            if info['version'] == 1 and info['dialect'] == 'NT LM 0.12':
+                setup = await self._exchange(reader, writer,
+                                             build_smb1_session_setup(info.get('extended_security', False)))
+                if setup:
+                    info.update(parse_smb1_session_setup(memoryview(setup)))
+            elif info['version'] == 2:
+                message_id = 1
+                if info['dialect_code'] == 0x02ff:
+                    # SMB 2.??? = SMB 2.1 이상 지원 -> SMB2 Negotiate로 실제 dialect 확정
+                    negotiated = await self._exchange(reader, writer, build_smb2_negotiate(message_id))
+                    if negotiated:
+                        info.update(parse_smb2_negotiate(memoryview(negotiated)))
+                    message_id += 1
+                setup = await self._exchange(reader, writer, build_smb2_session_setup(message_id))
+                if setup:
+                    info.update(parse_smb2_session_setup(memoryview(setup)))
+        except ValueError:
+            # 추가 정보는 못 얻어도 Negotiate 결과는 유지
+            pass
+        return info
+
+    async def _exchange(self, reader, writer, packet):
+        """요청 하나를 보내고 NetBIOS 길이만큼 응답 메시지 하나를 받음 (NetBIOS 헤더 제외)"""
+        await self.send(writer, packet)
+        # 응답 수신 (SMB 서버는 응답이 늦는 경우가 많아 여유를 둠)
+        header = await self.read_exact(reader, 4, self.timeout + SMB_EXTRA_WAIT)
+        if len(header) < 4:
+            return b''
+        length = int.from_bytes(header[1:4], 'big')
+        if length > SMB_MAX_MESSAGE:
             return b''
+        return await self.read_exact(reader, length, self.timeout + SMB_EXTRA_WAIT)
 
     def parse(self, data):
         """
-        SMB 응답에서 'Unix', 'Samba', 'Version' 같은 유의미한 문자열 추출
+        handle 결과(dict) 또는 원본 Negotiate 응답 바이트를 배너 문자열로 변환
+        예: SMB (NT LM 0.12 | Signing: disabled | OS: Unix | LanMan: Samba 3.0.20-Debian | Domain: WORKGROUP)
         """
         if not data:
             return "SMB (No Response)"
-        
-        # 1. 간단한 버전: 바이너리 다 떼고 문자열만 건져내기
-        # (Samba는 보통 평문으로 자신의 버전을 뒤에 붙여서 보냅니다)
-        try:
-            # 출력 가능한 ASCII 문자(4글자 이상)만 추출
-            strings = re.findall(b'[ -~]{4,}', data)
-            if not strings:
-                return "SMB (Unknown Version)"
-            
-            decoded = [s.decode('utf-8', errors='ignore') for s in strings]
-            
-            # 필터링: 유의미한 키워드가 있는 문자열 찾기
-            result = []
-            for s in decoded:
-                # SMB 프로토콜 자체 문자열 제외 (LANMAN 등)
-                if "SMB" in s or "LANMAN" in s or "LM" in s:
-                    continue
-                result.append(s)
-            
-            # 다 합쳐서 반환 (예: Unix Samba 3.0.20-Debian)
-            if result:
-                return f"SMB ({', '.join(result)})"
-            
-            # 만약 다 걸러졌으면 원본 문자열 중 일부 반환
-            full_str = ' '.join(decoded)
-            return f"SMB Detected ({full_str[:40]}...)"
-
-        except Exception as e:
-            return f"SMB (Parse Error: {e})"
\ No newline at end of file
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            view = memoryview(data)
+            # NetBIOS 세션 헤더가 붙은 원본이면 떼어냄
+            if len(view) >= 8 and view[0] == 0 and view[4:8] in (SMB1_MAGIC, SMB2_MAGIC):
+                view = view[4:]
+            try:
+                data = parse_negotiate(view)
+            except ValueError as e:
+                return f"SMB (Malformed: {e})"
+        return format_smb_info(data)
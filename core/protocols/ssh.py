@@ -1,13 +1,109 @@
-import socket
-import paramiko
+import asyncio
+import struct
 from core.protocols.base import BaseProtocol
+from utils.logger import app_logger as logger
+
+# 우리 스캐너의 이름 (SSH 식별 문자열)
+CLIENT_VERSION = 'SSH-2.0-SecurityScanner'
+SSH_MSG_KEXINIT = 20
+# RFC 4253 6.1: 구현이 처리해야 하는 최대 패킷 크기
+MAX_PACKET_SIZE = 35000
+
+# 취약한 알고리즘으로 표시할 이름 조각
+WEAK_ALGORITHMS = ('arcfour', '3des', 'des-cbc', 'blowfish', 'cast128', 'hmac-md5', '-96',
+                   'diffie-hellman-group1-sha1', 'ssh-dss')
+
+# deep 모드인데 paramiko가 없다는 경고를 남겼는지 (핸들러는 포트마다 새로 만들어지므로 모듈 단위로 한 번만)
+_paramiko_missing_warned = False
+
 
 class SshProtocol(BaseProtocol):
+    def __init__(self, port, timeout, deep=False):
+        """
+        :param deep: True면 paramiko로 키 교환까지 진행해 인증 방식도 확인 (느리고 대상 로그에 남음)
+        """
+        super().__init__(port, timeout)
+        self.deep = deep
+
+    def _use_paramiko(self):
+        global _paramiko_missing_warned
+        if not self.deep:
+            return False
+        try:
+            import paramiko  # noqa: F401
+        except ImportError:
+            if not _paramiko_missing_warned:
+                _paramiko_missing_warned = True
+                logger.warning("ssh_deep is enabled but paramiko is not installed: "
+                               "falling back to KEXINIT-only SSH fingerprinting")
+            return False
+        return True
+
+    def supports_async(self):
+        # deep 모드의 paramiko는 블로킹 소켓이 필요하므로 스레드 풀에서 실행
+        return not self._use_paramiko()
+
     def handle(self, sock):
         """
-        SSH는 배너 그래빙 뿐만 아니라, 
+        기본 모드: 식별 문자열을 주고받은 뒤 서버의 KEXINIT 패킷만 읽고 연결 종료
+        (암호 연산 없이 kex/host key/cipher/MAC 알고리즘 목록을 얻음)
+        deep 모드: Paramiko Transport로 키 교환 후 인증 방식까지 확인
+        """
+        if self._use_paramiko():
+            return self._handle_paramiko(sock)
+        return super().handle(sock)
+
+    async def handle_async(self, reader, writer):
+        result = {
+            "banner": "Unknown",
+            "kex": [],
+            "host_keys": [],
+            "ciphers": [],
+            "macs": [],
+        }
+        try:
+            # 서버가 식별 문자열을 보내기 전에 우리 것을 먼저 보내도 됨 (RFC 4253 4.2)
+            await self.send(writer, CLIENT_VERSION.encode() + b"\r\n")
+
+            # 1. 식별 문자열 (앞에 다른 줄이 올 수 있음)
+            for _ in range(10):
+                line = await asyncio.wait_for(reader.readline(), self.timeout)
+                if not line:
+                    raise ConnectionError("connection closed by server")
+                if line.startswith(b"SSH-"):
+                    result['banner'] = line.decode('utf-8', errors='replace').rstrip('\r\n')
+                    break
+            else:
+                return "SSH Error (No identification string)"
+
+            # 2. 첫 번째 바이너리 패킷 = 서버 KEXINIT (아직 암호화 전)
+            header = await asyncio.wait_for(reader.readexactly(5), self.timeout)
+            packet_length, padding_length = struct.unpack('>IB', header)
+            if packet_length > MAX_PACKET_SIZE or padding_length >= packet_length:
+                return f"SSH ({result['banner']}) | Invalid packet length {packet_length}"
+            body = await asyncio.wait_for(reader.readexactly(packet_length - 1), self.timeout)
+            kexinit = parse_kexinit(body[:packet_length - padding_length - 1])
+            if kexinit is None:
+                return f"SSH ({result['banner']}) | No KEXINIT"
+
+            result['kex'] = kexinit['kex']
+            result['host_keys'] = kexinit['host_keys']
+            result['ciphers'] = kexinit['ciphers']
+            result['macs'] = kexinit['macs']
+            return result
+
+        except Exception as e:
+            if result['banner'] != "Unknown":
+                return f"SSH ({result['banner']})"
+            return f"SSH Error ({str(e) or type(e).__name__})"
+
+    def _handle_paramiko(self, sock):
+        """
+        SSH는 배너 그래빙 뿐만 아니라,
         Paramiko Transport를 이용해 지원하는 알고리즘과 인증 방식을 확인합니다.
         """
+        import paramiko
+
         result = {
             "banner": "Unknown",
             "auth_methods": [],
@@ -16,21 +112,17 @@ class SshProtocol(BaseProtocol):
         }
 
         try:
-            # 1. 기본 배너 가져오기 (Raw Socket 이용)
-            # Paramiko가 소켓을 가져가기 전에 배너를 먼저 살짝 엿볼 수도 있지만,
-            # 여기서는 Paramiko Transport 내부 기능을 활용하겠습니다.
-            
             # Paramiko Transport 생성 (이미 연결된 소켓 활용)
             t = paramiko.Transport(sock)
-            t.local_version = 'SSH-2.0-SecurityScanner' # 우리 스캐너의 이름
-            
-            # 2. 핸드쉐이크 시작 (알고리즘 협상)
+            t.local_version = CLIENT_VERSION
+
+            # 1. 핸드쉐이크 시작 (알고리즘 협상)
             try:
                 t.start_client()
             except Exception as e:
                 return f"SSH Error (Handshake failed: {e})"
 
-            # 3. 정보 추출
+            # 2. 정보 추출
             # (1) 배너 정보
             result['banner'] = t.remote_version
 
@@ -41,7 +133,7 @@ class SshProtocol(BaseProtocol):
             result['kex'] = sec_opts.kex          # 키 교환 알고리즘 목록
 
             # (3) 인증 방식 확인 (Auth Methods)
-            # 인증 가능한 목록을 보려면 '일부러 틀린 인증'을 시도해서 
+            # 인증 가능한 목록을 보려면 '일부러 틀린 인증'을 시도해서
             # 서버가 "아니, 나는 이런 방식들만 지원해"라고 에러를 뱉게 만들어야 합니다.
             try:
                 # 'none' 인증을 시도하면 서버는 거절하면서 가능한 목록을 줍니다.
@@ -53,7 +145,7 @@ class SshProtocol(BaseProtocol):
                 pass
 
             t.close()
-            
+
             return result
 
         except Exception as e:
@@ -68,21 +160,56 @@ class SshProtocol(BaseProtocol):
 
         try:
             banner = data.get('banner', 'Unknown')
-            auth_methods = data.get('auth_methods', [])
             ciphers = data.get('ciphers', [])
-            
-            # 1. 버전 정보 정제
-            version_str = banner
-            
-            # 2. 인증 방식 요약
+
+            # 1. 버전 정보 정제 (식별 문자열에서 'SSH-2.0-' 뒤의 소프트웨어 이름)
+            version_str = banner.split('-', 2)[2] if banner.count('-') >= 2 else banner
+            parts = [f"SSH ({version_str})"]
+
+            # 2. 인증 방식 요약 (deep 모드) 또는 호스트 키 종류 (기본 모드)
             # 예: password가 있으면 "Password Auth Allowed" 표시
-            auth_str = ", ".join(auth_methods)
-            
-            # 3. 취약한 알고리즘 탐지 (예시)
-            weak_ciphers = [c for c in ciphers if 'arcfour' in c or '3des' in c]
-            weak_warning = f" [WEAK: {','.join(weak_ciphers)}]" if weak_ciphers else ""
+            if 'auth_methods' in data:
+                parts.append(f"Auth: [{', '.join(data['auth_methods'])}]")
+            if data.get('host_keys'):
+                parts.append(f"HostKey: [{', '.join(data['host_keys'])}]")
+
+            # 3. 취약한 알고리즘 탐지
+            offered = list(data.get('kex', [])) + list(data.get('host_keys', [])) + list(ciphers) \
+                + list(data.get('macs', []))
+            weak = [name for name in offered if any(mark in name for mark in WEAK_ALGORITHMS)]
+            weak_warning = f" [WEAK: {','.join(weak)}]" if weak else ""
 
-            return f"SSH ({version_str}) | Auth: [{auth_str}]{weak_warning}"
+            return " | ".join(parts) + weak_warning
 
         except Exception as e:
-            return f"SSH (Parse Error: {e})"
\ No newline at end of file
+            return f"SSH (Parse Error: {e})"
+
+
+def parse_kexinit(payload):
+    """
+    SSH_MSG_KEXINIT payload 해석 (RFC 4253 7.1)
+    byte 20, cookie 16바이트, name-list 10개, boolean, uint32
+    :return: 알고리즘 목록 dict (KEXINIT이 아니면 None)
+    """
+    if len(payload) < 17 or payload[0] != SSH_MSG_KEXINIT:
+        return None
+    offset = 17
+    lists = []
+    for _ in range(10):
+        if offset + 4 > len(payload):
+            return None
+        (length,) = struct.unpack_from('>I', payload, offset)
+        offset += 4
+        if offset + length > len(payload):
+            return None
+        names = bytes(payload[offset:offset + length]).decode('ascii', errors='replace')
+        lists.append(names.split(',') if names else [])
+        offset += length
+    return {
+        'kex': lists[0],
+        'host_keys': lists[1],
+        # 서버 -> 클라이언트 방향 (양방향은 보통 같음)
+        'ciphers': lists[3],
+        'macs': lists[5],
+        'compression': lists[7],
+    }
@@ -1,86 +1,141 @@
-import socket
-import time
+import asyncio
 import re
 from core.protocols.base import BaseProtocol
 
+# Telnet 명령 (RFC 854)
+IAC, DONT, DO, WONT, WILL, SB, SE = 0xff, 0xfe, 0xfd, 0xfc, 0xfb, 0xfa, 0xf0
+
+# 서버가 텍스트를 보낸 뒤 이 시간(초) 동안 조용하면 배너가 끝난 것으로 판단
+TELNET_IDLE_WAIT = 0.5
+# 프롬프트가 보이면 즉시 종료 (로그인/비밀번호 입력 요청, 셸 프롬프트)
+PROMPT_PATTERN = re.compile(rb'(?:login|username|user name|password)\s*:\s*$|[$#>]\s*$', re.IGNORECASE)
+VERSION_PATTERN = re.compile(r'\d+\.\d+\.\d+')
+
+
+class TelnetStream:
+    """
+    Telnet 스트림을 바이트 단위로 해석하는 상태 기계
+    - feed(chunk): 받은 데이터를 넣으면 보낼 협상 응답(DO -> WONT, WILL -> DONT)을 돌려줌
+    - text: 협상 코드를 뺀 실제 텍스트 (누적)
+    청크 경계에서 IAC 시퀀스가 잘려도 상태가 유지되므로 버퍼 전체를 다시 훑지 않습니다.
+    """
+    DATA, COMMAND, OPTION, SUBNEG, SUBNEG_IAC = range(5)
+
+    def __init__(self):
+        self.state = self.DATA
+        self.command = None
+        self.text = bytearray()
+        # 서버가 요청한 옵션 (DO/WILL, 옵션 번호)
+        self.requested = []
+
+    def feed(self, chunk):
+        reply = bytearray()
+        for byte in chunk:
+            if self.state == self.DATA:
+                if byte == IAC:
+                    self.state = self.COMMAND
+                else:
+                    self.text.append(byte)
+            elif self.state == self.COMMAND:
+                if byte == IAC:
+                    # IAC IAC = 데이터 0xff
+                    self.text.append(byte)
+                    self.state = self.DATA
+                elif byte in (DO, DONT, WILL, WONT):
+                    self.command = byte
+                    self.state = self.OPTION
+                elif byte == SB:
+                    self.state = self.SUBNEG
+                else:
+                    self.state = self.DATA
+            elif self.state == self.OPTION:
+                if self.command == DO:
+                    reply += bytes((IAC, WONT, byte))
+                    self.requested.append(('DO', byte))
+                elif self.command == WILL:
+                    reply += bytes((IAC, DONT, byte))
+                    self.requested.append(('WILL', byte))
+                self.state = self.DATA
+            elif self.state == self.SUBNEG:
+                if byte == IAC:
+                    self.state = self.SUBNEG_IAC
+            elif self.state == self.SUBNEG_IAC:
+                self.state = self.DATA if byte == SE else self.SUBNEG
+        return bytes(reply)
+
+    def at_prompt(self):
+        """텍스트 끝부분이 입력 프롬프트인지 (끝의 일부만 검사)"""
+        return bool(PROMPT_PATTERN.search(bytes(self.text[-64:])))
+
+
 class TelnetProtocol(BaseProtocol):
-    def handle(self, s):
-        """Telnet 전용 스마트 협상 로직"""
+    async def handle_async(self, reader, writer):
+        """
+        Telnet 전용 협상 로직 (이벤트 기반)
+        - 협상 요청은 도착하는 즉시 거절 응답
+        - 프롬프트가 보이거나, 텍스트를 받은 뒤 서버가 조용해지면 바로 종료
+        - 처음부터 아무 말이 없으면 엔터를 한 번 보내 프롬프트를 유도
+        """
         # print(f"[DEBUG] TelnetProtocol 시작 (Port {self.port})")
-        s.settimeout(1.0)
-        total_data = b""
-        max_loops = 5
+        stream = TelnetStream()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout * 3
+        nudged = False
 
-        for i in range(max_loops):
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            # 텍스트를 받은 뒤에는 짧게만 기다림 (협상만 오가는 중에는 timeout까지)
+            wait = min(remaining, TELNET_IDLE_WAIT if stream.text else self.timeout)
             try:
-                chunk = s.recv(4096)
-                if not chunk: break
-                
-                # 키워드 발견 시 즉시 종료 (빠른 응답)
-                if b"login:" in chunk or b"Ubuntu" in chunk or b"Metasploitable" in chunk:
-                    total_data += chunk
+                chunk = await asyncio.wait_for(reader.read(4096), wait)
+            except asyncio.TimeoutError:
+                if stream.text or nudged:
                     break
-                
-                # 협상 패킷 처리 (거절 패킷 전송)
-                if b'\xff' in chunk:
-                    reply = self._build_rejection(chunk)
-                    if reply:
-                        s.send(reply)
-                        time.sleep(0.5)
-                        continue
-                
-                total_data += chunk
-                
-            except socket.timeout:
-                s.send(b"\r\n") # 타임아웃 시 엔터 전송
+                await self.send(writer, b"\r\n") # 아무 응답이 없으면 엔터 전송
+                nudged = True
                 continue
             except Exception:
                 break
-        
-        return total_data
-
-    def _build_rejection(self, chunk):
-        """거절 패킷 생성 헬퍼 함수"""
-        reply = b""
-        idx = 0
-        while idx < len(chunk):
-            if chunk[idx] == 0xff:
-                if idx + 2 < len(chunk):
-                    cmd = chunk[idx+1]
-                    opt = chunk[idx+2]
-                    # DO(fd) -> WONT(fc), WILL(fb) -> DONT(fe)
-                    if cmd == 0xfd: reply += b'\xff\xfc' + bytes([opt])
-                    elif cmd == 0xfb: reply += b'\xff\xfe' + bytes([opt])
-                    idx += 3
-                else: idx += 1
-            else: idx += 1
-        return reply
+            if not chunk:
+                break
+
+            reply = stream.feed(chunk)
+            if reply:
+                await self.send(writer, reply)
+            if stream.at_prompt():
+                break
+
+        return bytes(stream.text)
 
     def parse(self, data):
         """
         Telnet 파싱 로직 (ASCII Art 필터링 포함)
+        handle 결과는 이미 협상 코드가 빠진 텍스트지만, 원본 스트림이 들어와도 한 번에 걸러냄
         """
         if not data: return None
         try:
-            # 1. 협상 코드 제거
-            cleaned = re.sub(b'\xff\xfa.*?\xff\xf0', b'', data, flags=re.DOTALL)
-            cleaned = re.sub(b'\xff[\xfb-\xfe].', b'', cleaned)
-            cleaned = re.sub(b'\xff[\xf0-\xfa]', b'', cleaned)
-            
+            # 1. 협상 코드 제거 (상태 기계 한 번 통과)
+            if IAC in data:
+                stream = TelnetStream()
+                stream.feed(data)
+                data = bytes(stream.text)
+
             # 2. 디코딩 및 라인 분리
-            text = cleaned.decode('utf-8', errors='ignore')
+            text = data.decode('utf-8', errors='ignore')
             lines = text.split('\n')
-            
+
             collected_info = []
 
             # 3. 의미 있는 줄 찾기
             for line in lines:
                 line = line.strip()
-                if not line: continue 
-                
+                if not line: continue
+
                 # ASCII Art(그림) 거르기 (특수문자 비율 확인)
-                special_chars = len(re.findall(r'[_|\\/]', line))
-                alnum_chars = len(re.findall(r'[a-zA-Z0-9]', line))
+                special_chars = sum(line.count(ch) for ch in '_|\\/')
+                alnum_chars = sum(1 for ch in line if ch.isascii() and ch.isalnum())
                 if special_chars > alnum_chars:
                     continue
 
@@ -89,20 +144,20 @@ class TelnetProtocol(BaseProtocol):
                     collected_info.append(line)
                 elif "Ubuntu" in line or "Linux" in line or "Metasploitable" in line:
                     collected_info.append(line)
-                elif re.search(r'\d+\.\d+\.\d+', line): # 커널 버전 등
+                elif VERSION_PATTERN.search(line): # 커널 버전 등
                     collected_info.append(line)
 
             if collected_info:
                 # 중복 제거 후 합치기
                 unique_info = list(dict.fromkeys(collected_info))
                 return f"Telnet ({' | '.join(unique_info)})"
-            
+
             # 아무것도 못 찾았으면 마지막 줄 리턴
             for line in reversed(lines):
                 line = line.strip()
-                if len(line) > 2 and not line.startswith('_'): 
+                if len(line) > 2 and not line.startswith('_'):
                     return f"Telnet ({line})"
-            
+
             return "Telnet (Unknown Banner)"
-        except: 
-            return "Telnet (Parse Error)"
\ No newline at end of file
+        except:
+            return "Telnet (Parse Error)"
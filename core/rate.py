@@ -0,0 +1,175 @@
+# 전송 속도 제어 (토큰 버킷 + 혼잡 윈도우)
+import asyncio
+import random
+import threading
+import time
+
+
+class RateController:
+    """
+    스캔 엔진이 프로브를 보내기 전에 호출하는 속도 제어기
+    - 토큰 버킷: 초당 패킷 수(pps) 상한. 토큰이 모자라면 다음 전송 시각을 예약하고 그때까지 대기
+    - Jitter: 전송 간격을 jitter_min ~ jitter_max 사이에서 랜덤하게 예약 (전송 스케줄의 일부로 처리)
+    - 혼잡 윈도우(cwnd): 응답을 기다리는 프로브 수의 상한.
+      일정 개수의 프로브가 끝날 때마다(epoch) 응답 비율을 계산해, 기준치의 절반 아래로 떨어지면
+      윈도우를 반으로 줄이고(multiplicative decrease), 회복되면 다시 늘립니다(slow start / additive increase).
+    여러 스레드(SYN 송신 스레드, 순차 엔진)와 asyncio 엔진에서 함께 쓸 수 있습니다.
+    cwnd_init=None이면 혼잡 윈도우 없이 pps/jitter만 적용합니다 (응답 피드백이 없는 호출자용).
+    """
+    def __init__(self, pps=0, jitter_min=0, jitter_max=0, cwnd_init=256, cwnd_min=16, cwnd_max=65536,
+                 epoch=64, loss_threshold=0.5):
+        self.pps = pps or 0
+        self.jitter_min = jitter_min or 0
+        self.jitter_max = jitter_max or 0
+        self.cwnd = float(cwnd_init) if cwnd_init is not None else None
+        self.cwnd_min = cwnd_min
+        self.cwnd_max = cwnd_max
+        self.ssthresh = float(cwnd_max)
+        self.epoch = epoch
+        self.loss_threshold = loss_threshold
+
+        # 10ms 분량까지는 몰아서 보낼 수 있도록 허용 (너무 짧은 sleep 반복 방지)
+        self._capacity = max(1.0, self.pps * 0.01)
+        self._tokens = self._capacity
+        self._last_refill = time.monotonic()
+        self._next_jitter_slot = 0.0
+
+        self.in_flight = 0
+        self._epoch_answered = 0
+        self._epoch_dropped = 0
+        self._baseline = None
+
+        self.sent = 0
+        self._rate = 0.0            # 측정된 전송 속도 (EWMA, pps)
+        self._rate_window_start = time.monotonic()
+        self._rate_window_sent = 0
+
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # 전송 슬롯 예약
+    # ------------------------------------------------------------------
+    def try_acquire(self):
+        """
+        전송 슬롯 하나를 예약하고 그 슬롯까지 남은 시간(초)을 돌려줍니다.
+        혼잡 윈도우가 가득 찬 경우에는 None (잠시 후 다시 시도)
+        """
+        with self._lock:
+            if self.cwnd is not None and self.in_flight >= int(self.cwnd):
+                return None
+            now = time.monotonic()
+            delay = 0.0
+
+            if self.pps > 0:
+                self._tokens = min(self._capacity, self._tokens + (now - self._last_refill) * self.pps)
+                self._last_refill = now
+                self._tokens -= 1
+                if self._tokens < 0:
+                    delay = -self._tokens / self.pps
+
+            if self.jitter_max > 0:
+                slot = max(now + delay, self._next_jitter_slot)
+                self._next_jitter_slot = slot + random.uniform(self.jitter_min, self.jitter_max)
+                delay = slot - now
+
+            self.in_flight += 1
+            self._count_sent(now)
+            return delay
+
+    def _count_sent(self, now):
+        self.sent += 1
+        self._rate_window_sent += 1
+        elapsed = now - self._rate_window_start
+        if elapsed >= 1.0:
+            measured = self._rate_window_sent / elapsed
+            self._rate = measured if self._rate == 0 else 0.7 * self._rate + 0.3 * measured
+            self._rate_window_start = now
+            self._rate_window_sent = 0
+
+    def acquire(self):
+        """다음 전송 슬롯까지 대기 (스레드용)"""
+        while True:
+            delay = self.try_acquire()
+            if delay is None:
+                time.sleep(0.001)
+                continue
+            if delay > 0:
+                time.sleep(delay)
+            return
+
+    async def acquire_async(self):
+        """다음 전송 슬롯까지 대기 (asyncio용 - 이벤트 루프를 막지 않음)"""
+        while True:
+            delay = self.try_acquire()
+            if delay is None:
+                await asyncio.sleep(0.001)
+                continue
+            if delay > 0:
+                await asyncio.sleep(delay)
+            return
+
+    # ------------------------------------------------------------------
+    # 응답 피드백
+    # ------------------------------------------------------------------
+    def on_response(self):
+        """프로브에 응답(Open/Closed)이 돌아옴"""
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._epoch_answered += 1
+            self._end_epoch()
+
+    def on_drop(self):
+        """프로브가 응답 없이 timeout 됨"""
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._epoch_dropped += 1
+            self._end_epoch()
+
+    def on_result(self, status):
+        """스캔 결과 문자열로 on_response/on_drop 중 하나를 호출"""
+        if status == "Filtered":
+            self.on_drop()
+        else:
+            self.on_response()
+
+    def _end_epoch(self):
+        if self.cwnd is None:
+            return
+        total = self._epoch_answered + self._epoch_dropped
+        if total < self.epoch:
+            return
+        ratio = self._epoch_answered / total
+        self._epoch_answered = self._epoch_dropped = 0
+
+        if self._baseline is None:
+            self._baseline = ratio
+        if self._baseline > 0.05 and ratio < self._baseline * self.loss_threshold:
+            # 응답이 급감 -> 혼잡으로 보고 윈도우 절반으로
+            self.ssthresh = max(self.cwnd_min, self.cwnd / 2)
+            self.cwnd = max(self.cwnd_min, self.cwnd / 2)
+            # 대상이 실제로 응답을 멈춘 경우에도 언젠가 회복하도록 기준치를 천천히 낮춤
+            self._baseline = 0.9 * self._baseline + 0.1 * ratio
+        else:
+            if self.cwnd < self.ssthresh:
+                self.cwnd = min(self.cwnd_max, self.cwnd * 2)
+            else:
+                self.cwnd = min(self.cwnd_max, self.cwnd + max(1.0, self.cwnd * 0.1))
+            self._baseline = 0.8 * self._baseline + 0.2 * ratio
+
+    @property
+    def current_rate(self):
+        """최근 측정된 전송 속도 (초당 프로브 수)"""
+        with self._lock:
+            elapsed = time.monotonic() - self._rate_window_start
+            if self._rate == 0 and elapsed > 0:
+                return self._rate_window_sent / elapsed
+            return self._rate
+
+    def stats(self):
+        return {
+            'rate': round(self.current_rate, 1),
+            'pps_limit': self.pps,
+            'cwnd': int(self.cwnd) if self.cwnd is not None else None,
+            'in_flight': self.in_flight,
+            'sent': self.sent,
+        }
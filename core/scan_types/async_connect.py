@@ -0,0 +1,118 @@
+import asyncio
+import queue
+import socket
+import threading
+import time
+from core.scan_types.base import BaseScanner
+
+# 결과 큐에서 종료를 알리는 표식
+_DONE = object()
+
+class AsyncConnectScanner(BaseScanner):
+    """
+    asyncio 기반 TCP Connect 스캔
+    Non-blocking connect()를 수천 개까지 동시에 띄워 두고,
+    포트마다 개별 deadline(timeout)을 적용합니다.
+    """
+    def __init__(self, timeout=1.0, concurrency=1000, keep_open=False, rtt=None, rate=None):
+        super().__init__(timeout, rtt, rate)
+        self.concurrency = self._limit_concurrency(concurrency)
+        # True이면 Open 포트의 연결을 닫지 않고 서비스 탐지 단계로 넘겨줌
+        self.keep_open = keep_open
+        self._open_sockets = {}
+
+    def take_socket(self, target_ip, port):
+        conn_skt = self._open_sockets.pop((target_ip, port), None)
+        if conn_skt is not None:
+            # 이벤트 루프용 non-blocking 모드 해제 (이후 settimeout으로 제어)
+            conn_skt.setblocking(True)
+        return conn_skt
+
+    def scan(self, target_ip, port, src_port):
+        """단일 포트 스캔 (기존 엔진과 동일한 인터페이스)"""
+        return asyncio.run(self._probe(target_ip, port))
+
+    def scan_batch(self, targets):
+        """
+        이벤트 루프를 별도 스레드에서 돌리고, 완료되는 순서대로 결과를 내보냅니다.
+        targets는 필요할 때마다 하나씩 꺼내 쓰므로 큰 범위도 미리 펼치지 않습니다.
+        """
+        results = queue.Queue()
+        stop = threading.Event()
+
+        def worker():
+            try:
+                asyncio.run(self._run(targets, results, stop))
+            except Exception as e:
+                results.put(e)
+            finally:
+                results.put(_DONE)
+
+        thread = threading.Thread(target=worker, name="AsyncConnectLoop", daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = results.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # 소비자가 중간에 멈춘 경우에도 루프가 새 연결을 만들지 않도록 알림
+            stop.set()
+            thread.join()
+
+    async def _run(self, targets, results, stop):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        pending = set()
+
+        async def probe_and_report(target_ip, port):
+            try:
+                status = await self._probe(target_ip, port)
+                if self.rate is not None:
+                    self.rate.on_result(status)
+                results.put((target_ip, port, status))
+            finally:
+                semaphore.release()
+
+        for target_ip, port in targets:
+            if stop.is_set():
+                break
+            await semaphore.acquire()
+            # 전송 슬롯 대기 (속도 제한/jitter를 이벤트 루프를 막지 않고 적용)
+            if self.rate is not None:
+                await self.rate.acquire_async()
+            task = asyncio.create_task(probe_and_report(target_ip, port))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        if pending:
+            await asyncio.gather(*pending)
+
+    async def _probe(self, target_ip, port):
+        loop = asyncio.get_running_loop()
+        conn_skt = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        conn_skt.setblocking(False)
+        started = time.monotonic()
+        try:
+            # 포트별 deadline: timeout 안에 핸드셰이크가 끝나지 않으면 Filtered (호스트별 RTT 기반)
+            await asyncio.wait_for(loop.sock_connect(conn_skt, (target_ip, port)), self.timeout_for(target_ip))
+            self.observe_rtt(target_ip, time.monotonic() - started)
+            if self.keep_open and self._keep_socket(target_ip, port, conn_skt):
+                conn_skt = None
+            return "Open"
+
+        except asyncio.TimeoutError:
+            return "Filtered"
+
+        except ConnectionRefusedError:
+            self.observe_rtt(target_ip, time.monotonic() - started)
+            return "Closed"
+
+        except OSError:
+            return "Filtered"
+
+        finally:
+            if conn_skt is not None:
+                conn_skt.close()
@@ -1,8 +1,55 @@
+import random
 from abc import ABC, abstractmethod
+from utils.logger import app_logger as logger
+
+try:
+    import resource  # POSIX 전용 (파일 디스크립터 한도 확인용)
+except ImportError:
+    resource = None
 
 class BaseScanner(ABC):
-    def __init__(self, timeout=1.0):
+    # 스캔하는 전송 계층 프로토콜 (결과 레코드의 proto)
+    proto = 'tcp'
+    # keep_open 엔진이 서비스 탐지에 넘기려고 열어 두는 연결 수 상한
+    # 탐지가 밀려 넘치면 연결을 바로 닫고, 탐지 단계가 나중에 새로 연결함 (fd와 대상의 유휴 연결이 쌓이지 않도록)
+    max_kept_sockets = 256
+
+    def __init__(self, timeout=1.0, rtt=None, rate=None):
         self.timeout = timeout
+        # 호스트별 적응형 timeout 추정기 (core.timing.RttEstimator, 없으면 고정 timeout)
+        self.rtt = rtt
+        # 전송 속도 제어기 (core.rate.RateController, 없으면 제한 없음)
+        self.rate = rate
+
+    def timeout_for(self, target_ip):
+        """target_ip에 대한 응답 대기 시간"""
+        if self.rtt is not None:
+            return self.rtt.timeout_for(target_ip)
+        return self.timeout
+
+    def observe_rtt(self, target_ip, rtt):
+        """응답 관측 시 RTT 표본 전달"""
+        if self.rtt is not None:
+            self.rtt.observe(target_ip, rtt)
+
+    def _limit_concurrency(self, concurrency):
+        """동시 연결(소켓) 수가 열 수 있는 파일 디스크립터 수를 넘지 않도록 제한"""
+        concurrency = max(1, int(concurrency))
+        if resource is None:
+            return concurrency
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft != resource.RLIM_INFINITY and soft < concurrency + 64:
+            # soft limit을 hard limit까지 올려보고, 그래도 부족하면 동시성 자체를 낮춤
+            wanted = concurrency + 64 if hard == resource.RLIM_INFINITY else min(concurrency + 64, hard)
+            try:
+                resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+                soft = wanted
+            except (ValueError, OSError):
+                pass
+            if soft < concurrency + 64:
+                logger.warning(f"RLIMIT_NOFILE({soft}) 때문에 동시 연결 수를 {concurrency}에서 줄입니다.")
+                concurrency = max(1, soft - 64)
+        return concurrency
 
     @abstractmethod # 추상 함수 구현 하지 않는다. 하위 클래스에서 반드시 구현해야 한다.
     def scan(self, target_ip, port, src_port):
@@ -10,4 +57,48 @@ class BaseScanner(ABC):
         모든 스캔 클래스는 이 함수를 반드시 구현해야 합니다.
         :return: "Open", "Closed", "Filtered" 중 하나
         """
-        pass
\ No newline at end of file
+        pass
+
+    def scan_batch(self, targets):
+        """
+        (ip, port) 목록을 받아 (ip, port, status)를 순서대로 내보냅니다.
+        기본 구현은 scan()을 한 번에 하나씩 호출하며,
+        동시 처리가 가능한 엔진은 이 함수를 재정의합니다.
+        :param targets: (ip, port) 튜플의 iterable
+        :return: (ip, port, status) 튜플 generator
+        """
+        for target_ip, port in targets:
+            # 전송 슬롯 대기 (속도 제한 및 jitter)
+            if self.rate is not None:
+                self.rate.acquire()
+            # 소스 포트 랜덤 생성 (공통 기능은 여기서 처리)
+            src_port = random.randint(1024, 65535)
+            status = self.scan(target_ip, port, src_port)
+            if self.rate is not None:
+                self.rate.on_result(status)
+            yield target_ip, port, status
+
+    def _keep_socket(self, target_ip, port, conn_skt):
+        """
+        Open 포트의 연결을 take_socket()으로 넘겨주기 위해 보관 (상한을 넘으면 보관하지 않음)
+        :return: 보관했으면 True (호출한 쪽은 소켓을 닫지 않음)
+        """
+        if len(self._open_sockets) >= self.max_kept_sockets:
+            return False
+        self._open_sockets[(target_ip, port)] = conn_skt
+        return True
+
+    def take_socket(self, target_ip, port):
+        """
+        스캔 중 연결해 둔 소켓을 넘겨받습니다 (연결 재사용을 지원하는 엔진만 해당).
+        소켓을 넘겨받은 쪽이 close() 책임을 집니다.
+        :return: 연결된 socket 또는 None
+        """
+        return None
+
+    def take_service(self, target_ip, port):
+        """
+        스캔 응답으로 알아낸 서비스 정보를 넘겨받습니다 (응답에 내용이 있는 엔진만 해당, 예: UDP).
+        :return: 서비스 정보 문자열 또는 None
+        """
+        return None
@@ -1,7 +1,17 @@
 import socket
+import time
 from core.scan_types.base import BaseScanner
 
 class ConnectScanner(BaseScanner):
+    def __init__(self, timeout=1.0, keep_open=False, rtt=None, rate=None):
+        super().__init__(timeout, rtt, rate)
+        # True이면 Open 포트의 연결을 닫지 않고 서비스 탐지 단계로 넘겨줌 (핸드셰이크 1회로 끝내기)
+        self.keep_open = keep_open
+        self._open_sockets = {}
+
+    def take_socket(self, target_ip, port):
+        return self._open_sockets.pop((target_ip, port), None)
+
     def scan(self, target_ip, port, src_port):
         """
         Python의 Native Socket을 이용한 TCP Connect 스캔
@@ -11,7 +21,7 @@ class ConnectScanner(BaseScanner):
         conn_skt = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         
         # 2. 타임아웃 설정 (너무 오래 기다리지 않도록)
-        conn_skt.settimeout(self.timeout)
+        conn_skt.settimeout(self.timeout_for(target_ip))
         
         try:
             # [참고] Connect 스캔은 OS가 소스 포트를 자동 할당하는 것이 일반적입니다.
@@ -21,19 +31,26 @@ class ConnectScanner(BaseScanner):
             
             # 3. 연결 시도 (3-Way Handshake 시작)
             # connect()는 성공하면 None을 반환, 실패하면 예외(Exception)를 발생시킵니다.
+            started = time.monotonic()
             conn_skt.connect((target_ip, port))
-            conn_skt.close() # 예의 바르게 연결 끊기
+            self.observe_rtt(target_ip, time.monotonic() - started)
+            if self.keep_open and self._keep_socket(target_ip, port, conn_skt):
+                # 연결을 살려 두고 take_socket()으로 넘겨줌
+                conn_skt = None
             return "Open"
 
         except socket.timeout:
             return "Filtered"
 
         except ConnectionRefusedError:
+            # RST 응답도 왕복 시간 표본으로 사용
+            self.observe_rtt(target_ip, time.monotonic() - started)
             return "Closed"
 
         except Exception as e:
             return "Filtered"
             
         finally:
-            # 소켓 자원 반납 (매우 중요!)
-            conn_skt.close()
\ No newline at end of file
+            # 소켓 자원 반납 (매우 중요!) - 넘겨줄 연결은 제외
+            if conn_skt is not None:
+                conn_skt.close()
\ No newline at end of file
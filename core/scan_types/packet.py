@@ -0,0 +1,139 @@
+# Raw socket 스캔 엔진에서 공통으로 쓰는 패킷 생성/해석 도구 (Scapy 없이 struct만 사용)
+import hashlib
+import os
+import socket
+import struct
+
+# ICMP 타입
+ICMP_ECHO_REPLY = 0
+ICMP_DEST_UNREACH = 3
+ICMP_ECHO_REQUEST = 8
+
+# TCP 플래그
+TCP_FIN = 0x01
+TCP_SYN = 0x02
+TCP_RST = 0x04
+TCP_ACK = 0x10
+
+
+def checksum(data):
+    """인터넷 체크섬 (RFC 1071)"""
+    if len(data) % 2:
+        data += b'\x00'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xffff)
+    total += total >> 16
+    return ~total & 0xffff
+
+
+def local_ip_for(target_ip):
+    """target_ip로 나가는 경로의 출발지 IP를 커널 라우팅 테이블에서 얻어옴 (실제 전송 없음)"""
+    probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        probe.connect((target_ip, 9))
+        return probe.getsockname()[0]
+    finally:
+        probe.close()
+
+
+def build_tcp_packet(src_ip, dst_ip, sport, dport, seq, ack=0, flags=TCP_SYN, window=1024, options=b''):
+    """IP 헤더를 포함한 TCP 패킷 생성 (IP_HDRINCL 소켓용)"""
+    src = socket.inet_aton(src_ip)
+    dst = socket.inet_aton(dst_ip)
+    offset = (20 + len(options)) // 4
+    tcp_header = struct.pack('!HHIIBBHHH', sport, dport, seq, ack, offset << 4, flags, window, 0, 0) + options
+    pseudo = struct.pack('!4s4sBBH', src, dst, 0, socket.IPPROTO_TCP, len(tcp_header))
+    tcp_sum = checksum(pseudo + tcp_header)
+    tcp_header = tcp_header[:16] + struct.pack('!H', tcp_sum) + tcp_header[18:]
+    # IP ID/체크섬은 0으로 두면 커널이 채워줌
+    ip_header = struct.pack('!BBHHHBBH4s4s', 0x45, 0, 20 + len(tcp_header), 0, 0, 64,
+                            socket.IPPROTO_TCP, 0, src, dst)
+    return ip_header + tcp_header
+
+
+def parse_tcp_packet(data):
+    """
+    Raw 소켓으로 받은 IPv4/TCP 패킷 해석
+    :return: (src_ip, dst_ip, sport, dport, seq, ack, flags, options) 또는 None
+    """
+    if len(data) < 20 or data[0] >> 4 != 4 or data[9] != socket.IPPROTO_TCP:
+        return None
+    ihl = (data[0] & 0x0f) * 4
+    if len(data) < ihl + 20:
+        return None
+    sport, dport, seq, ack, offset, flags = struct.unpack_from('!HHIIBB', data, ihl)
+    tcp_len = (offset >> 4) * 4
+    options = bytes(data[ihl + 20:ihl + tcp_len]) if tcp_len > 20 else b''
+    src_ip = socket.inet_ntoa(data[12:16])
+    dst_ip = socket.inet_ntoa(data[16:20])
+    return src_ip, dst_ip, sport, dport, seq, ack, flags, options
+
+
+def build_icmp_echo(ident, seq, payload=b''):
+    """ICMP Echo Request (IP 헤더 제외 - 커널이 붙여주는 raw ICMP 소켓용)"""
+    header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, 0, ident, seq)
+    icmp_sum = checksum(header + payload)
+    return struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, icmp_sum, ident, seq) + payload
+
+
+def parse_icmp_packet(data):
+    """
+    Raw 소켓으로 받은 IPv4/ICMP 패킷 해석
+    :return: (src_ip, icmp_type, code, rest) 또는 None
+             rest는 ICMP 헤더 4바이트 뒤의 데이터 (Echo면 id/seq/payload, Unreachable이면 unused + 원본 IP 헤더...)
+    """
+    if len(data) < 20 or data[0] >> 4 != 4 or data[9] != socket.IPPROTO_ICMP:
+        return None
+    ihl = (data[0] & 0x0f) * 4
+    if len(data) < ihl + 8:
+        return None
+    src_ip = socket.inet_ntoa(data[12:16])
+    return src_ip, data[ihl], data[ihl + 1], bytes(data[ihl + 4:])
+
+
+def timestamp_option(tsval):
+    """TCP Timestamp 옵션 (NOP, NOP, kind=8, len=10, TSval, TSecr=0) - 12바이트"""
+    return struct.pack('!BBBBII', 1, 1, 8, 10, tsval & 0xffffffff, 0)
+
+
+def parse_timestamp_echo(options):
+    """TCP 옵션에서 Timestamp의 TSecr(상대가 되돌려준 우리 TSval) 추출, 없으면 None"""
+    idx = 0
+    while idx < len(options):
+        kind = options[idx]
+        if kind == 0:       # End of options
+            break
+        if kind == 1:       # NOP
+            idx += 1
+            continue
+        if idx + 1 >= len(options):
+            break
+        length = options[idx + 1]
+        if length < 2:
+            break
+        if kind == 8 and length == 10 and idx + 10 <= len(options):
+            return struct.unpack_from('!I', options, idx + 6)[0]
+        idx += length
+    return None
+
+
+class ProbeCookie:
+    """
+    Stateless 응답 매칭용 시퀀스 번호 생성기
+    (대상 IP, 대상 포트, 소스 포트)를 비밀 키로 해싱해 SYN의 seq에 넣고,
+    응답의 ACK 번호(seq + 1)로 우리가 보낸 프로브인지 검증합니다.
+    """
+    def __init__(self, key=None):
+        self.key = key or os.urandom(16)
+
+    def make_bytes(self, target_ip, size=4):
+        """대상 IP만으로 만드는 검증용 바이트열 (ICMP payload 등)"""
+        return hashlib.blake2b(socket.inet_aton(target_ip), key=self.key, digest_size=size).digest()
+
+    def make(self, target_ip, dport, sport):
+        material = socket.inet_aton(target_ip) + struct.pack('!HH', dport, sport)
+        digest = hashlib.blake2b(material, key=self.key, digest_size=4).digest()
+        return struct.unpack('!I', digest)[0]
+
+    def validate(self, target_ip, dport, sport, ack):
+        return (self.make(target_ip, dport, sport) + 1) & 0xffffffff == ack
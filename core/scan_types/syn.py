@@ -1,20 +1,53 @@
+import errno
+import queue
+import random
+import select
+import socket
+import threading
+import time
+from collections import deque
+
 from scapy.all import IP, TCP, sr1, send, conf
 from core.scan_types.base import BaseScanner
+from core.scan_types.packet import (
+    TCP_ACK, TCP_RST, TCP_SYN, ProbeCookie, build_tcp_packet, local_ip_for, parse_tcp_packet,
+    parse_timestamp_echo, timestamp_option,
+)
+from utils.logger import app_logger as logger
 
 # Scapy 설정 (Verbose 끄기)
 conf.verb = 0
 
+# 결과 큐에서 종료를 알리는 표식
+_DONE = object()
+
+# 수신용 raw 소켓 버퍼 크기 (net.core.rmem_max를 넘으면 커널이 잘라냄)
+RECV_BUFFER_SIZE = 8 * 1024 * 1024
+
+
+def _now_ms():
+    """TCP Timestamp 옵션에 넣을 밀리초 단위 시각"""
+    return int(time.monotonic() * 1000) & 0xffffffff
+
+
 class SynScanner(BaseScanner):
+    def __init__(self, timeout=1.0, block_size=4096, rtt=None, rate=None):
+        super().__init__(timeout, rtt, rate)
+        # 한 번에 전송하고 판정(Filtered 확정)하는 프로브 묶음 크기
+        self.block_size = block_size
+
     def scan(self, target_ip, port, src_port):
         # 1. 패킷 생성
         packet = IP(dst=target_ip)/TCP(sport=src_port, dport=port, flags="S")
         
         # 2. 전송 및 대기
-        response = sr1(packet, timeout=self.timeout)
+        started = time.monotonic()
+        response = sr1(packet, timeout=self.timeout_for(target_ip))
 
         # 3. 분석
         if response is None:
             return "Filtered"
+        self.observe_rtt(target_ip, time.monotonic() - started)
 
         if response.haslayer(TCP):
             tcp_layer = response.getlayer(TCP)
@@ -30,4 +63,194 @@ class SynScanner(BaseScanner):
             elif tcp_layer.flags == 0x14:
                 return "Closed"
 
-        return "Filtered"
\ No newline at end of file
+        return "Filtered"
+
+    def scan_batch(self, targets):
+        """
+        송신 루프와 수신 루프를 분리한 대량 SYN 스캔
+        - 송신 스레드: 오래 유지되는 raw 소켓 하나로 SYN을 연속 전송
+        - 수신 스레드: raw 소켓 하나로 들어오는 TCP 패킷을 모두 받아 ACK 번호로 검증
+        프로브별 상태 테이블 없이 ProbeCookie로 응답을 매칭하며,
+        block_size 단위로 timeout이 지나면 응답이 없던 포트를 Filtered로 확정합니다.
+        RTT는 SYN에 실은 TCP Timestamp(TSval)를 SYN-ACK가 되돌려주는 값으로 측정합니다.
+        rate가 있으면 송신 스레드가 매 프로브마다 전송 슬롯을 예약하고,
+        수신 스레드(응답)와 판정(Filtered)이 혼잡 윈도우에 피드백을 줍니다.
+        """
+        results = queue.Queue()
+        stop = threading.Event()
+        cookie = ProbeCookie()
+        # 판정 전인 프로브 (이미 판정된 프로브에 늦게 오거나 중복으로 온 응답은 무시)
+        pending = set()         # (ip, port)
+        answered = {}           # (ip, port) -> status
+        answered_lock = threading.Lock()
+
+        # 두 번째 socket()/setsockopt가 실패해도 먼저 만든 소켓이 닫히도록 with로 묶음
+        # (with를 벗어나는 시점은 송수신 스레드가 모두 끝난 뒤)
+        with socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_RAW) as send_skt, \
+                socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP) as recv_skt:
+            send_skt.setsockopt(socket.IPPROTO_IP, socket.IP_HDRINCL, 1)
+            # 응답이 몰릴 때 커널에서 버려지지 않도록 수신 버퍼를 넉넉히 확보
+            recv_skt.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER_SIZE)
+
+            receiver = threading.Thread(
+                target=self._receive_loop,
+                args=(recv_skt, send_skt, cookie, pending, answered, answered_lock, stop),
+                name="SynReceiver", daemon=True)
+            transmitter = threading.Thread(
+                target=self._transmit_loop,
+                args=(targets, send_skt, cookie, pending, answered, answered_lock, results, stop),
+                name="SynTransmitter", daemon=True)
+            receiver.start()
+            try:
+                transmitter.start()
+                while True:
+                    item = results.get()
+                    if item is _DONE:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+            finally:
+                stop.set()
+                if transmitter.is_alive():
+                    transmitter.join()
+                receiver.join()
+
+    def _transmit_loop(self, targets, send_skt, cookie, pending, answered, answered_lock, results, stop):
+        in_flight = deque()     # (block, 블록 내 호스트들, 마지막 전송 시각)
+        src_cache = {}
+        block = []
+
+        def close_block():
+            nonlocal block
+            if block:
+                in_flight.append((block, {ip for ip, _ in block}, time.monotonic()))
+                block = []
+
+        def finalize_due():
+            # deadline이 지난 블록은 판정
+            while in_flight and self._deadline(in_flight[0]) <= time.monotonic():
+                self._finalize(in_flight, pending, answered, answered_lock, results)
+
+        try:
+            for target_ip, port in targets:
+                if stop.is_set():
+                    return
+                # 전송 슬롯 예약 (속도 제한/jitter/혼잡 윈도우)
+                delay = 0.0
+                while self.rate is not None:
+                    delay = self.rate.try_acquire()
+                    if delay is not None:
+                        break
+                    # 윈도우가 가득 참: 보낸 프로브를 블록으로 닫아야 판정/윈도우 회복이 가능
+                    close_block()
+                    finalize_due()
+                    if stop.wait(0.001):
+                        return
+                if delay > 0:
+                    time.sleep(delay)
+
+                src_ip = src_cache.get(target_ip)
+                if src_ip is None:
+                    if len(src_cache) > 4096:
+                        src_cache.clear()
+                    src_ip = src_cache[target_ip] = local_ip_for(target_ip)
+                src_port = random.randint(1024, 65535)
+                seq = cookie.make(target_ip, port, src_port)
+                options = timestamp_option(_now_ms())
+                packet = build_tcp_packet(src_ip, target_ip, src_port, port, seq, options=options)
+                # 응답이 전송 직후 바로 올 수 있으므로 보내기 전에 등록
+                with answered_lock:
+                    pending.add((target_ip, port))
+                self._send(send_skt, packet, target_ip)
+                block.append((target_ip, port))
+
+                if len(block) >= self.block_size:
+                    close_block()
+                    finalize_due()
+            close_block()
+
+            # 남은 블록은 deadline까지 응답을 기다린 뒤 판정
+            while in_flight and not stop.is_set():
+                wait = self._deadline(in_flight[0]) - time.monotonic()
+                if wait > 0:
+                    # RTT 추정치가 기다리는 동안 줄어들 수 있으므로 짧게 끊어서 다시 확인
+                    stop.wait(min(wait, 0.05))
+                    continue
+                self._finalize(in_flight, pending, answered, answered_lock, results)
+        except Exception as e:
+            results.put(e)
+        finally:
+            results.put(_DONE)
+
+    def _send(self, send_skt, packet, target_ip):
+        while True:
+            try:
+                send_skt.sendto(packet, (target_ip, 0))
+                return
+            except OSError as e:
+                # 송신 버퍼가 가득 찬 경우 잠깐 쉬었다가 재시도
+                if e.errno in (errno.ENOBUFS, errno.EAGAIN):
+                    time.sleep(0.001)
+                    continue
+                raise
+
+    def _deadline(self, entry):
+        """블록 판정 시각: 마지막 전송 후 블록 안에서 가장 느린 호스트의 timeout만큼 대기"""
+        _, hosts, sent_at = entry
+        return sent_at + max(self.timeout_for(target_ip) for target_ip in hosts)
+
+    def _finalize(self, in_flight, pending, answered, answered_lock, results):
+        block = in_flight.popleft()[0]
+        with answered_lock:
+            for key in block:
+                # 판정 이후에 오는 응답은 수신 스레드가 무시 (혼잡 윈도우에 두 번 반영되지 않도록)
+                pending.discard(key)
+                status = answered.pop(key, None)
+                if status is None and self.rate is not None:
+                    self.rate.on_drop()
+                results.put((key[0], key[1], status or "Filtered"))
+
+    def _receive_loop(self, recv_skt, send_skt, cookie, pending, answered, answered_lock, stop):
+        while not stop.is_set():
+            readable, _, _ = select.select([recv_skt], [], [], 0.2)
+            if not readable:
+                continue
+            try:
+                data = recv_skt.recv(65535)
+            except OSError as e:
+                logger.error(f"SYN receiver error: {e}")
+                continue
+            parsed = parse_tcp_packet(data)
+            if parsed is None:
+                continue
+            src_ip, dst_ip, sport, dport, seq, ack, flags, options = parsed
+            if not flags & TCP_ACK:
+                continue    # 우리가 보낸 SYN(loopback) 등은 무시
+            if not cookie.validate(src_ip, sport, dport, ack):
+                continue    # 다른 트래픽 또는 위조 응답
+
+            if flags & (TCP_SYN | TCP_ACK) == TCP_SYN | TCP_ACK:
+                status = "Open"
+                # RST 보내서 연결 끊기 (Stealth, 늦게 온 SYN-ACK에도)
+                rst = build_tcp_packet(dst_ip, src_ip, dport, sport, ack, flags=TCP_RST, window=0)
+                try:
+                    send_skt.sendto(rst, (src_ip, 0))
+                except OSError:
+                    pass
+            elif flags & TCP_RST:
+                status = "Closed"
+            else:
+                continue
+
+            with answered_lock:
+                key = (src_ip, sport)
+                if key not in pending or key in answered:
+                    continue    # 이미 판정된 프로브에 늦게 온 응답, 재전송된 SYN-ACK 등 중복 응답
+                answered[key] = status
+            if status == "Open":
+                echoed = parse_timestamp_echo(options)
+                if echoed is not None:
+                    self.observe_rtt(src_ip, ((_now_ms() - echoed) & 0xffffffff) / 1000.0)
+            if self.rate is not None:
+                self.rate.on_response()
@@ -0,0 +1,264 @@
+import collections
+import heapq
+import itertools
+import selectors
+import socket
+import time
+from core.scan_types.base import BaseScanner
+from core.udp_probes import describe_reply, payload_for
+
+# ICMP 응답 속도를 추정할 때 보는 최근 구간 (초)
+ICMP_RATE_WINDOW = 2.0
+# 속도 제한이 확인된 호스트에 보내는 프로브 간격의 범위 (초)
+# 많은 OS의 ICMP port unreachable 제한이 호스트당 초당 1개 정도이므로 최대 간격은 1초
+MIN_PACE_INTERVAL = 0.001
+MAX_PACE_INTERVAL = 1.0
+# 속도 제한 중인 호스트의 대기열에 쌓아 둘 수 있는 프로브 수 (concurrency의 배수)
+# 넘치면 새 대상을 꺼내지 않고 기다림 (모든 호스트가 제한 중이면 그 속도로 스캔)
+DEFERRED_FACTOR = 4
+
+
+class _HostIcmp:
+    """
+    호스트별 ICMP 응답 기록과 전송 간격
+    많은 OS가 ICMP port unreachable을 호스트당 초당 1개 정도로 제한하므로,
+    ICMP를 보내던 호스트가 조용해지면 필터링이 아니라 속도 제한일 가능성이 큽니다.
+    이때부터 그 호스트로 가는 프로브(새 프로브와 재전송 모두)는 interval 간격으로만 보내며,
+    간격 안에서 ICMP가 오면 조금씩 줄이고(AIMD의 증가), 무응답이 나오면 늘립니다.
+    """
+    def __init__(self):
+        self.received = 0
+        self.recent = collections.deque()
+        self.interval = None        # None이면 속도 제한 없음 (제한이 확인되기 전)
+        self.paced_since = None     # 간격 조절은 이 시각 이후 보낸 프로브의 결과로만 (이전에 몰아 보낸 프로브 제외)
+        self.next_send = 0.0
+        self.queue = collections.deque()   # 간격을 기다리는 (port, 시도 횟수)
+
+    def on_icmp(self, now, sent):
+        self.received += 1
+        self.recent.append(now)
+        while self.recent and now - self.recent[0] > ICMP_RATE_WINDOW:
+            self.recent.popleft()
+        if self.interval is not None and sent >= self.paced_since:
+            self.interval = max(MIN_PACE_INTERVAL, self.interval * 0.9)
+
+    def rate(self, now):
+        """최근 관측된 ICMP 응답 속도 (초당 개수, 최소 1)"""
+        while self.recent and now - self.recent[0] > ICMP_RATE_WINDOW:
+            self.recent.popleft()
+        return max(1.0, len(self.recent) / ICMP_RATE_WINDOW)
+
+    def on_silence(self, now, sent):
+        """ICMP를 보내던 호스트의 무응답: 속도 제한으로 보고 간격을 정하거나 늘림"""
+        if self.interval is None:
+            self.interval = min(MAX_PACE_INTERVAL, 1.0 / self.rate(now))
+            self.paced_since = now
+        elif sent >= self.paced_since:
+            self.interval = min(MAX_PACE_INTERVAL, self.interval * 2)
+
+
+class _UdpProbe:
+    __slots__ = ('target_ip', 'port', 'attempt', 'sent', 'sock', 'done')
+
+    def __init__(self, target_ip, port, attempt, sock):
+        self.target_ip = target_ip
+        self.port = port
+        self.attempt = attempt
+        self.sent = time.monotonic()
+        self.sock = sock
+        self.done = False
+
+
+class UdpScanner(BaseScanner):
+    """
+    UDP 스캔
+    - 잘 알려진 포트(DNS, NTP, NetBIOS, SNMP, SSDP)에는 프로토콜에 맞는 요청을, 나머지는 빈 데이터그램을 전송
+    - 응답 데이터그램 -> Open, ICMP port unreachable -> Closed, 그 외 ICMP 오류 -> Filtered,
+      응답 없음 -> Open|Filtered
+    프로브마다 connect()한 UDP 소켓을 쓰므로 raw 소켓 권한 없이도 커널이 ICMP 오류를
+    해당 소켓의 recv() 예외(ECONNREFUSED 등)로 전달해 줍니다.
+
+    ICMP 속도 제한 대응:
+    ICMP를 보낸 적 없는 호스트(방화벽 차단)는 timeout 즉시 Open|Filtered로 확정합니다.
+    ICMP를 보내던 호스트에서 무응답이 나오면 속도 제한으로 보고, 그 호스트로 가는 프로브는
+    새 프로브까지 모두 호스트별 대기열에 넣어 관측된 ICMP 속도에 맞춘 간격으로만 보냅니다
+    (무응답 포트는 대기열 맨 앞에 다시 넣어 retries번까지 재전송).
+    그동안 다른 호스트의 프로브는 계속 보내므로 스캔 전체가 한 호스트의 제한 속도에 묶이지 않으며,
+    모든 호스트가 제한 중이면 대기열이 concurrency x DEFERRED_FACTOR개에서 멈춰 그 속도로 진행합니다.
+    """
+    proto = 'udp'
+
+    def __init__(self, timeout=1.0, concurrency=1000, retries=1, rtt=None, rate=None):
+        super().__init__(timeout, rtt, rate)
+        self.concurrency = self._limit_concurrency(concurrency)
+        self.retries = retries
+        self.max_deferred = self.concurrency * DEFERRED_FACTOR
+        self._services = {}
+        # 응답 수신용 버퍼 (데이터그램마다 64KB를 새로 할당하지 않음)
+        self._buffer = bytearray(65535)
+
+    def take_service(self, target_ip, port):
+        return self._services.pop((target_ip, port), None)
+
+    def scan(self, target_ip, port, src_port):
+        """단일 포트 스캔 (기존 엔진과 동일한 인터페이스, src_port는 커널이 정함)"""
+        for _, _, status in self.scan_batch([(target_ip, port)]):
+            return status
+
+    def scan_batch(self, targets):
+        """
+        소켓 concurrency개까지 프로브를 띄워 두고 selector로 응답을 기다리며, 확정되는 순서대로 내보냅니다.
+        targets는 필요할 때마다 하나씩 꺼내 쓰므로 큰 범위도 미리 펼치지 않습니다.
+        """
+        targets = iter(targets)
+        selector = selectors.DefaultSelector()
+        hosts = collections.defaultdict(_HostIcmp)
+        deadlines = []      # (deadline, 순번, _UdpProbe)
+        ready = []          # 대기열이 있는 속도 제한 호스트: (다음 전송 가능 시각, 순번, ip)
+        order = itertools.count()
+        deferred = 0        # 호스트 대기열에 들어 있는 프로브 수
+        carry = None        # 혼잡 윈도우가 가득 차 아직 보내지 못한 프로브
+        exhausted = False
+
+        def defer(target_ip, host, port, attempt, front=False):
+            nonlocal deferred
+            if not host.queue:
+                heapq.heappush(ready, (host.next_send, next(order), target_ip))
+            if front:
+                host.queue.appendleft((port, attempt))
+            else:
+                host.queue.append((port, attempt))
+            deferred += 1
+
+        try:
+            while True:
+                # 1. 전송 (간격이 된 속도 제한 호스트의 대기열 먼저, 그다음 새 대상)
+                now = time.monotonic()
+                while len(selector.get_map()) < self.concurrency:
+                    if carry is None:
+                        if ready and ready[0][0] <= now:
+                            _, _, target_ip = heapq.heappop(ready)
+                            host = hosts[target_ip]
+                            port, attempt = host.queue.popleft()
+                            deferred -= 1
+                            host.next_send = now + host.interval
+                            if host.queue:
+                                heapq.heappush(ready, (host.next_send, next(order), target_ip))
+                            carry = (target_ip, port, attempt)
+                        elif not exhausted and deferred < self.max_deferred:
+                            target = next(targets, None)
+                            if target is None:
+                                exhausted = True
+                                continue
+                            host = hosts.get(target[0])
+                            if host is not None and host.interval is not None:
+                                # 속도 제한 중인 호스트: 다른 호스트를 먼저 보내고 간격에 맞춰 전송
+                                defer(target[0], host, target[1], 0)
+                                continue
+                            carry = (target[0], target[1], 0)
+                        else:
+                            break
+                    if self.rate is not None:
+                        delay = self.rate.try_acquire()
+                        if delay is None:
+                            break
+                        if delay > 0:
+                            time.sleep(delay)
+                    target_ip, port, attempt = carry
+                    carry = None
+                    probe = self._send(target_ip, port, attempt)
+                    if isinstance(probe, str):
+                        # 전송 자체가 실패 (예: 경로 없음)
+                        if self.rate is not None:
+                            self.rate.on_drop()
+                        yield target_ip, port, probe
+                        continue
+                    selector.register(probe.sock, selectors.EVENT_READ, probe)
+                    heapq.heappush(deadlines, (probe.sent + self.timeout_for(target_ip), next(order), probe))
+
+                if exhausted and carry is None and not deferred and not selector.get_map():
+                    break
+
+                # 2. 수신 (다음 timeout/대기열 전송 시각까지, 전송 슬롯을 기다리는 중이면 짧게)
+                wake = [entry[0] for entry in (deadlines[:1] + ready[:1])]
+                wait = max(0.0, min(wake) - time.monotonic()) if wake else 0.05
+                if carry is not None:
+                    wait = min(wait, 0.001)
+                if selector.get_map():
+                    events = selector.select(wait)
+                else:
+                    time.sleep(wait)
+                    events = []
+                for key, _ in events:
+                    probe = key.data
+                    status, service = self._receive(probe, hosts)
+                    if status is None:
+                        continue
+                    self._finish(selector, probe)
+                    if self.rate is not None:
+                        self.rate.on_response()
+                    if service is not None:
+                        self._services[(probe.target_ip, probe.port)] = service
+                    yield probe.target_ip, probe.port, status
+
+                # 3. timeout 처리 (속도 제한 호스트는 간격을 늘리고 대기열 맨 앞에서 재전송, 그 외 Open|Filtered 확정)
+                now = time.monotonic()
+                while deadlines and deadlines[0][0] <= now:
+                    _, _, probe = heapq.heappop(deadlines)
+                    if probe.done:
+                        continue
+                    self._finish(selector, probe)
+                    host = hosts.get(probe.target_ip)
+                    if host is None or not host.received:
+                        # ICMP를 보낸 적 없는 호스트: 무응답이 정상 (방화벽 또는 열린 포트)
+                        if self.rate is not None:
+                            self.rate.on_drop()
+                        yield probe.target_ip, probe.port, "Open|Filtered"
+                        continue
+                    # ICMP 속도 제한으로 인한 무응답은 혼잡 신호가 아니므로 윈도우를 줄이지 않음
+                    if self.rate is not None:
+                        self.rate.on_response()
+                    host.on_silence(now, probe.sent)
+                    if probe.attempt < self.retries:
+                        defer(probe.target_ip, host, probe.port, probe.attempt + 1, front=True)
+                    else:
+                        yield probe.target_ip, probe.port, "Open|Filtered"
+        finally:
+            for key in list(selector.get_map().values()):
+                key.fileobj.close()
+            selector.close()
+
+    def _send(self, target_ip, port, attempt):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        try:
+            sock.connect((target_ip, port))
+            sock.send(payload_for(port))
+        except OSError:
+            sock.close()
+            return "Filtered"
+        return _UdpProbe(target_ip, port, attempt, sock)
+
+    def _receive(self, probe, hosts):
+        """읽을 수 있게 된 소켓 처리 -> (상태, 서비스 정보), 아직 판단할 수 없으면 (None, None)"""
+        now = time.monotonic()
+        try:
+            size = probe.sock.recv_into(self._buffer)
+        except BlockingIOError:
+            return None, None
+        except (ConnectionRefusedError, ConnectionResetError):
+            # ICMP port unreachable (Windows는 WSAECONNRESET)
+            hosts[probe.target_ip].on_icmp(now, probe.sent)
+            self.observe_rtt(probe.target_ip, now - probe.sent)
+            return "Closed", None
+        except OSError:
+            # ICMP host/network unreachable, 관리적 차단 등
+            hosts[probe.target_ip].on_icmp(now, probe.sent)
+            return "Filtered", None
+        self.observe_rtt(probe.target_ip, now - probe.sent)
+        return "Open", describe_reply(probe.port, bytes(self._buffer[:size]))
+
+    def _finish(self, selector, probe):
+        probe.done = True
+        selector.unregister(probe.sock)
+        probe.sock.close()
@@ -1,109 +1,279 @@
+import datetime
+import itertools
+import os
+import threading
 import time
-import random
+import zlib
 from core.analyzer import ServiceDetector
-from utils.validator import is_valid_ip, is_valid_port
+from core.checkpoint import ProgressTracker, ScanCheckpoint
+from core.discovery import DEFAULT_METHODS, DEFAULT_TCP_PORTS, HostDiscovery
+from core.fingerprint_cache import FingerprintCache
+from core.output import ResultWriter, create_sinks
+from core.pipeline import AsyncDetectionPipeline, DetectionPipeline
+from core.portset import PortSet
+from core.protocols.dns import CHAOS_NAMES, DnsUdpProber
+from core.probes import ProbeDatabase
+from core.scheduler import ScanScheduler, ShardedScheduler, parse_shard
+from core.targets import TargetSet
+from core.rate import RateController
+from core.timing import RttEstimator
+from utils.logger import app_logger as logger
 
 # [변경] 스캔 타입 모듈들 가져오기
 from core.scan_types.syn import SynScanner
 from core.scan_types.connect import ConnectScanner
+from core.scan_types.async_connect import AsyncConnectScanner
+from core.scan_types.udp import UdpScanner
 
 class PortScanner:
     def __init__(self, config):
         self.config = config
-        self.target_ip_str = config['target']['ip']
-        self.ports_str = str(config['target']['ports'])
+        ports = config['target']['ports']
+        self.ports_str = ','.join(map(str, ports)) if isinstance(ports, list) else str(ports)
 
-        # IP 주소 유효성 검사
-        if not is_valid_ip(self.target_ip_str):
-            raise ValueError(f"유효하지 않은 IP 주소입니다: {self.target_ip_str}")
+        # 대상 해석 및 유효성 검사 (단일 IP, CIDR, 범위, 목록 모두 허용 - 잘못되면 ValueError)
+        self.targets = TargetSet(config['target']['ip'])
+        self.target_ip_str = str(self.targets)
 
         # 옵션 로드
         self.timeout = config['scan_options'].get('timeout', 1.0)
+
+        # 적응형 timeout: 호스트별 RTT를 추적해 프로브/배너 대기 시간을 줄임
+        adaptive = config['scan_options'].get('adaptive_timeout') or {}
+        self.rtt = None
+        if adaptive.get('enabled', False):
+            self.rtt = RttEstimator(
+                initial_timeout=self.timeout,
+                min_timeout=adaptive.get('min', 0.05),
+                max_timeout=adaptive.get('max', self.timeout),
+            )
+        self.banner_timeout_min = adaptive.get('banner_min', 0.5)
+        self.banner_timeout_max = adaptive.get('banner_max', 2.0)
         self.scan_mode = config['scan_options'].get('mode', 'SYN')
+        self.concurrency = config['scan_options'].get('concurrency', 1000)
+        # UDP 모드: ICMP 속도 제한으로 응답이 없던 포트의 재전송 횟수
+        udp_cfg = config['scan_options'].get('udp') or {}
+        self.udp_retries = udp_cfg.get('retries', 1)
 
         self.randomize = config['scan_options'].get('randomize_order', False)
-        self.jitter_min = config['scan_options']['timing_jitter'].get('min', 0)
-        self.jitter_max = config['scan_options']['timing_jitter'].get('max', 0)
+        self.seed = config['scan_options'].get('seed')
+        jitter = config['scan_options'].get('timing_jitter') or {}
+        self.jitter_min = jitter.get('min', 0)
+        self.jitter_max = jitter.get('max', 0)
+
+        # 전송 속도 제어 (pps 상한 + 혼잡 윈도우 + jitter 스케줄링)
+        # 설정이 없고 jitter도 없으면 기존처럼 제한 없이 전송
+        rate_cfg = config['scan_options'].get('rate') or {}
+        self.rate = None
+        if rate_cfg or self.jitter_max > 0:
+            self.rate = RateController(
+                pps=rate_cfg.get('pps', 0),
+                jitter_min=self.jitter_min,
+                jitter_max=self.jitter_max,
+                cwnd_init=rate_cfg.get('cwnd_init', 256),
+                cwnd_min=rate_cfg.get('cwnd_min', 16),
+                cwnd_max=rate_cfg.get('cwnd_max', 65536),
+            )
+
+        # 호스트 탐색 (기본값: 대상이 여러 개일 때만 수행)
+        discovery_cfg = config.get('discovery') or {}
+        self.discovery_enabled = discovery_cfg.get('enabled', len(self.targets) > 1)
+        self.discovery = HostDiscovery(
+            timeout=discovery_cfg.get('timeout', self.timeout),
+            methods=discovery_cfg.get('methods', DEFAULT_METHODS),
+            tcp_ports=discovery_cfg.get('tcp_ports', DEFAULT_TCP_PORTS),
+            rate=RateController(pps=rate_cfg.get('pps', 0), cwnd_init=None) if rate_cfg.get('pps') else None,
+        )
+
+        # UDP DNS 조회: 소켓 하나로 모든 대상에 version.bind 등 CHAOS TXT 질의 (잘린 응답만 TCP로 재질의)
+        dns_cfg = config.get('dns_udp') or {}
+        self.dns_udp = None
+        # DNS 질의 단계를 마쳤는지 (체크포인트에 저장해 재개 시 다시 보내거나 건너뜀)
+        self.dns_done = False
+        if dns_cfg.get('enabled', False):
+            self.dns_udp = DnsUdpProber(
+                timeout=dns_cfg.get('timeout', 2.0),
+                names=dns_cfg.get('names', CHAOS_NAMES),
+                retries=dns_cfg.get('retries', 1),
+                rate=RateController(pps=rate_cfg.get('pps', 0), cwnd_init=None) if rate_cfg.get('pps') else None,
+            )
+
+        # 서비스 탐지 결과 캐시: 안정적인 서비스는 반복 스캔에서 프로토콜 교환을 생략
+        cache_cfg = config['advanced'].get('fingerprint_cache') or {}
+        self.fingerprint_cache = None
+        if cache_cfg.get('enabled', False):
+            self.fingerprint_cache = FingerprintCache(
+                path=cache_cfg.get('path', "logs/fingerprint_cache.json"),
+                ttl=cache_cfg.get('ttl', 86400),
+                max_entries=cache_cfg.get('max_entries', 10000),
+            ).load()
+
+        # 전담 핸들러가 없는 포트용 프로브 DB (probe_file이 없으면 기본 프로브 사용)
+        probe_intensity = config['advanced'].get('probe_intensity', 7)
+        probe_file = config['advanced'].get('probe_file')
+        if probe_file:
+            probe_db = ProbeDatabase.load(probe_file, intensity=probe_intensity)
+        else:
+            probe_db = ProbeDatabase(intensity=probe_intensity)
 
-        self.detector = ServiceDetector()
+        # SSH는 기본적으로 KEXINIT만 읽고, ssh_deep이면 paramiko 키 교환 + 인증 방식 확인
+        # HTTP는 http_paths의 경로들을 keep-alive 연결 하나로 차례대로 요청 (기본값은 '/'만)
+        handler_options = {
+            'SshProtocol': {'deep': config['advanced'].get('ssh_deep', False)},
+            'HttpProtocol': {'paths': config['advanced'].get('http_paths', ['/'])},
+        }
+        self.detector = ServiceDetector(cache=self.fingerprint_cache, probe_db=probe_db,
+                                        max_probes=config['advanced'].get('max_probes', 4),
+                                        handler_options=handler_options)
         self.detect_service = config['advanced'].get('service_detection', False)
+        self.detection_workers = config['advanced'].get('detection_workers', 16)
+        self.detection_queue_size = config['advanced'].get('detection_queue_size', 256)
+        # 비동기 탐지: 이벤트 루프 하나에서 detection_concurrency개의 배너 교환을 동시에 진행
+        self.async_detection = config['advanced'].get('async_detection', False)
+        self.detection_concurrency = config['advanced'].get('detection_concurrency', 1000)
+        # CONNECT 계열 모드에서 스캔 연결을 서비스 탐지에 그대로 넘길지 여부
+        self.reuse_connection = self.detect_service and config['advanced'].get('reuse_connection', False)
+
+        # (host, port) -> 서비스 정보 (Open 포트만 보관, TCP 외 프로토콜은 (host, port, proto))
+        self.results = {}
+        self._report_lock = threading.Lock()
+        self.console_output = config['logging'].get('console_output', 'all')
+
+        # 체크포인트: 주기적으로 진행 상태를 저장하고 --resume 시 이어서 스캔
+        checkpoint_cfg = config.get('checkpoint') or {}
+        self.resume = checkpoint_cfg.get('resume', False)
+        self.checkpoint = None
+        if checkpoint_cfg.get('enabled', False) or self.resume:
+            self.checkpoint = ScanCheckpoint(checkpoint_cfg.get('path', "logs/scan_state.json"))
+        self.checkpoint_interval = checkpoint_cfg.get('interval', 30)
+
+        # 구조화된 결과 저장 (JSONL/CSV/SQLite) - 별도 스레드에서 기록
+        self.sinks = create_sinks(config.get('output'))
+        self.writer = None
+        # 결과 레코드를 받아볼 추가 함수들 (모니터링 모드 등)
+        self.listeners = []
+        self.pipeline = None
+
+        # 샤드: 호스트 x 포트 공간을 N개로 나눈 것 중 이 프로세스가 맡은 부분 ([(번호, 샤드 수)], 중첩 가능)
+        # 샤드가 있으면 호스트 탐색 결과로 대상을 줄이지 않고 alive로 거르기만 함 (샤드 간 위치 공간을 같게 유지)
+        self.shards = []
+        self.alive = None
+        # alive에 없어 건너뛴 (host, port)를 알려줄 함수 (병렬 스캔의 결과 정렬용)
+        self.on_skip = None
+        # False면 스캔이 끝나도 핑거프린트 캐시를 저장하지 않음 (병렬 스캔 워커는 부모가 합쳐서 저장)
+        self.persist_cache = True
+        self.scheduler = None
+        if config.get('shard'):
+            self.add_shard(*parse_shard(config['shard']))
 
         # [핵심] 현재 모드에 맞는 스캐너 인스턴스 준비 (Factory 패턴)
         self.scanner_engine = self._get_scanner_engine()
+        # 넘겨받을 연결은 탐지 대기열 + 동시에 진행 중인 탐지 수만큼만 열어 둠
+        if self.reuse_connection:
+            in_progress = self.detection_concurrency if self.async_detection else self.detection_workers
+            self.scanner_engine.max_kept_sockets = self.detection_queue_size + in_progress
+
+    def add_shard(self, index, count):
+        """
+        스캔 공간을 count개로 나눈 것 중 index번째(0부터)만 맡음
+        랜덤 순서에서 seed가 없으면 대상/포트로 정해지는 seed를 써서 모든 샤드가 같은 순열을 씀
+        """
+        self.shards.append((index, count))
+        if self.randomize and self.seed is None:
+            self.seed = zlib.crc32(f"{self.target_ip_str}|{self.ports_str}".encode())
+        if self.checkpoint:
+            root, ext = os.path.splitext(self.checkpoint.path)
+            self.checkpoint.path = f"{root}.shard{index + 1}of{count}{ext}"
+
+    @property
+    def shard_label(self):
+        """예: '2/4' (중첩이면 '2/4, 1/8')"""
+        return ', '.join(f"{index + 1}/{count}" for index, count in self.shards) or None
+
+    def make_scheduler(self, seed=None):
+        """호스트 x 포트 스케줄러 (샤드가 있으면 맡은 부분만 순회)"""
+        scheduler = ScanScheduler(self.targets, self._parse_ports(self.ports_str), randomize=self.randomize,
+                                  seed=seed if seed is not None else self.seed)
+        for index, count in self.shards:
+            scheduler = ShardedScheduler(scheduler, index, count)
+        return scheduler
 
     def _get_scanner_engine(self):
         """설정된 모드에 맞는 스캔 클래스를 반환"""
         if self.scan_mode == 'SYN':
-            return SynScanner(timeout=self.timeout)
+            return SynScanner(timeout=self.timeout, rtt=self.rtt, rate=self.rate)
         elif self.scan_mode == 'CONNECT': # [추가됨] 주석 해제 및 구현
-            return ConnectScanner(timeout=self.timeout)
+            return ConnectScanner(timeout=self.timeout, keep_open=self.reuse_connection,
+                                  rtt=self.rtt, rate=self.rate)
+        elif self.scan_mode == 'ASYNC':
+            return AsyncConnectScanner(timeout=self.timeout, concurrency=self.concurrency,
+                                       keep_open=self.reuse_connection, rtt=self.rtt, rate=self.rate)
+        elif self.scan_mode == 'UDP':
+            return UdpScanner(timeout=self.timeout, concurrency=self.concurrency, retries=self.udp_retries,
+                              rtt=self.rtt, rate=self.rate)
         else:
             print(f"[!] 경고: 지원하지 않는 모드입니다({self.scan_mode}). SYN 모드로 대체합니다.")
-            return SynScanner(timeout=self.timeout)
+            return SynScanner(timeout=self.timeout, rtt=self.rtt, rate=self.rate)
 
     def _parse_ports(self, ports_str):
-        # (기존 코드 유지)
-        target_ports = set()
-        parts = ports_str.split(',')
-        for part in parts:
-            part = part.strip()
-            if '-' in part:
-                start, end = map(int, part.split('-'))
-                if not (is_valid_port(start) and is_valid_port(end)):
-                    print(f"[!] 유효하지 않은 포트 범위: {part}")
-                    continue
-                target_ports.update(range(start, end + 1))
-            else:
-                port = int(part)
-                if not is_valid_port(port):
-                    print(f"[!] 유효하지 않은 포트 번호: {port}")
-                    continue
-                target_ports.add(port)
-        return list(target_ports)
+        """포트 명세를 구간 기반 PortSet으로 변환 (포트를 미리 펼치지 않음)"""
+        target_ports = PortSet(ports_str)
+        for part in target_ports.rejected:
+            print(f"[!] 유효하지 않은 포트 지정: {part}")
+        return target_ports
 
-    def run(self):
-        # 색상 코드
-        GREEN = "\033[92m"  # Open
-        YELLOW = "\033[93m"  # Filtered
-        RED = "\033[91m"  # Closed
-        RESET = "\033[0m"
+    def _banner_timeout(self, host):
+        """배너 수집 timeout: 프로브 timeout의 몇 배를 banner_min ~ banner_max 사이로 제한"""
+        return self.rtt.scaled_timeout(host, 4, self.banner_timeout_min, self.banner_timeout_max)
 
-        target_ports = self._parse_ports(self.ports_str)
+    def _report(self, target_ip, port, status, service_info="Unknown", detect_time=None, proto='tcp'):
+        """결과 한 건을 레코드로 만들어 내보냄 (탐지 워커와 공유)"""
+        srtt = self.rtt.srtt(target_ip) if self.rtt else None
+        record = {
+            'timestamp': datetime.datetime.now().isoformat(timespec='milliseconds'),
+            'host': target_ip,
+            'port': port,
+            'proto': proto,
+            'state': status,
+            'service': service_info,
+            'rtt': round(srtt, 6) if srtt is not None else None,
+            'detect_time': round(detect_time, 6) if detect_time is not None else None,
+        }
 
-        if self.randomize:
-            random.shuffle(target_ports)
-
-        print(f"[*] Target: {self.target_ip_str}, Mode: {self.scan_mode}")
-        print("-" * 60)
-        print(f"{'PORT':<10} {'STATUS':<20} {'SERVICE'}")
-        print("-" * 60)
+        # 닫히거나 필터링된 포트의 캐시 항목은 다음에 다시 열려도 쓰지 않도록 삭제
+        # (캐시는 TCP 서비스 탐지 결과이므로 같은 번호의 UDP 결과로는 지우지 않음)
+        if self.fingerprint_cache is not None and status != "Open" and proto == 'tcp':
+            self.fingerprint_cache.invalidate(target_ip, port)
 
-        # 콘솔 출력 설정 로드
-        console_output = self.config['logging'].get('console_output', 'all')
+        self._publish(record)
 
-        for port in target_ports:
-            # 1. Jitter (지연 시간) 적용
-            if self.jitter_max > 0:
-                time.sleep(random.uniform(self.jitter_min, self.jitter_max))
+    def _publish(self, record):
+        """
+        결과 레코드를 결과 싱크/listener/콘솔로 내보내고 (host, port) 기준으로 합침 (lock 사용)
+        병렬 스캔에서는 부모 프로세스가 워커들의 레코드를 순서대로 이 함수에 넘깁니다.
+        """
+        if self.writer:
+            self.writer.submit(record)
+        for listener in self.listeners:
+            listener(record)
 
-            # 2. 소스 포트 랜덤 생성 (공통 기능은 여기서 처리)
-            src_port = random.randint(1024, 65535)
+        target_ip, port, proto = record['host'], record['port'], record['proto']
+        status, service_info = record['state'], record['service']
 
-            # [핵심 변경] 선택된 스캐너 엔진에게 스캔 위임
-            # scanner.py는 구체적인 패킷 조작법을 몰라도 됨
-            status = self.scanner_engine.scan(self.target_ip_str, port, src_port)
+        # 색상 코드
+        GREEN = "\033[92m"  # Open
+        YELLOW = "\033[93m"  # Filtered
+        RED = "\033[91m"  # Closed
+        RESET = "\033[0m"
 
-            # 3. 결과 처리 및 서비스 탐지
-            service_info = "Unknown"
+        with self._report_lock:
             if status == "Open":
-                if self.detect_service:
-                    print(f"    [>] Port {port} 정밀 분석 중...", end='\r')
-                    service_info = self.detector.get_banner(self.target_ip_str, port)
+                self.results[(target_ip, port) if proto == 'tcp' else (target_ip, port, proto)] = service_info
 
             # 색상 적용
             if status == "Open":
                 colored_status = f"{GREEN}{status}{RESET}"
-            elif status == "Filtered":
+            elif status in ("Filtered", "Open|Filtered"):
                 colored_status = f"{YELLOW}{status}{RESET}"
             elif status == "Closed":
                 colored_status = f"{RED}{status}{RESET}"
@@ -111,9 +281,206 @@ class PortScanner:
                 colored_status = status
 
             # 콘솔 출력 조건에 따라 출력
-            if console_output == "open_only" and status != "Open":
+            if self.console_output == "open_only" and status != "Open":
+                return
+            elif self.console_output == "none":
+                return
+
+            port_label = port if proto == 'tcp' else f"{port}/{proto}"
+            print(f"{target_ip:<16} {port_label:<10} {colored_status:<28} {service_info}")
+
+    def _load_checkpoint(self):
+        """--resume 시 저장된 상태를 읽고 현재 설정과 같은 스캔인지 확인"""
+        state = self.checkpoint.load()
+        if state is None:
+            print(f"[!] 재개할 체크포인트가 없습니다: {self.checkpoint.path} (처음부터 스캔합니다)")
+            return None
+        if state['config_target'] != self.target_ip_str or state['ports'] != self.ports_str \
+                or state['mode'] != self.scan_mode or state['randomize'] != bool(self.randomize) \
+                or state.get('shard') != self.shard_label:
+            raise ValueError("체크포인트와 현재 설정(대상/포트/모드/순서/샤드)이 달라 재개할 수 없습니다.")
+        return state
+
+    def _save_checkpoint(self, scheduler, tracker, pipeline):
+        watermark, completed = tracker.snapshot()
+        self.checkpoint.save({
+            'config_target': self.target_ip_str,
+            'ports': self.ports_str,
+            'mode': self.scan_mode,
+            'randomize': bool(self.randomize),
+            'shard': self.shard_label,
+            'targets': str(self.targets),       # 호스트 탐색 이후의 실제 대상
+            'alive': str(self.alive) if self.alive is not None else None,   # 샤드 스캔의 호스트 탐색 결과
+            'dns_done': self.dns_done,
+            'seed': scheduler.seed,
+            'total': len(scheduler),
+            'watermark': watermark,
+            'completed': completed,
+            'detection_backlog': pipeline.backlog() if pipeline else [],
+        })
+        self._last_checkpoint = time.monotonic()
+
+    def _pending_targets(self, scheduler, tracker):
+        """이미 끝난 위치를 건너뛰며 watermark부터 (host, port)를 생성 (alive에 없는 호스트는 완료 처리)"""
+        start = tracker.watermark
+        for position, target in enumerate(scheduler.iter_from(start), start=start):
+            if tracker.is_done(position):
                 continue
-            elif console_output == "none":
+            if self.alive is not None and target[0] not in self.alive:
+                tracker.complete(position)
+                if self.on_skip:
+                    self.on_skip(position)
                 continue
+            yield target
+
+    def _shard_hosts(self, hosts):
+        """호스트 단위 작업(UDP DNS 질의)을 샤드별로 나눔: 샤드마다 index번째부터 count개 간격의 호스트"""
+        hosts = iter(hosts)
+        for index, count in self.shards:
+            hosts = itertools.islice(hosts, index, None, count)
+        if self.alive is not None:
+            hosts = (host for host in hosts if host in self.alive)
+        return hosts
+
+    def _probe_dns_udp(self, hosts):
+        """UDP 53번 CHAOS TXT 질의 결과를 (host, 53/udp) 결과로 보고"""
+        start = time.monotonic()
+        answers = self.dns_udp.probe(hosts)
+        logger.info(f"DNS UDP probe: {len(answers)} hosts answered in {time.monotonic() - start:.2f}s")
+        for host, values in answers.items():
+            self._report(host, 53, "Open", DnsUdpProber.format(values), proto='udp')
+        self.dns_done = True
+
+    def scan_targets(self, targets, on_scanned=None, backlog=(), dns_hosts=None):
+        """
+        (host, port) 목록을 스캔 엔진 -> 서비스 탐지 파이프라인 -> 결과 출력/싱크 순으로 처리
+        :param targets: (host, port) iterable (필요할 때 하나씩 꺼냄)
+        :param on_scanned: 포트 상태가 확정될 때마다 호출할 함수 (host, port, status)
+        :param backlog: 포트 스캔 없이 바로 서비스 탐지에 넣을 (host, port) 목록
+        :param dns_hosts: UDP DNS 질의를 보낼 호스트 목록 (dns_udp 설정이 켜져 있을 때)
+        :return: (host, port) -> 서비스 정보 (Open 포트)
+        """
+        # 서비스 탐지는 별도 파이프라인 단계에서 진행 (느린 배너 수집이 포트 스캔을 막지 않도록)
+        self.pipeline = None
+        if self.detect_service:
+            options = dict(
+                on_result=lambda host, port, info, elapsed: self._report(host, port, "Open", info, elapsed),
+                workers=self.detection_workers,
+                queue_size=self.detection_queue_size,
+                timeout_for=self._banner_timeout if self.rtt else None,
+            )
+            if self.async_detection:
+                self.pipeline = AsyncDetectionPipeline(self.detector, concurrency=self.detection_concurrency,
+                                                       **options).start()
+            else:
+                self.pipeline = DetectionPipeline(self.detector, **options).start()
+        pipeline = self.pipeline
+
+        if self.sinks:
+            self.writer = ResultWriter(self.sinks).start()
+
+        try:
+            if pipeline:
+                for host, port in backlog:
+                    pipeline.submit(host, port)
+
+            # [핵심 변경] 선택된 스캐너 엔진에게 스캔 위임
+            # scanner.py는 구체적인 패킷 조작법을 몰라도 됨 (순차/비동기 엔진 모두 scan_batch 제공)
+            engine = self.scanner_engine
+            for target_ip, port, status in engine.scan_batch(targets):
+                if engine.proto != 'tcp':
+                    # UDP는 스캔 응답 자체로 서비스를 판단 (TCP 서비스 탐지 파이프라인을 거치지 않음)
+                    self._report(target_ip, port, status, engine.take_service(target_ip, port) or "Unknown",
+                                 proto=engine.proto)
+                elif status == "Open" and pipeline:
+                    pipeline.submit(target_ip, port, engine.take_socket(target_ip, port))
+                else:
+                    self._report(target_ip, port, status)
+                if on_scanned:
+                    on_scanned(target_ip, port, status)
+
+            if self.dns_udp and dns_hosts is not None and not self.dns_done:
+                self._probe_dns_udp(dns_hosts)
+
+            # 남은 서비스 탐지까지 끝낸 뒤 종료
+            if pipeline:
+                pipeline.close()
+        finally:
+            if self.writer:
+                self.writer.close()
+                self.writer = None
+            if self.fingerprint_cache is not None and self.persist_cache:
+                self.fingerprint_cache.save()
+
+        return self.results
+
+    def run(self):
+        state = self._load_checkpoint() if self.checkpoint and self.resume else None
+        if state:
+            # 재개: 저장된 (탐색 이후) 대상과 seed를 그대로 사용
+            self.targets = TargetSet(state['targets'])
+            if state.get('alive') is not None:
+                self.alive = TargetSet(state['alive'])
+            # DNS 질의 도중/이전에 중단됐으면 재개 후 다시 질의 (이미 보고했으면 중복 보고하지 않음)
+            self.dns_done = state.get('dns_done', False)
+            print(f"[*] 체크포인트에서 재개합니다: {state['watermark']}/{state['total']} 완료")
+
+        # 0. 호스트 탐색: 응답하지 않는 호스트는 포트 스캔에서 제외
+        elif self.discovery_enabled:
+            print(f"[*] 호스트 탐색 중... ({len(self.targets)} hosts)")
+            live_targets = self.discovery.discover(self.targets)
+            if live_targets is None:
+                print("[!] 살아있는 호스트가 없습니다.")
+                return self.results
+            print(f"[*] 살아있는 호스트: {len(live_targets)}/{len(self.targets)}")
+            if self.shards:
+                # 샤드 스캔: 모든 샤드가 같은 위치 공간을 쓰도록 대상은 그대로 두고 걸러내기만 함
+                self.alive = live_targets
+            else:
+                self.targets = live_targets
+
+        # 호스트 x 포트 스케줄러 (호스트들을 번갈아 가며 스캔)
+        # randomize_order는 목록을 섞지 않고 인덱스 공간의 순열로 순서만 바꿈 (O(1) 메모리)
+        # 샤드가 있으면 전체 순서에서 이 샤드가 맡은 위치만 순회
+        scheduler = self.make_scheduler(state['seed'] if state else None)
+        self.scheduler = scheduler
+        if self.randomize:
+            logger.info(f"Randomized scan order seed: {scheduler.seed}")
+        tracker = ProgressTracker(state['watermark'], state['completed']) if state else ProgressTracker()
+
+        shard = f", Shard: {self.shard_label} ({len(scheduler)} probes)" if self.shards else ""
+        print(f"[*] Target: {self.target_ip_str} ({len(self.targets)} hosts), Mode: {self.scan_mode}{shard}")
+        print("-" * 76)
+        print(f"{'HOST':<16} {'PORT':<10} {'STATUS':<20} {'SERVICE'}")
+        print("-" * 76)
+
+        finished = False
+        self._last_checkpoint = time.monotonic()
+        on_scanned = None
+        if self.checkpoint:
+            def on_scanned(target_ip, port, status):
+                tracker.complete(scheduler.position_of(target_ip, port))
+                if time.monotonic() - self._last_checkpoint >= self.checkpoint_interval:
+                    self._save_checkpoint(scheduler, tracker, self.pipeline)
+        try:
+            # 중단 전에 탐지가 끝나지 않았던 포트부터 다시 분석
+            self.scan_targets(self._pending_targets(scheduler, tracker), on_scanned=on_scanned,
+                              backlog=state['detection_backlog'] if state else (),
+                              dns_hosts=self._shard_hosts(self.targets) if self.dns_udp else None)
+            finished = True
+        finally:
+            if self.checkpoint:
+                if finished:
+                    self.checkpoint.clear()
+                else:
+                    # Ctrl-C/오류: 탐지 대기 목록까지 저장해 두고 --resume으로 이어서 실행
+                    self._save_checkpoint(scheduler, tracker, self.pipeline)
+                    print(f"\n[!] 진행 상태를 저장했습니다: {self.checkpoint.path} (--resume으로 재개)")
+
+        if self.rate:
+            logger.info(f"Rate control stats: {self.rate.stats()}")
+        if self.fingerprint_cache is not None:
+            logger.info(f"Fingerprint cache: {self.fingerprint_cache.hits} hits, "
+                        f"{self.fingerprint_cache.misses} misses, {len(self.fingerprint_cache)} entries")
 
-            print(f"{port:<10} {colored_status:<28} {service_info}")
\ No newline at end of file
+        return self.results
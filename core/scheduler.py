@@ -0,0 +1,119 @@
+# 호스트 x 포트 스캔 순서 결정
+from core.permutation import Permutation
+
+
+class ScanScheduler:
+    """
+    (호스트, 포트) 공간을 한 줄의 인덱스로 보고 순서대로 내보내는 스케줄러
+    포트 하나를 모든 호스트에 돌린 뒤 다음 포트로 넘어가므로(port-major),
+    한 호스트에 연속으로 프로브가 몰리지 않고 호스트들이 고르게 스캔됩니다.
+    index = port_index * 호스트 수 + host_index
+
+    randomize=True이면 인덱스 공간 전체를 Permutation으로 섞어 순회합니다.
+    순회 위치(position)는 seed와 함께 저장하면 그대로 이어서 돌릴 수 있습니다.
+    """
+    def __init__(self, targets, ports, randomize=False, seed=None):
+        self.targets = targets
+        self.ports = ports
+        self.permutation = Permutation(len(self), seed) if randomize else None
+
+    @property
+    def seed(self):
+        return self.permutation.seed if self.permutation else None
+
+    def __len__(self):
+        return len(self.targets) * len(self.ports)
+
+    def __getitem__(self, index):
+        port_index, host_index = divmod(index, len(self.targets))
+        return self.targets[host_index], self.ports[port_index]
+
+    def index_of(self, host, port):
+        return self.ports.index(port) * len(self.targets) + self.targets.index_of(host)
+
+    def at(self, position):
+        """순회 순서상 position번째 (호스트, 포트)"""
+        if self.permutation:
+            return self[self.permutation.forward(position)]
+        return self[position]
+
+    def position_of(self, host, port):
+        """(호스트, 포트)가 순회 순서상 몇 번째인지 (at의 역함수)"""
+        index = self.index_of(host, port)
+        return self.permutation.inverse(index) if self.permutation else index
+
+    def iter_from(self, start=0):
+        """start번째 위치부터 (호스트, 포트)를 순서대로 생성"""
+        if self.permutation:
+            for index in self.permutation.iter_from(start):
+                yield self[index]
+            return
+        host_count = len(self.targets)
+        port_index, host_index = divmod(start, host_count) if host_count else (0, 0)
+        for port in self.ports.iter_from(port_index):
+            for host_offset in range(host_index, host_count):
+                yield self.targets[host_offset], port
+            host_index = 0
+
+    def __iter__(self):
+        return self.iter_from(0)
+
+
+def parse_shard(spec):
+    """'i/N' (1 <= i <= N) -> (0부터 시작하는 샤드 번호, 샤드 수)"""
+    try:
+        index, count = (int(part) for part in str(spec).split('/'))
+    except ValueError:
+        raise ValueError(f"샤드는 'i/N' 형식이어야 합니다: {spec}")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"샤드 번호는 1 이상 {count} 이하여야 합니다: {spec}")
+    return index - 1, count
+
+
+class ShardedScheduler:
+    """
+    다른 스케줄러의 순회 순서에서 index번째 위치부터 count칸 간격으로 고른 위치만 순회 (i/N 샤드)
+    - 샤드는 (대상, 포트, 순서, seed)만으로 정해지므로 다른 프로세스/다른 장비에서 돌려도 겹치거나 빠지는 위치가 없음
+    - 간격을 두고 고르므로 각 샤드가 모든 호스트를 고르게 나눠 가짐 (한 호스트에 한 샤드가 몰리지 않음)
+    - 위치(position)는 샤드 안에서의 순번이라 체크포인트/재개 로직을 그대로 쓸 수 있고,
+      ShardedScheduler를 다시 나누면(장비별 샤드 -> 프로세스별 샤드) 중첩 샤드가 됩니다.
+    """
+    def __init__(self, base, index, count):
+        self.base = base
+        self.index = index
+        self.count = count
+
+    @property
+    def targets(self):
+        return self.base.targets
+
+    @property
+    def ports(self):
+        return self.base.ports
+
+    @property
+    def seed(self):
+        return self.base.seed
+
+    def __len__(self):
+        return max(0, (len(self.base) - self.index + self.count - 1) // self.count)
+
+    def base_position(self, position):
+        """샤드 안의 position -> base 스케줄러의 위치"""
+        return self.index + position * self.count
+
+    def at(self, position):
+        return self.base.at(self.base_position(position))
+
+    def position_of(self, host, port):
+        position, remainder = divmod(self.base.position_of(host, port) - self.index, self.count)
+        if remainder:
+            raise ValueError(f"{host}:{port} is not in shard {self.index + 1}/{self.count}")
+        return position
+
+    def iter_from(self, start=0):
+        for position in range(start, len(self)):
+            yield self.at(position)
+
+    def __iter__(self):
+        return self.iter_from(0)
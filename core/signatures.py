@@ -0,0 +1,190 @@
+# 배너 시그니처를 한 번에 대조하는 컴파일된 매처
+import re
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+from utils.logger import app_logger as logger
+
+
+class SignatureHit:
+    """매칭 결과 한 건: 서비스 이름, 버전 문자열(템플릿 적용), 원본 match 객체, 규칙 번호"""
+    def __init__(self, service, version, match, index):
+        self.service = service
+        self.version = version
+        self.match = match
+        self.index = index
+
+    def __str__(self):
+        return f"{self.service} ({self.version})" if self.version else self.service
+
+    def __repr__(self):
+        return f"SignatureHit({self.service!r}, {self.version!r})"
+
+
+class _Rule:
+    def __init__(self, index, service, pattern, version=None, flags=0):
+        if isinstance(pattern, re.Pattern):
+            flags |= pattern.flags
+            pattern = pattern.pattern
+        if isinstance(pattern, str):
+            pattern = pattern.encode('latin-1')
+        # str 정규식의 UNICODE 플래그는 bytes 정규식에서 쓸 수 없음
+        self.flags = flags & ~re.UNICODE
+        self.index = index
+        self.service = service
+        self.version = version
+        self.regex = re.compile(pattern, self.flags)
+        # 패턴 안의 인라인 플래그((?i), (?m) 등)까지 반영된 플래그 기준으로 판단
+        self.flags = self.regex.flags
+        self.icase = bool(self.flags & re.IGNORECASE)
+        self.literal, self.anchored = self._required_literal(pattern)
+
+    def _required_literal(self, pattern):
+        """
+        규칙이 매칭되려면 반드시 포함되어야 하는 가장 긴 리터럴 (없으면 None)
+        최상위 순서열의 항목은 모두 필수이므로 연속된 LITERAL만 모으면 됨
+        (분기는 BRANCH 항목 하나로 묶이므로 이웃 항목의 필수성에 영향 없음)
+        :return: (literal, 문자열 시작에 고정 여부)
+        """
+        try:
+            parsed = sre_parse.parse(pattern, self.flags)
+        except Exception as e:
+            logger.debug(f"Cannot extract literal from signature {self.service}: {e}")
+            return None, False
+
+        items = list(parsed)
+        anchored = bool(items) and items[0] == (sre_parse.AT, sre_parse.AT_BEGINNING) \
+            and not self.flags & re.MULTILINE
+        best, best_start = b'', -1
+        run, run_start = bytearray(), 0
+        for position, (op, av) in enumerate(items + [(None, None)]):
+            if op is sre_parse.LITERAL:
+                if not run:
+                    run_start = position
+                run.append(av)
+                continue
+            if len(run) > len(best):
+                best, best_start = bytes(run), run_start
+            run = bytearray()
+
+        if not best:
+            return None, False
+        if self.icase:
+            best = best.lower()
+        return best, anchored and best_start == 1
+
+    def apply(self, data):
+        match = self.regex.search(data)
+        if not match:
+            return None
+        version = None
+        if self.version:
+            groups = [group.decode('latin-1').strip() if group else ''
+                      for group in (match.group(0),) + match.groups()]
+            version = self.version.format(*groups)
+        return SignatureHit(self.service, version, match, self.index)
+
+
+class SignatureMatcher:
+    """
+    시그니처 규칙 전체를 하나의 리터럴 사전 필터로 컴파일해 배너를 한 번만 훑습니다.
+    1. 각 규칙에서 반드시 나와야 하는 리터럴을 뽑음 (예: '^SSH-([\\d.]+)' -> b'SSH-', 시작 고정)
+    2. 시작 고정 리터럴은 startswith, 나머지는 모든 리터럴을 묶은 정규식 하나로 한 번에 탐색
+    3. 리터럴이 나온 규칙(과 리터럴이 없는 규칙)만 실제 정규식을 실행
+    규칙 수가 늘어나도 배너당 정규식 실행은 후보 규칙 수만큼만 일어납니다.
+    규칙: (service, pattern[, version[, flags]]) - pattern은 str/bytes/컴파일된 정규식,
+    version은 캡처 그룹을 {1}, {2}...로 참조하는 템플릿
+    """
+    def __init__(self, rules):
+        self.rules = [_Rule(index, *rule) for index, rule in enumerate(rules)]
+        # 리터럴이 없어 항상 실행해야 하는 규칙
+        self._always = [rule.index for rule in self.rules if rule.literal is None]
+        # (icase 여부) -> {시작 고정 리터럴: [규칙 번호]}
+        self._prefixes = {False: {}, True: {}}
+        # (icase 여부) -> {리터럴: [규칙 번호]}
+        self._literals = {False: {}, True: {}}
+        for rule in self.rules:
+            if rule.literal is None:
+                continue
+            table = self._prefixes if rule.anchored else self._literals
+            table[rule.icase].setdefault(rule.literal, []).append(rule.index)
+        self._scanners = {icase: self._compile_scanner(literals) for icase, literals in self._literals.items()}
+
+    def _compile_scanner(self, literals):
+        """
+        모든 리터럴을 (?=(긴것|...|짧은것)) 하나로 묶어 위치마다 가장 긴 리터럴을 찾고,
+        같은 위치의 더 짧은 리터럴(접두사)은 미리 계산한 목록으로 함께 표시
+        """
+        if not literals:
+            return None
+        ordered = sorted(literals, key=len, reverse=True)
+        regex = re.compile(b'(?=(' + b'|'.join(re.escape(literal) for literal in ordered) + b'))')
+        implied = {}
+        for literal in ordered:
+            indexes = []
+            for other in ordered:
+                if literal.startswith(other):
+                    indexes.extend(literals[other])
+            implied[literal] = indexes
+        return regex, implied
+
+    def _candidates(self, data):
+        candidates = set(self._always)
+        lowered = None
+        for icase in (False, True):
+            prefixes, scanner = self._prefixes[icase], self._scanners[icase]
+            if not prefixes and scanner is None:
+                continue
+            if icase:
+                lowered = data.lower()
+                text = lowered
+            else:
+                text = data
+            for literal, indexes in prefixes.items():
+                if text.startswith(literal):
+                    candidates.update(indexes)
+            if scanner is not None:
+                regex, implied = scanner
+                for found in regex.finditer(text):
+                    candidates.update(implied[found.group(1)])
+        return sorted(candidates)
+
+    def scan(self, data):
+        """data(bytes)에 매칭되는 모든 규칙 결과 (규칙 순서)"""
+        if isinstance(data, str):
+            data = data.encode('utf-8', errors='surrogateescape')
+        hits = []
+        for index in self._candidates(data):
+            hit = self.rules[index].apply(data)
+            if hit:
+                hits.append(hit)
+        return hits
+
+    def first(self, data):
+        """규칙 순서상 처음 매칭되는 결과 (없으면 None)"""
+        if isinstance(data, str):
+            data = data.encode('utf-8', errors='surrogateescape')
+        for index in self._candidates(data):
+            hit = self.rules[index].apply(data)
+            if hit:
+                return hit
+        return None
+
+    def scan_many(self, banners):
+        """
+        결과 집합 전체를 오프라인으로 대조
+        :param banners: {key: 배너} 또는 (key, 배너) iterable
+        :return: {key: [SignatureHit, ...]} (같은 배너는 한 번만 대조)
+        """
+        if hasattr(banners, 'items'):
+            banners = banners.items()
+        seen = {}
+        results = {}
+        for key, data in banners:
+            if data not in seen:
+                seen[data] = self.scan(data)
+            results[key] = seen[data]
+        return results
@@ -0,0 +1,125 @@
+# 스캔 대상(IP 대역) 표현 및 지연 확장
+import bisect
+import ipaddress
+import socket
+
+from utils.validator import is_valid_domain, is_valid_ip
+
+
+class TargetSet:
+    """
+    단일 IP, CIDR(10.0.0.0/24), 범위(10.0.0.1-10.0.0.50 또는 10.0.0.1-50),
+    도메인 이름, 그리고 이들의 목록(쉼표 구분 문자열 또는 YAML 리스트)을 받아
+    IPv4 정수 구간 목록으로 보관합니다.
+    주소를 미리 펼치지 않으므로 /16 같은 큰 대역도 구간 몇 개 분량의 메모리만 사용합니다.
+    """
+    def __init__(self, spec):
+        if isinstance(spec, (list, tuple)):
+            parts = [str(p) for p in spec]
+        else:
+            parts = str(spec).split(',')
+
+        ranges = []
+        for part in parts:
+            part = part.strip()
+            if part:
+                ranges.append(self._parse_part(part))
+        if not ranges:
+            raise ValueError(f"스캔 대상이 비어 있습니다: {spec}")
+
+        self.ranges = self._coalesce(ranges)
+        # 구간별 누적 개수 (인덱스 -> 주소 변환용)
+        self._offsets = []
+        total = 0
+        for start, end in self.ranges:
+            self._offsets.append(total)
+            total += end - start + 1
+        self._size = total
+
+    @staticmethod
+    def _parse_part(part):
+        if '/' in part:
+            try:
+                network = ipaddress.ip_network(part, strict=False)
+            except ValueError:
+                raise ValueError(f"유효하지 않은 CIDR 대역입니다: {part}")
+            if network.version != 4:
+                raise ValueError(f"IPv4 대역만 지원합니다: {part}")
+            return int(network.network_address), int(network.broadcast_address)
+
+        if '-' in part and not is_valid_domain(part):
+            start_str, end_str = (p.strip() for p in part.split('-', 1))
+            if end_str.isdigit():
+                # 10.0.0.1-50 처럼 마지막 옥텟만 적은 경우
+                end_str = start_str.rsplit('.', 1)[0] + '.' + end_str
+            if not (is_valid_ip(start_str) and is_valid_ip(end_str)):
+                raise ValueError(f"유효하지 않은 IP 범위입니다: {part}")
+            start, end = int(ipaddress.IPv4Address(start_str)), int(ipaddress.IPv4Address(end_str))
+            if start > end:
+                raise ValueError(f"IP 범위의 시작이 끝보다 큽니다: {part}")
+            return start, end
+
+        if is_valid_ip(part):
+            address = ipaddress.ip_address(part)
+            if address.version != 4:
+                raise ValueError(f"IPv4 주소만 지원합니다: {part}")
+            return int(address), int(address)
+
+        if is_valid_domain(part):
+            try:
+                resolved = socket.gethostbyname(part)
+            except socket.gaierror:
+                raise ValueError(f"도메인 이름을 해석할 수 없습니다: {part}")
+            value = int(ipaddress.IPv4Address(resolved))
+            return value, value
+
+        raise ValueError(f"유효하지 않은 IP 주소입니다: {part}")
+
+    @staticmethod
+    def _coalesce(ranges):
+        """겹치거나 맞닿은 구간을 합쳐 중복 스캔을 방지"""
+        merged = []
+        for start, end in sorted(ranges):
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for start, end in self.ranges:
+            for value in range(start, end + 1):
+                yield str(ipaddress.IPv4Address(value))
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("target index out of range")
+        slot = bisect.bisect_right(self._offsets, index) - 1
+        return str(ipaddress.IPv4Address(self.ranges[slot][0] + index - self._offsets[slot]))
+
+    def index_of(self, ip):
+        """주소의 인덱스 (__getitem__의 역함수)"""
+        value = int(ipaddress.IPv4Address(ip))
+        slot = bisect.bisect_right(self.ranges, (value, float('inf'))) - 1
+        if slot < 0 or value > self.ranges[slot][1]:
+            raise ValueError(f"{ip} is not in target set")
+        return self._offsets[slot] + value - self.ranges[slot][0]
+
+    def __contains__(self, ip):
+        try:
+            self.index_of(ip)
+            return True
+        except ValueError:
+            return False
+
+    def __str__(self):
+        parts = []
+        for start, end in self.ranges:
+            first = str(ipaddress.IPv4Address(start))
+            parts.append(first if start == end else f"{first}-{ipaddress.IPv4Address(end)}")
+        return ', '.join(parts)
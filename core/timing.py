@@ -0,0 +1,68 @@
+# 호스트별 RTT 추정 및 적응형 timeout 계산
+import threading
+
+
+class RttEstimator:
+    """
+    TCP의 RTO 계산(RFC 6298)과 같은 방식으로 호스트별 SRTT/RTTVAR를 추적합니다.
+        SRTT   <- (1 - alpha) * SRTT + alpha * R
+        RTTVAR <- (1 - beta) * RTTVAR + beta * |SRTT - R|
+        timeout = SRTT + k * RTTVAR  (min_timeout ~ max_timeout 사이로 제한)
+    응답(SYN-ACK/RST, connect 완료/거절)을 관측할 때마다 observe()로 갱신하며,
+    아직 표본이 없는 호스트는 initial_timeout과 전체 호스트 통계 중 큰 값을 사용합니다.
+    (빠른 호스트들이 전체 통계를 min_timeout까지 끌어내려도, 느린 호스트가 첫 응답을 놓쳐
+    표본 없이 모든 포트가 Filtered로 나오는 일이 없도록)
+    """
+    def __init__(self, initial_timeout=1.0, min_timeout=0.05, max_timeout=None, alpha=0.125, beta=0.25, k=4):
+        self.initial_timeout = initial_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout if max_timeout is not None else initial_timeout
+        self.alpha = alpha
+        self.beta = beta
+        self.k = k
+        self._hosts = {}        # host -> [srtt, rttvar]
+        self._global = None     # 전체 호스트 통합 [srtt, rttvar]
+        self._lock = threading.Lock()
+
+    def _update(self, stats, rtt):
+        if stats is None:
+            return [rtt, rtt / 2]
+        srtt, rttvar = stats
+        rttvar = (1 - self.beta) * rttvar + self.beta * abs(srtt - rtt)
+        srtt = (1 - self.alpha) * srtt + self.alpha * rtt
+        return [srtt, rttvar]
+
+    def observe(self, host, rtt):
+        """응답까지 걸린 시간(초) 표본 추가"""
+        if rtt < 0:
+            return
+        with self._lock:
+            self._hosts[host] = self._update(self._hosts.get(host), rtt)
+            self._global = self._update(self._global, rtt)
+
+    def _clamp(self, value, floor, ceiling):
+        return max(floor, min(ceiling, value))
+
+    def timeout_for(self, host):
+        """host에 보내는 프로브의 응답 대기 시간(초)"""
+        stats = self._hosts.get(host)
+        if stats is None:
+            if self._global is None:
+                return self.initial_timeout
+            srtt, rttvar = self._global
+            return max(self.initial_timeout, self._clamp(srtt + self.k * rttvar, self.min_timeout, self.max_timeout))
+        srtt, rttvar = stats
+        return self._clamp(srtt + self.k * rttvar, self.min_timeout, self.max_timeout)
+
+    def scaled_timeout(self, host, multiplier, floor, ceiling):
+        """
+        프로브 timeout을 배수로 늘려 다른 단계(배너 수집 등)의 timeout으로 사용
+        표본이 없는 호스트는 ceiling을 그대로 사용합니다.
+        """
+        if host not in self._hosts and self._global is None:
+            return ceiling
+        return self._clamp(self.timeout_for(host) * multiplier, floor, ceiling)
+
+    def srtt(self, host):
+        stats = self._hosts.get(host)
+        return stats[0] if stats else None
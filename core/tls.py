@@ -0,0 +1,186 @@
+# TLS 핸드셰이크 정보 및 인증서 추출 (세션 재개, 인증서 캐시)
+import collections
+import datetime
+import hashlib
+import ssl
+import threading
+
+from utils.logger import app_logger as logger
+
+# 기본적으로 TLS로 확인할 포트 (그 외 포트는 프로브 응답이 TLS일 때 확인)
+TLS_PORTS = (443, 465, 636, 853, 993, 995, 5061, 8443, 9443)
+
+# 자주 쓰는 OID (DER 인코딩된 값)
+OID_COMMON_NAME = bytes.fromhex('550403')
+OID_ORGANIZATION = bytes.fromhex('55040a')
+OID_SUBJECT_ALT_NAME = bytes.fromhex('551d11')
+
+
+def _read_tlv(data, offset):
+    """DER TLV 하나 읽기 -> (tag, 내용 시작, 내용 끝)"""
+    tag = data[offset]
+    length = data[offset + 1]
+    offset += 2
+    if length & 0x80:
+        count = length & 0x7f
+        length = int.from_bytes(data[offset:offset + count], 'big')
+        offset += count
+    if offset + length > len(data):
+        raise ValueError("truncated DER element")
+    return tag, offset, offset + length
+
+
+def _children(data, start, end):
+    """SEQUENCE/SET 내용 안의 TLV 목록"""
+    items = []
+    while start < end:
+        tag, content_start, content_end = _read_tlv(data, start)
+        items.append((tag, content_start, content_end))
+        start = content_end
+    return items
+
+
+def _parse_name(data, start, end):
+    """Name(RDNSequence) -> {'CN': ..., 'O': ...}"""
+    name = {}
+    for _, set_start, set_end in _children(data, start, end):
+        for _, attr_start, attr_end in _children(data, set_start, set_end):
+            fields = _children(data, attr_start, attr_end)
+            if len(fields) < 2:
+                continue
+            oid = data[fields[0][1]:fields[0][2]]
+            value = data[fields[1][1]:fields[1][2]].decode('utf-8', errors='replace')
+            if oid == OID_COMMON_NAME:
+                name['CN'] = value
+            elif oid == OID_ORGANIZATION:
+                name['O'] = value
+    return name
+
+
+def _parse_time(data, tag, start, end):
+    text = data[start:end].decode('ascii')
+    # UTCTime(0x17): YYMMDDHHMMSSZ, GeneralizedTime(0x18): YYYYMMDDHHMMSSZ
+    fmt = '%y%m%d%H%M%SZ' if tag == 0x17 else '%Y%m%d%H%M%SZ'
+    return datetime.datetime.strptime(text, fmt).replace(tzinfo=datetime.timezone.utc)
+
+
+def parse_certificate(der):
+    """
+    DER 인증서에서 배너에 필요한 필드만 추출 (외부 라이브러리 없이)
+    :return: subject, issuer, not_after, sans, fingerprint(SHA-256)
+    """
+    _, cert_start, cert_end = _read_tlv(der, 0)
+    _, tbs_start, tbs_end = _children(der, cert_start, cert_end)[0]
+    fields = _children(der, tbs_start, tbs_end)
+    # [0] version 은 생략될 수 있음
+    if fields[0][0] == 0xa0:
+        fields = fields[1:]
+    # serial, signature, issuer, validity, subject, spki, [1], [2], [3] extensions
+    issuer = _parse_name(der, fields[2][1], fields[2][2])
+    validity = _children(der, fields[3][1], fields[3][2])
+    not_after = _parse_time(der, *validity[1])
+    subject = _parse_name(der, fields[4][1], fields[4][2])
+
+    sans = []
+    for tag, ext_start, ext_end in fields[6:]:
+        if tag != 0xa3:
+            continue
+        _, exts_start, exts_end = _read_tlv(der, ext_start)
+        for _, item_start, item_end in _children(der, exts_start, exts_end):
+            parts = _children(der, item_start, item_end)
+            if der[parts[0][1]:parts[0][2]] != OID_SUBJECT_ALT_NAME:
+                continue
+            # extnValue(OCTET STRING) 안의 GeneralNames
+            _, value_start, value_end = parts[-1]
+            _, names_start, names_end = _read_tlv(der, value_start)
+            for name_tag, name_start, name_end in _children(der, names_start, names_end):
+                if name_tag == 0x82:    # dNSName
+                    sans.append(der[name_start:name_end].decode('ascii', errors='replace'))
+                elif name_tag == 0x87:  # iPAddress
+                    sans.append('.'.join(str(b) for b in der[name_start:name_end]))
+
+    return {
+        'subject': subject,
+        'issuer': issuer,
+        'not_after': not_after,
+        'sans': sans,
+        'fingerprint': hashlib.sha256(der).hexdigest(),
+    }
+
+
+class TlsInspector:
+    """
+    이미 연결된 소켓 위에서 TLS 핸드셰이크를 한 번 수행하고 버전/암호/인증서 정보를 돌려줍니다.
+    - 인증서는 SHA-256 지문으로 캐시 (같은 인증서를 쓰는 서버가 많아도 해석은 한 번)
+    - (ip, port)별 세션을 보관해 다시 방문할 때 세션 재개 (핸드셰이크 비용 감소)
+    여러 탐지 워커가 함께 쓰므로 캐시는 lock으로 보호합니다.
+    """
+    def __init__(self, max_sessions=4096, max_certificates=4096):
+        self.context = ssl.create_default_context()
+        self.context.check_hostname = False
+        self.context.verify_mode = ssl.CERT_NONE
+        self.max_sessions = max_sessions
+        self.max_certificates = max_certificates
+        self.sessions = collections.OrderedDict()
+        self.certificates = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def inspect(self, sock, ip, port):
+        """sock 위에서 핸드셰이크 (sock은 이 함수가 닫음). 실패하면 예외 발생"""
+        with self._lock:
+            session = self.sessions.get((ip, port))
+        with sock:
+            with self.context.wrap_socket(sock, server_hostname=ip, session=session) as ssock:
+                der = ssock.getpeercert(binary_form=True)
+                info = {
+                    'version': ssock.version(),
+                    'cipher': ssock.cipher()[0],
+                    'resumed': ssock.session_reused,
+                    'certificate': self._certificate(der) if der else None,
+                }
+                if ssock.session is not None:
+                    with self._lock:
+                        self.sessions[(ip, port)] = ssock.session
+                        self.sessions.move_to_end((ip, port))
+                        while len(self.sessions) > self.max_sessions:
+                            self.sessions.popitem(last=False)
+        return info
+
+    def _certificate(self, der):
+        fingerprint = hashlib.sha256(der).hexdigest()
+        with self._lock:
+            cached = self.certificates.get(fingerprint)
+            if cached is not None:
+                self.certificates.move_to_end(fingerprint)
+                return cached
+        try:
+            certificate = parse_certificate(der)
+        except (ValueError, IndexError) as e:
+            logger.debug(f"Failed to parse certificate {fingerprint[:16]}: {e}")
+            certificate = {'fingerprint': fingerprint}
+        with self._lock:
+            self.certificates[fingerprint] = certificate
+            while len(self.certificates) > self.max_certificates:
+                self.certificates.popitem(last=False)
+        return certificate
+
+
+def format_tls_info(info, label="TLS"):
+    """inspect() 결과를 배너 문자열로 변환"""
+    result = f"{label} ({info['version']}, {info['cipher']})"
+    certificate = info.get('certificate')
+    if certificate:
+        subject = certificate.get('subject', {})
+        if subject.get('CN'):
+            result += f" | CN: {subject['CN']}"
+        if certificate.get('sans'):
+            sans = certificate['sans']
+            result += f" | SAN: {', '.join(sans[:5])}" + (f" (+{len(sans) - 5})" if len(sans) > 5 else "")
+        issuer = certificate.get('issuer', {})
+        if issuer.get('O') or issuer.get('CN'):
+            result += f" | Issuer: {issuer.get('O') or issuer.get('CN')}"
+        if certificate.get('not_after'):
+            expired = certificate['not_after'] < datetime.datetime.now(datetime.timezone.utc)
+            result += f" | Expires: {certificate['not_after']:%Y-%m-%d}" + (" [EXPIRED]" if expired else "")
+        result += f" | SHA256: {certificate['fingerprint'][:16]}"
+    return result
@@ -0,0 +1,158 @@
+# UDP 스캔용 프로토콜별 페이로드와 응답 해석
+# UDP 서비스는 형식에 맞지 않는 데이터그램에 대부분 응답하지 않으므로,
+# 잘 알려진 포트에는 실제 요청을 보내 Open을 확인하고 응답에서 서비스 정보를 뽑습니다.
+import random
+import struct
+
+from core.protocols.dns import build_query, parse_response
+
+# SNMP sysDescr.0 OID (1.3.6.1.2.1.1.1.0)
+SNMP_SYSDESCR_OID = bytes.fromhex('2b06010201010100')
+# NetBIOS 이름 '*' (NBSTAT 질의용, 첫 단계 인코딩 결과)
+NETBIOS_WILDCARD = b'CK' + b'A' * 30
+
+
+def _dns_payload():
+    return build_query(random.randint(0, 0xffff), 'version.bind')
+
+
+def _dns_describe(data):
+    try:
+        _, _, _, texts = parse_response(data)
+    except ValueError:
+        return "DNS"
+    return f"DNS Version: {' '.join(texts)}" if texts else "DNS"
+
+
+def _ntp_payload():
+    # LI=3 (미동기), VN=4, Mode=3 (client) + 나머지 47바이트는 0
+    return b'\xe3' + b'\x00' * 47
+
+
+def _ntp_describe(data):
+    if len(data) < 48:
+        return "NTP"
+    version = (data[0] >> 3) & 0x07
+    stratum = data[1]
+    result = f"NTP (v{version}, stratum {stratum}"
+    if stratum == 1:
+        # stratum 1의 reference ID는 시간 소스 이름 (예: GPS, PPS)
+        refid = data[12:16].rstrip(b'\x00').decode('ascii', errors='replace')
+        if refid:
+            result += f", refid {refid}"
+    return result + ")"
+
+
+def _snmp_payload():
+    # SNMPv2c GetRequest(community "public", sysDescr.0) - BER 인코딩
+    varbind = b'\x30\x0c\x06\x08' + SNMP_SYSDESCR_OID + b'\x05\x00'
+    pdu = (b'\x02\x04' + struct.pack('!I', random.randint(1, 0x7fffffff)) + b'\x02\x01\x00\x02\x01\x00'
+           + b'\x30' + bytes([len(varbind)]) + varbind)
+    message = b'\x02\x01\x01\x04\x06public' + b'\xa0' + bytes([len(pdu)]) + pdu
+    return b'\x30' + bytes([len(message)]) + message
+
+
+def _snmp_describe(data):
+    # 응답의 sysDescr.0 OID 바로 뒤에 오는 OCTET STRING 값
+    index = data.find(SNMP_SYSDESCR_OID)
+    if index < 0:
+        return "SNMP"
+    pos = index + len(SNMP_SYSDESCR_OID)
+    if pos + 2 > len(data) or data[pos] != 0x04:
+        return "SNMP"
+    length = data[pos + 1]
+    pos += 2
+    if length & 0x80:
+        count = length & 0x7f
+        length = int.from_bytes(data[pos:pos + count], 'big')
+        pos += count
+    text = data[pos:pos + length].decode('utf-8', errors='replace')
+    text = ' '.join(text.split())
+    return f"SNMP (sysDescr: {text[:60]})" if text else "SNMP"
+
+
+def _netbios_payload():
+    # NBSTAT 질의 (노드의 이름 테이블 요청)
+    header = struct.pack('!HHHHHH', random.randint(0, 0xffff), 0x0000, 1, 0, 0, 0)
+    return header + b'\x20' + NETBIOS_WILDCARD + b'\x00' + struct.pack('!HH', 0x21, 0x01)
+
+
+def _netbios_describe(data):
+    # 헤더(12) + 이름(34) + type/class(4) + TTL(4) + RDLENGTH(2) 다음이 이름 개수
+    pos = 56
+    if len(data) <= pos:
+        return "NetBIOS"
+    count = data[pos]
+    pos += 1
+    computer = workgroup = None
+    for _ in range(count):
+        entry = data[pos:pos + 18]
+        if len(entry) < 18:
+            break
+        name = entry[:15].decode('ascii', errors='replace').strip()
+        suffix = entry[15]
+        group = entry[16] & 0x80
+        if suffix == 0x00 and not group and computer is None:
+            computer = name
+        elif suffix == 0x00 and group and workgroup is None:
+            workgroup = name
+        pos += 18
+    parts = []
+    if computer:
+        parts.append(f"Name: {computer}")
+    if workgroup:
+        parts.append(f"Workgroup: {workgroup}")
+    return f"NetBIOS ({', '.join(parts)})" if parts else "NetBIOS"
+
+
+def _ssdp_payload():
+    return (b"M-SEARCH * HTTP/1.1\r\n"
+            b"HOST: 239.255.255.250:1900\r\n"
+            b"MAN: \"ssdp:discover\"\r\n"
+            b"MX: 1\r\n"
+            b"ST: ssdp:all\r\n"
+            b"\r\n")
+
+
+def _ssdp_describe(data):
+    for line in data.decode('latin-1').split('\r\n')[1:]:
+        if line.lower().startswith('server:'):
+            return f"SSDP ({line.split(':', 1)[1].strip()[:60]})"
+    return "SSDP"
+
+
+class UdpProbe:
+    def __init__(self, name, ports, payload, describe):
+        self.name = name
+        self.ports = ports
+        # payload: 호출할 때마다 새 요청 바이트를 만드는 함수 (트랜잭션 ID 등이 매번 다름)
+        self.payload = payload
+        self.describe = describe
+
+
+DEFAULT_UDP_PROBES = [
+    UdpProbe("DNS", (53, 5353), _dns_payload, _dns_describe),
+    UdpProbe("NTP", (123,), _ntp_payload, _ntp_describe),
+    UdpProbe("NetBIOS", (137,), _netbios_payload, _netbios_describe),
+    UdpProbe("SNMP", (161,), _snmp_payload, _snmp_describe),
+    UdpProbe("SSDP", (1900,), _ssdp_payload, _ssdp_describe),
+]
+
+_PROBES_BY_PORT = {port: probe for probe in DEFAULT_UDP_PROBES for port in probe.ports}
+
+
+def payload_for(port):
+    """port로 보낼 데이터그램 (전용 페이로드가 없으면 빈 데이터그램)"""
+    probe = _PROBES_BY_PORT.get(port)
+    return probe.payload() if probe else b''
+
+
+def describe_reply(port, data):
+    """UDP 응답을 서비스 정보 문자열로 변환"""
+    probe = _PROBES_BY_PORT.get(port)
+    if probe is None:
+        return f"Unknown ({len(data)} bytes)"
+    try:
+        return probe.describe(data)
+    except Exception:
+        return probe.name
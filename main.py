@@ -1,29 +1,95 @@
 # [진입점] 프로그램 실행 파일
+import argparse
 from utils.config_loader import ConfigLoader
 from core.scanner import PortScanner
+from core.monitor import ScanMonitor
+from core.parallel import ParallelScan, resolve_processes
+from core.scheduler import parse_shard
 # from utils.logger import setup_logger # 나중에 구현
 
+def shard_arg(value):
+    """--shard 값 검사 ('i/N')"""
+    try:
+        parse_shard(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return value
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="PortScanner")
+    parser.add_argument('-c', '--config', default="config/settings.yaml", help="설정 파일 경로")
+    parser.add_argument('--skip-discovery', action='store_true',
+                        help="호스트 탐색을 건너뛰고 모든 대상을 살아있다고 보고 스캔")
+    parser.add_argument('--resume', action='store_true',
+                        help="저장된 체크포인트에서 중단된 스캔을 이어서 실행")
+    parser.add_argument('--monitor', action='store_true',
+                        help="연속 모니터링 모드 (이전 결과와 달라진 점만 출력)")
+    parser.add_argument('--once', action='store_true',
+                        help="--monitor와 함께 사용: 라운드 하나만 실행하고 종료")
+    parser.add_argument('--shard', type=shard_arg, metavar='i/N',
+                        help="전체 스캔 공간을 N개로 나눈 것 중 i번째만 스캔 (여러 장비에 나눠 실행)")
+    parser.add_argument('--processes', metavar='N',
+                        help="스캔 프로세스 수 (auto: CPU 코어 수, 설정 파일의 scan_options.processes보다 우선)")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+
     # 1. 설정 로드
     print("[*] 설정을 불러오는 중...")
-    loader = ConfigLoader()
+    loader = ConfigLoader(args.config)
     try:
         config = loader.load_config()
     except Exception as e:
         print(f"[!] 설정 로드 실패: {e}")
         return
 
+    # 명령행 옵션이 설정 파일보다 우선
+    if args.skip_discovery:
+        config.setdefault('discovery', {})['enabled'] = False
+    if args.resume:
+        config.setdefault('checkpoint', {})['resume'] = True
+    if args.shard:
+        config['shard'] = args.shard
+    if args.processes:
+        config['scan_options']['processes'] = args.processes
+
     # 2. 설정 변수 추출
     target_ip = config['target']['ip']
     scan_mode = config['scan_options']['mode']
     
     print(f"[*] 스캔 시작 -> 대상: {target_ip}, 모드: {scan_mode}")
 
+    # 모니터링 모드: 주기적으로 조각 단위 스캔 후 변경 사항만 출력
+    if args.monitor:
+        monitor = ScanMonitor(config)
+        try:
+            if args.once:
+                monitor.run_once()
+            else:
+                monitor.run_forever()
+        except KeyboardInterrupt:
+            print("[!] 모니터링을 종료합니다.")
+        return
+
     # 3. 스캐너 객체 생성 및 실행 (의존성 주입)
-    scanner = PortScanner(config)
-    scanner.run()
+    # processes가 2 이상이면 스캔 공간을 프로세스 수만큼 샤드로 나눠 병렬 실행 후 결과를 순서대로 합침
+    try:
+        processes = resolve_processes(config['scan_options'].get('processes', 1))
+    except ValueError:
+        print(f"[!] processes는 정수 또는 auto여야 합니다: {config['scan_options'].get('processes')}")
+        return
+    if processes > 1:
+        scanner = ParallelScan(config, processes)
+    else:
+        scanner = PortScanner(config)
+    try:
+        scanner.run()
+    except KeyboardInterrupt:
+        print("[!] 사용자에 의해 스캔이 중단되었습니다.")
+        return
 
     print("[*] 스캔이 완료되었습니다.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
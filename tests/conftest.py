@@ -0,0 +1,19 @@
+# 테스트 공통 설정: 저장소 루트를 import 경로에 추가하고, 캡처해 둔 패킷(tests/fixtures/)을 읽는 헬퍼 제공
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, 'tests', 'fixtures')
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def packet():
+    """packet('smb1_negotiate.bin') -> 캡처 파일 내용 (bytes)"""
+    def load(name):
+        with open(os.path.join(FIXTURES, name), 'rb') as f:
+            return f.read()
+    return load
@@ -0,0 +1,93 @@
+# core/scan_types/async_connect.py asyncio Connect 스캔 엔진 (127.0.0.1의 실제 소켓 사용)
+import socket
+
+import pytest
+
+from core.scan_types.async_connect import AsyncConnectScanner
+from core.timing import RttEstimator
+
+
+@pytest.fixture
+def open_port():
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(64)
+    yield listener.getsockname()[1]
+    listener.close()
+
+
+@pytest.fixture
+def closed_port():
+    """bind만 하고 listen하지 않은 포트 (연결 시 RST)"""
+    holder = socket.socket()
+    holder.bind(('127.0.0.1', 0))
+    yield holder.getsockname()[1]
+    holder.close()
+
+
+def test_open_and_closed(open_port, closed_port):
+    rtt = RttEstimator(initial_timeout=1.0)
+    scanner = AsyncConnectScanner(timeout=1.0, concurrency=4, rtt=rtt)
+    results = set(scanner.scan_batch([('127.0.0.1', open_port), ('127.0.0.1', closed_port)]))
+    assert results == {('127.0.0.1', open_port, 'Open'), ('127.0.0.1', closed_port, 'Closed')}
+    # 연결 완료/거절 모두 RTT 표본이 됨
+    assert rtt.srtt('127.0.0.1') is not None
+
+
+def test_single_scan_interface(open_port):
+    assert AsyncConnectScanner(timeout=1.0).scan('127.0.0.1', open_port, 40000) == 'Open'
+
+
+def test_keep_open_hands_over_connected_socket(open_port, closed_port):
+    scanner = AsyncConnectScanner(timeout=1.0, keep_open=True)
+    list(scanner.scan_batch([('127.0.0.1', open_port), ('127.0.0.1', closed_port)]))
+    conn = scanner.take_socket('127.0.0.1', open_port)
+    try:
+        assert conn is not None and conn.getblocking()
+        assert conn.getpeername() == ('127.0.0.1', open_port)
+    finally:
+        conn.close()
+    assert scanner.take_socket('127.0.0.1', open_port) is None
+    assert scanner.take_socket('127.0.0.1', closed_port) is None
+
+
+def test_kept_sockets_are_bounded():
+    listeners = []
+    for _ in range(4):
+        listener = socket.socket()
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(4)
+        listeners.append(listener)
+    targets = [('127.0.0.1', listener.getsockname()[1]) for listener in listeners]
+    scanner = AsyncConnectScanner(timeout=1.0, keep_open=True)
+    scanner.max_kept_sockets = 2
+    try:
+        results = list(scanner.scan_batch(targets))
+        assert [status for _, _, status in results] == ['Open'] * 4
+        # 상한을 넘은 연결은 바로 닫고, 탐지 단계가 새로 연결
+        assert len(scanner._open_sockets) == 2
+    finally:
+        while scanner._open_sockets:
+            scanner._open_sockets.popitem()[1].close()
+        for listener in listeners:
+            listener.close()
+
+
+def test_targets_are_pulled_lazily_and_stop_with_consumer(closed_port):
+    """소비자가 중간에 멈추면 남은 대상을 꺼내지 않고 루프 스레드가 끝남"""
+    pulled = []
+
+    def targets():
+        for index in range(100000):
+            pulled.append(index)
+            yield '127.0.0.1', closed_port
+
+    scanner = AsyncConnectScanner(timeout=1.0, concurrency=8)
+    batch = scanner.scan_batch(targets())
+    assert next(batch)[2] == 'Closed'
+    batch.close()
+    assert len(pulled) < 1000
+
+
+def test_concurrency_is_at_least_one():
+    assert AsyncConnectScanner(concurrency=0).concurrency == 1
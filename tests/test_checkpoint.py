@@ -0,0 +1,161 @@
+# core/checkpoint.py 진행 위치 추적/체크포인트 저장과 PortScanner의 중단 후 재개
+import json
+import os
+import socket
+import threading
+
+import pytest
+
+from core.checkpoint import CHECKPOINT_VERSION, ProgressTracker, ScanCheckpoint
+from core.scanner import PortScanner
+from core.targets import TargetSet
+
+
+def test_tracker_out_of_order_completion():
+    tracker = ProgressTracker()
+    for position in (2, 0, 4):
+        tracker.complete(position)
+    assert tracker.snapshot() == (1, [2, 4])
+    tracker.complete(1)
+    assert tracker.snapshot() == (3, [4])
+    assert tracker.is_done(2) and tracker.is_done(4) and not tracker.is_done(3)
+    # 이미 watermark 아래인 위치는 무시
+    tracker.complete(0)
+    assert tracker.snapshot() == (3, [4])
+
+
+def test_tracker_resumes_from_snapshot():
+    tracker = ProgressTracker(*ProgressTracker(5, [5, 6, 9]).snapshot())
+    assert tracker.snapshot() == (7, [9])
+
+
+def test_tracker_concurrent_complete_and_snapshot():
+    """엔진 스레드(건너뛴 위치)와 메인 스레드(결과, 저장)가 동시에 써도 일관된 상태"""
+    tracker = ProgressTracker()
+    total = 20000
+    errors = []
+
+    def complete(positions):
+        for position in positions:
+            tracker.complete(position)
+
+    def save():
+        try:
+            while tracker.snapshot()[0] < total:
+                watermark, completed = tracker.snapshot()
+                assert all(position > watermark for position in completed)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=complete, args=(range(start, total, 2),)) for start in (1, 0)]
+    saver = threading.Thread(target=save)
+    saver.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads + [saver]:
+        thread.join()
+    assert not errors
+    assert tracker.snapshot() == (total, [])
+
+
+def test_checkpoint_round_trip(tmp_path):
+    checkpoint = ScanCheckpoint(str(tmp_path / 'state' / 'scan.json'))
+    assert checkpoint.load() is None
+    checkpoint.save({'watermark': 10, 'completed': [12]})
+    assert checkpoint.load() == {'watermark': 10, 'completed': [12], 'version': CHECKPOINT_VERSION}
+    checkpoint.clear()
+    assert checkpoint.load() is None
+    checkpoint.clear()
+
+
+def test_failed_save_keeps_previous_file(tmp_path):
+    checkpoint = ScanCheckpoint(str(tmp_path / 'scan.json'))
+    checkpoint.save({'watermark': 1})
+    with pytest.raises(TypeError):
+        checkpoint.save({'watermark': object()})
+    assert checkpoint.load()['watermark'] == 1
+    assert os.listdir(tmp_path) == ['scan.json']
+
+
+def test_unsupported_version(tmp_path):
+    path = tmp_path / 'scan.json'
+    path.write_text(json.dumps({'version': CHECKPOINT_VERSION + 1}))
+    with pytest.raises(ValueError):
+        ScanCheckpoint(str(path)).load()
+
+
+@pytest.fixture
+def listeners():
+    """127.0.0.1에서 열려 있는 포트 두 개"""
+    sockets = []
+    for _ in range(2):
+        listener = socket.socket()
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(16)
+        sockets.append(listener)
+    yield sorted(listener.getsockname()[1] for listener in sockets)
+    for listener in sockets:
+        listener.close()
+
+
+def _config(tmp_path, ports, resume=False):
+    return {
+        'target': {'ip': '127.0.0.1-127.0.0.2', 'ports': ports},
+        'scan_options': {'mode': 'ASYNC', 'timeout': 0.5, 'concurrency': 8,
+                         'randomize_order': True, 'seed': 5},
+        'discovery': {'enabled': False},
+        'advanced': {'service_detection': False},
+        'checkpoint': {'enabled': True, 'resume': resume, 'path': str(tmp_path / 'scan.json'), 'interval': 0},
+        'logging': {'console_output': 'none'},
+    }
+
+
+class _Interrupt:
+    """레코드 limit개를 받은 뒤 Ctrl-C를 흉내"""
+    def __init__(self, records, limit=None):
+        self.records = records
+        self.limit = limit
+
+    def __call__(self, record):
+        self.records.append((record['host'], record['port'], record['state']))
+        if self.limit is not None and len(self.records) >= self.limit:
+            raise KeyboardInterrupt
+
+
+def test_interrupted_scan_resumes_without_gaps_or_repeats(tmp_path, listeners):
+    ports = f"{listeners[0] - 3}-{listeners[0] + 3},{listeners[1]}"
+    first, second = [], []
+
+    scanner = PortScanner(_config(tmp_path, ports))
+    scanner.listeners.append(_Interrupt(first, limit=5))
+    with pytest.raises(KeyboardInterrupt):
+        scanner.run()
+    state = ScanCheckpoint(str(tmp_path / 'scan.json')).load()
+    # 중단을 일으킨 마지막 레코드는 완료로 기록되지 않음
+    assert state['seed'] == 5 and state['watermark'] + len(state['completed']) == 4
+
+    resumed = PortScanner(_config(tmp_path, ports, resume=True))
+    resumed.listeners.append(_Interrupt(second))
+    resumed.run()
+    assert not os.path.exists(tmp_path / 'scan.json')
+
+    # 완료로 기록된 위치는 다시 스캔하지 않고, 빠진 위치도 없음
+    scanned = [(host, port) for host, port, _ in first[:-1] + second]
+    assert len(scanned) == len(set(scanned)) == len(resumed.scheduler)
+    assert set(scanned) == set(resumed.scheduler)
+    opened = {(host, port) for host, port, status in first + second if status == 'Open'}
+    assert opened == {('127.0.0.1', port) for port in listeners}
+
+
+def test_skipped_hosts_are_checkpointed(tmp_path, listeners):
+    """alive에 없는 호스트의 위치는 엔진 쪽에서 완료 처리되고 결과 없이 끝남"""
+    scanner = PortScanner(_config(tmp_path, ','.join(map(str, listeners))))
+    scanner.alive = TargetSet('127.0.0.1')
+    skipped = []
+    scanner.on_skip = skipped.append
+    records = []
+    scanner.listeners.append(_Interrupt(records))
+    scanner.run()
+    assert len(skipped) == 2
+    assert sorted(port for _, port, _ in records) == listeners
+    assert {host for host, _, _ in records} == {'127.0.0.1'}
@@ -0,0 +1,101 @@
+# core/protocols/dns.py 응답 해석 (dnspython으로 인코딩한 BIND 형식 응답: 답변 이름이 압축 포인터 0xc00c)
+import socket
+import struct
+import threading
+
+import pytest
+
+from core.protocols.dns import DnsProtocol, DnsUdpProber, build_query, parse_response
+
+
+def test_version_bind_answer_through_name_pointer(packet):
+    data = packet('dns_version_bind.bin')
+    txid, flags, qname, texts = parse_response(data)
+    assert txid == 0x2a5f
+    assert flags & 0x8000
+    assert qname == 'version.bind'
+    assert texts == ['9.18.28-1~deb12u2-Debian']
+
+
+def test_multiple_character_strings(packet):
+    _, _, qname, texts = parse_response(packet('dns_id_server.bin'))
+    assert qname == 'id.server'
+    assert texts == ['ns1', 'fra']
+
+
+def test_zero_copy_inputs(packet):
+    data = packet('dns_version_bind.bin')
+    expected = parse_response(data)
+    assert parse_response(bytearray(data)) == expected
+    assert parse_response(memoryview(data)) == expected
+    # 수신 버퍼의 앞부분만 잘라 넘기는 경우 (DnsUdpProber._receive)
+    buffer = bytearray(4096)
+    buffer[:len(data)] = data
+    assert parse_response(memoryview(buffer)[:len(data)]) == expected
+
+
+def test_skip_question_name(packet):
+    _, _, qname, texts = parse_response(packet('dns_version_bind.bin'), want_name=False)
+    assert qname is None
+    assert texts == ['9.18.28-1~deb12u2-Debian']
+
+
+def test_question_name_pointer():
+    # 질의 이름 자체가 앞쪽 이름을 가리키는 포인터인 두 번째 Question
+    header = struct.pack('!HHHHHH', 7, 0x8400, 2, 0, 0, 0)
+    first = build_query(7, 'hostname.bind')[12:]
+    second = b'\xc0\x0c' + struct.pack('!HH', 16, 3)
+    _, _, qname, texts = parse_response(header + first + second)
+    assert qname == 'hostname.bind'
+    assert texts == []
+
+
+@pytest.mark.parametrize('size', [5, 12, 20, 29, 40, 66])
+def test_truncated_response(packet, size):
+    with pytest.raises(ValueError):
+        parse_response(packet('dns_version_bind.bin')[:size])
+
+
+def test_pointer_loop():
+    header = struct.pack('!HHHHHH', 1, 0x8000, 1, 0, 0, 0)
+    with pytest.raises(ValueError):
+        parse_response(header + b'\xc0\x0c' + struct.pack('!HH', 16, 3))
+
+
+def test_query_round_trip():
+    txid, flags, qname, texts = parse_response(build_query(0x1234, 'version.bind'))
+    assert (txid, flags, qname, texts) == (0x1234, 0x0100, 'version.bind', [])
+
+
+def test_tcp_banner(packet):
+    handler = DnsProtocol(53, 1.0)
+    assert handler.parse(packet('dns_version_bind.bin')) == 'DNS Version: 9.18.28-1~deb12u2-Debian'
+    assert handler.parse(packet('dns_version_bind.bin')[:30]) == 'DNS (Malformed)'
+    assert handler.parse(b'') == 'DNS (No Response)'
+
+
+def test_udp_prober_matches_configured_names_case_insensitively(packet):
+    """설정 이름이 대문자/끝 '.'이어도 (소문자로 온) 응답과 매칭"""
+    answer = packet('dns_version_bind.bin')
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(('127.0.0.1', 0))
+    server.settimeout(2.0)
+
+    def respond():
+        try:
+            query, client = server.recvfrom(512)
+        except OSError:
+            return
+        # 질의의 트랜잭션 ID만 바꿔 캡처한 응답을 돌려줌
+        server.sendto(query[:2] + answer[2:], client)
+
+    thread = threading.Thread(target=respond, daemon=True)
+    thread.start()
+    try:
+        prober = DnsUdpProber(timeout=1.0, names=['VERSION.BIND.'], retries=0)
+        assert prober.names == ('version.bind',)
+        results = prober.probe(['127.0.0.1'], port=server.getsockname()[1])
+    finally:
+        thread.join(2.0)
+        server.close()
+    assert results == {'127.0.0.1': {'version.bind': '9.18.28-1~deb12u2-Debian'}}
@@ -0,0 +1,112 @@
+# core/fingerprint_cache.py TTL 만료, LRU 제거, 저장/불러오기와 탐지 방식별 키
+import json
+
+import pytest
+
+from core import fingerprint_cache
+from core.analyzer import ServiceDetector
+from core.fingerprint_cache import CACHE_VERSION, FingerprintCache
+
+
+class _Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(fingerprint_cache.time, 'time', clock.time)
+    return clock
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = FingerprintCache(ttl=60)
+    cache.put('10.0.0.1', 22, 'SshProtocol', 'OpenSSH_9.6')
+    clock.now += 60
+    assert cache.get('10.0.0.1', 22, 'SshProtocol') == 'OpenSSH_9.6'
+    clock.now += 1
+    assert cache.get('10.0.0.1', 22, 'SshProtocol') is None
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_ttl_zero_never_expires(clock):
+    cache = FingerprintCache(ttl=0)
+    cache.put('10.0.0.1', 22, 'SshProtocol', 'OpenSSH_9.6')
+    clock.now += 10 ** 9
+    assert cache.get('10.0.0.1', 22, 'SshProtocol') == 'OpenSSH_9.6'
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = FingerprintCache(max_entries=2)
+    cache.put('10.0.0.1', 22, 'SshProtocol', 'a')
+    cache.put('10.0.0.1', 80, 'HttpProtocol', 'b')
+    # 22번을 사용했으므로 다음 추가 때 80번이 제거됨
+    assert cache.get('10.0.0.1', 22, 'SshProtocol') == 'a'
+    cache.put('10.0.0.1', 445, 'SmbProtocol', 'c')
+    assert cache.get('10.0.0.1', 80, 'HttpProtocol') is None
+    assert cache.get('10.0.0.1', 22, 'SshProtocol') == 'a'
+    assert cache.get('10.0.0.1', 445, 'SmbProtocol') == 'c'
+    # 제거된 항목은 포트 인덱스에서도 빠짐
+    assert '10.0.0.1:80' not in cache._by_port
+
+
+def test_invalidate_removes_every_handler_for_port(clock):
+    cache = FingerprintCache()
+    cache.put('10.0.0.1', 22, 'SshProtocol', 'light')
+    cache.put('10.0.0.1', 22, 'SshProtocol+deep', 'deep')
+    cache.put('10.0.0.1', 2222, 'Generic', 'other')
+    cache.invalidate('10.0.0.1', 22)
+    assert cache.get('10.0.0.1', 22, 'SshProtocol') is None
+    assert cache.get('10.0.0.1', 22, 'SshProtocol+deep') is None
+    assert cache.get('10.0.0.1', 2222, 'Generic') == 'other'
+
+
+def test_save_and_load_keep_lru_order_and_drop_expired(tmp_path, clock):
+    path = str(tmp_path / 'cache.json')
+    cache = FingerprintCache(path, ttl=100)
+    cache.put('10.0.0.1', 1, 'Generic', 'old')
+    clock.now += 50
+    cache.put('10.0.0.1', 2, 'Generic', 'two')
+    cache.put('10.0.0.1', 3, 'Generic', 'three')
+    cache.get('10.0.0.1', 2, 'Generic')
+    cache.save()
+
+    clock.now += 60
+    loaded = FingerprintCache(path, ttl=100, max_entries=1).load()
+    # 1번은 만료, 남은 둘 중 최근에 사용한 2번만 남음
+    assert list(loaded.entries) == ['10.0.0.1:2:Generic']
+
+
+def test_merge_prefers_newer_entries(clock):
+    cache = FingerprintCache()
+    cache.put('10.0.0.1', 22, 'SshProtocol', 'current')
+    stored_at = cache.entries['10.0.0.1:22:SshProtocol']['stored_at']
+    cache.merge([('10.0.0.1:22:SshProtocol', {'service': 'older', 'stored_at': stored_at - 1}),
+                 ('10.0.0.1:80:HttpProtocol', {'service': 'new', 'stored_at': stored_at})])
+    assert cache.get('10.0.0.1', 22, 'SshProtocol') == 'current'
+    assert cache.get('10.0.0.1', 80, 'HttpProtocol') == 'new'
+
+
+def test_unsupported_version_is_ignored(tmp_path):
+    path = tmp_path / 'cache.json'
+    path.write_text(json.dumps({'version': CACHE_VERSION + 1, 'entries': [['a:1:Generic', {}]]}))
+    assert len(FingerprintCache(str(path)).load()) == 0
+
+
+def test_handler_options_are_part_of_the_key():
+    """ssh_deep/http_paths가 다른 스캔은 서로의 캐시 결과를 쓰지 않음"""
+    light = ServiceDetector(handler_options={'SshProtocol': {'deep': False}})
+    deep = ServiceDetector(handler_options={'SshProtocol': {'deep': True},
+                                            'HttpProtocol': {'paths': ['/', '/admin']}})
+    assert light._handler_name(22) == 'SshProtocol'
+    assert deep._handler_name(22) == 'SshProtocol+deep'
+    assert deep._handler_name(80) == 'HttpProtocol+paths=/,/admin'
+
+    cache = FingerprintCache()
+    cache.put('10.0.0.1', 22, light._handler_name(22), 'KEXINIT only')
+    assert cache.get('10.0.0.1', 22, deep._handler_name(22)) is None
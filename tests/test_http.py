@@ -0,0 +1,214 @@
+# core/protocols/http.py 점진적 HTTP 응답 파서
+import socket
+import threading
+
+import pytest
+
+from core.protocols.http import HTTP_MAX_BODY, HttpProtocol, HttpResponseParser
+
+PAGE = b'<html><head><title>Router Login</title></head><body>' + b'x' * 200 + b'</body></html>'
+
+
+def feed_in_pieces(response, data, size):
+    for start in range(0, len(data), size):
+        response.feed(data[start:start + size])
+
+
+def test_content_length_body():
+    data = (b'HTTP/1.1 200 OK\r\nServer: nginx\r\nContent-Type: text/html\r\n'
+            b'Content-Length: %d\r\n\r\n' % len(PAGE)) + PAGE
+    response = HttpResponseParser(keep_body=True)
+    feed_in_pieces(response, data, 7)
+    assert response.status_code == 200
+    assert response.headers['server'] == 'nginx'
+    assert response.complete and response.reusable
+    assert bytes(response.body) == PAGE
+    assert response.title == 'Router Login'
+
+
+def test_content_length_does_not_read_past_body():
+    data = b'HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nhelloHTTP/1.1 404 Not Found\r\n'
+    response = HttpResponseParser(keep_body=True)
+    response.feed(data)
+    assert response.complete
+    assert bytes(response.body) == b'hello'
+
+
+def test_chunked_body_with_extensions_and_trailer():
+    data = (b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\nContent-Type: text/html\r\n\r\n'
+            b'1a;name=value\r\n<html><title>Chunked</titl\r\n'
+            b'9\r\ne></html>\r\n'
+            b'0\r\nX-Trailer: yes\r\n\r\n')
+    for size in (1, 3, len(data)):
+        response = HttpResponseParser(keep_body=True)
+        feed_in_pieces(response, data, size)
+        assert response.complete, size
+        assert bytes(response.body) == b'<html><title>Chunked</title></html>'
+        assert response.title == 'Chunked'
+
+
+def test_title_split_across_chunks():
+    """'</title>'이 두 번의 feed에 걸쳐 들어와도 Title을 찾음"""
+    head = b'HTTP/1.1 200 OK\r\nContent-Type: text/html\r\nContent-Length: %d\r\n\r\n' % len(PAGE)
+    response = HttpResponseParser()
+    response.feed(head + PAGE[:30])
+    assert response.headers_done and response.title is None and not response.enough
+    response.feed(PAGE[30:33])
+    assert response.title is None
+    response.feed(PAGE[33:40])
+    assert response.title == 'Router Login'
+    assert response.enough and not response.complete
+
+
+def test_body_until_close():
+    response = HttpResponseParser(keep_body=True)
+    response.feed(b'HTTP/1.0 200 OK\r\nContent-Type: text/plain\r\n\r\nfirst ')
+    response.feed(b'second')
+    assert not response.complete
+    response.eof()
+    assert response.complete
+    assert bytes(response.body) == b'first second'
+    # 길이 정보 없이 닫힐 때까지 보낸 응답 뒤에는 연결을 재사용할 수 없음 (이미 닫힘)
+    assert not response.reusable
+
+
+@pytest.mark.parametrize('status', [100, 101, 204, 304])
+def test_responses_without_body(status):
+    response = HttpResponseParser(keep_body=True)
+    response.feed(b'HTTP/1.1 %d Status\r\nContent-Length: 100\r\n\r\n' % status)
+    assert response.complete
+    assert response.status_code == status
+    assert not response.body
+
+
+def test_non_html_needs_headers_only():
+    response = HttpResponseParser()
+    response.feed(b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: 1000\r\n\r\n{')
+    assert response.enough and not response.complete
+
+
+def test_connection_close_is_not_reusable():
+    response = HttpResponseParser()
+    response.feed(b'HTTP/1.1 200 OK\r\nConnection: Close\r\nContent-Length: 0\r\n\r\n')
+    assert response.complete and not response.reusable
+
+
+def test_oversized_body_is_truncated():
+    response = HttpResponseParser(keep_body=True)
+    response.feed(b'HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n' % (HTTP_MAX_BODY * 2))
+    response.feed(b'a' * (HTTP_MAX_BODY + 10))
+    assert response.truncated and response.enough
+    assert len(response.body) == HTTP_MAX_BODY
+
+
+def test_bad_chunk_size_stops_parsing():
+    response = HttpResponseParser()
+    response.feed(b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\n')
+    assert response.truncated and not response.complete
+
+
+def _serve(responses):
+    """keep-alive 서버: 요청 하나마다 responses에서 하나씩 보냄 (요청 경로 기록)"""
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(4)
+    requests = []
+    connections = []
+
+    def run():
+        queue = list(responses)
+        while queue:
+            try:
+                conn, _ = listener.accept()
+            except OSError:
+                return
+            connections.append(conn)
+            buffer = b''
+            with conn:
+                while queue:
+                    while b'\r\n\r\n' not in buffer:
+                        chunk = conn.recv(4096)
+                        if not chunk:
+                            break
+                        buffer += chunk
+                    if b'\r\n\r\n' not in buffer:
+                        break
+                    request, buffer = buffer.split(b'\r\n\r\n', 1)
+                    requests.append(request.split(b' ')[1].decode())
+                    reply = queue.pop(0)
+                    conn.sendall(reply)
+                    # Connection: close 또는 본문 길이 정보가 없는 HTTP/1.0 응답 뒤에는 연결을 닫음
+                    if b'Connection: close' in reply or reply.startswith(b'HTTP/1.0'):
+                        break
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return listener, thread, requests, connections
+
+
+def test_keep_alive_reuses_one_connection():
+    body = b'\x00\x01icon'
+    page = b'<html><title>Home</title>..'
+    listener, thread, requests, connections = _serve([
+        b'HTTP/1.1 200 OK\r\nServer: test\r\nContent-Type: text/html\r\nTransfer-Encoding: chunked\r\n\r\n'
+        b'%x\r\n' % len(page) + page + b'\r\n0\r\n\r\n',
+        b'HTTP/1.1 404 Not Found\r\nContent-Length: 9\r\n\r\nnot found',
+        b'HTTP/1.1 200 OK\r\nContent-Type: image/x-icon\r\nContent-Length: %d\r\n\r\n' % len(body) + body,
+    ])
+    try:
+        handler = HttpProtocol(80, 2.0, paths=['/', '/robots.txt', '/favicon.ico'])
+        with socket.create_connection(listener.getsockname(), timeout=2.0) as sock:
+            result = handler.handle(sock)
+        thread.join(2.0)
+    finally:
+        listener.close()
+    assert requests == ['/', '/robots.txt', '/favicon.ico']
+    assert len(connections) == 1
+    banner = handler.parse(result)
+    assert banner.startswith('HTTP (test | Status: 200 | Title: Home | /robots.txt: 404 | Favicon MD5: ')
+
+
+def test_reconnects_when_server_closes():
+    listener, thread, requests, connections = _serve([
+        b'HTTP/1.1 301 Moved\r\nLocation: https://example.test/\r\nConnection: close\r\nContent-Length: 0\r\n\r\n',
+        b'HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok',
+    ])
+    try:
+        handler = HttpProtocol(80, 2.0, paths=['/', '/robots.txt'])
+        with socket.create_connection(listener.getsockname(), timeout=2.0) as sock:
+            result = handler.handle(sock)
+        thread.join(2.0)
+    finally:
+        listener.close()
+    assert requests == ['/', '/robots.txt']
+    assert len(connections) == 2
+    assert handler.parse(result) == ('HTTP (Unknown Server | Status: 301 | Title: No Title'
+                                     ' | Redirect: https://example.test/ | /robots.txt: 200)')
+
+
+def test_default_requests_only_root():
+    assert HttpProtocol(80, 1.0).paths == ['/']
+
+
+def test_parse_raw_bytes():
+    handler = HttpProtocol(80, 1.0)
+    assert handler.parse(b'HTTP/1.0 200 OK\r\nServer: Apache\r\n\r\n<title>It works</title>') == \
+        'HTTP (Apache | Status: 200 | Title: It works)'
+    assert handler.parse(b'') == 'HTTP (No Response)'
+
+
+def test_reconnects_after_body_until_close():
+    listener, thread, requests, connections = _serve([
+        b'HTTP/1.0 200 OK\r\nServer: legacy\r\n\r\n<title>Old</title>',
+        b'HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\n\r\n',
+    ])
+    try:
+        handler = HttpProtocol(80, 2.0, paths=['/', '/admin'])
+        with socket.create_connection(listener.getsockname(), timeout=2.0) as sock:
+            result = handler.handle(sock)
+        thread.join(2.0)
+    finally:
+        listener.close()
+    assert requests == ['/', '/admin']
+    assert len(connections) == 2
+    assert handler.parse(result) == 'HTTP (legacy | Status: 200 | Title: Old | /admin: 403)'
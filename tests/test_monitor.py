@@ -0,0 +1,83 @@
+# core/monitor.py 모니터링 상태(proto 구분, 이전 형식, 원자적 저장)와 샤드별 라운드 대상
+import json
+import os
+
+from core.monitor import ScanMonitor
+
+
+def _config(tmp_path, shard=None, ports='20-40'):
+    config = {
+        'target': {'ip': '10.0.0.1-10.0.0.3', 'ports': ports},
+        'scan_options': {'mode': 'ASYNC', 'timeout': 0.5},
+        'advanced': {'service_detection': False},
+        'monitor': {'state': str(tmp_path / 'monitor.json'), 'slices': 4, 'neighbourhood': 2},
+        'logging': {'console_output': 'none'},
+    }
+    if shard:
+        config['shard'] = shard
+    return config
+
+
+def _record(port, proto, state='Open', service='svc'):
+    return {'host': '10.0.0.1', 'port': port, 'proto': proto, 'state': state, 'service': service}
+
+
+def test_tcp_and_udp_results_are_tracked_separately(tmp_path):
+    monitor = ScanMonitor(_config(tmp_path))
+    deltas = monitor._diff({('10.0.0.1', 53, 'tcp'): _record(53, 'tcp', service='DNS (tcp)'),
+                            ('10.0.0.1', 53, 'udp'): _record(53, 'udp', service='DNS (udp)')}, 0)
+    assert sorted((delta['change'], delta['proto']) for delta in deltas) == [('opened', 'tcp'), ('opened', 'udp')]
+    assert set(monitor.state['ports']) == {'10.0.0.1:53/tcp', '10.0.0.1:53/udp'}
+
+    # 같은 번호의 TCP가 닫혀도 UDP 상태는 그대로, 바뀌지 않은 UDP 배너는 변경으로 보지 않음
+    deltas = monitor._diff({('10.0.0.1', 53, 'tcp'): _record(53, 'tcp', state='Closed'),
+                            ('10.0.0.1', 53, 'udp'): _record(53, 'udp', service='DNS (udp)')}, 1)
+    assert [(delta['change'], delta['proto']) for delta in deltas] == [('closed', 'tcp')]
+    assert set(monitor.state['ports']) == {'10.0.0.1:53/udp'}
+
+
+def test_legacy_state_keys_are_read_as_tcp(tmp_path):
+    (tmp_path / 'monitor.json').write_text(json.dumps({
+        'round': 3, 'seed': 7, 'ports': {'10.0.0.1:22': {'service': 'SSH', 'last_seen': 'x'}},
+        'changed_hosts': {'10.0.0.1': 2}}))
+    monitor = ScanMonitor(_config(tmp_path))
+    assert monitor.state['ports'] == {'10.0.0.1:22/tcp': {'service': 'SSH', 'last_seen': 'x'}}
+    assert monitor.state['changed_ports'] == {}
+
+
+def test_state_is_saved_atomically(tmp_path):
+    monitor = ScanMonitor(_config(tmp_path))
+    monitor._diff({('10.0.0.1', 22, 'tcp'): _record(22, 'tcp')}, 0)
+    monitor._save_state()
+    assert os.listdir(tmp_path) == ['monitor.json']
+    assert ScanMonitor(_config(tmp_path)).state['ports'].keys() == {'10.0.0.1:22/tcp'}
+
+
+def test_shards_split_every_round_without_overlap(tmp_path):
+    """i/N 샤드 모니터들은 같은 seed를 쓰고, 조각을 모두 돌면 전체 공간을 겹침 없이 나눠 가짐"""
+    monitors = [ScanMonitor(_config(tmp_path, shard=f"{index}/2")) for index in (1, 2)]
+    assert monitors[0].state_path != monitors[1].state_path
+    assert monitors[0].state_path.endswith('monitor.shard1of2.json')
+
+    covered = []
+    for monitor in monitors:
+        scheduler = monitor.scanner.make_scheduler(monitor.state['seed'])
+        for round_no in range(monitor.slices):
+            covered.extend(monitor._round_targets(scheduler, round_no))
+    full = set(monitors[0].scanner.make_scheduler().base)
+    assert len(covered) == len(set(covered)) == len(full)
+    assert set(covered) == full
+
+
+def test_priority_targets_stay_inside_the_shard(tmp_path):
+    monitor = ScanMonitor(_config(tmp_path, shard='1/2'))
+    scheduler = monitor.scanner.make_scheduler(monitor.state['seed'])
+    mine = set(scheduler)
+    outside = next(target for target in scheduler.base if target not in mine)
+    inside = next(iter(mine))
+    monitor.state['ports'] = {f"{outside[0]}:{outside[1]}/tcp": {'service': 'x'},
+                              f"{inside[0]}:{inside[1]}/tcp": {'service': 'y'}}
+    monitor.state['changed_ports'] = {f"{outside[0]}:{outside[1]}/tcp": 0}
+    targets = list(monitor._round_targets(scheduler, 0))
+    assert targets[0] == inside
+    assert set(targets) <= mine
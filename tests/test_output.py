@@ -0,0 +1,80 @@
+# core/output.py 결과 싱크(JSONL, CSV, SQLite)와 writer 스레드
+import csv
+import json
+import sqlite3
+
+import pytest
+
+from core.output import FIELDS, BaseSink, CsvSink, JsonlSink, ResultWriter, SqliteSink, create_sinks
+
+
+def _record(port, state='Open', service='SSH', proto='tcp'):
+    return {'timestamp': '2026-10-18T12:00:00', 'host': '10.0.0.1', 'port': port, 'proto': proto,
+            'state': state, 'service': service, 'rtt': 0.012, 'detect_time': None}
+
+
+def _write_all(sinks, records):
+    writer = ResultWriter(sinks).start()
+    for record in records:
+        writer.submit(record)
+    writer.close()
+
+
+def test_jsonl_appends_one_object_per_line(tmp_path):
+    path = tmp_path / 'out' / 'scan.jsonl'
+    _write_all([JsonlSink(str(path))], [_record(22)])
+    _write_all([JsonlSink(str(path))], [_record(80, service='서버')])
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line) for line in lines] == [_record(22), _record(80, service='서버')]
+
+
+def test_csv_writes_header_once(tmp_path):
+    path = tmp_path / 'scan.csv'
+    _write_all([CsvSink(str(path))], [_record(22)])
+    _write_all([CsvSink(str(path))], [_record(53, proto='udp', service='DNS, "bind"')])
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == list(FIELDS)
+    assert len(rows) == 3
+    assert rows[2][FIELDS.index('service')] == 'DNS, "bind"'
+
+
+def test_sqlite_batches_and_flushes_on_close(tmp_path):
+    path = tmp_path / 'scan.db'
+    _write_all([SqliteSink(str(path), batch_size=2)], [_record(port) for port in (21, 22, 23)])
+    with sqlite3.connect(path) as conn:
+        rows = conn.execute("SELECT host, port, proto, state, rtt FROM results ORDER BY port").fetchall()
+    assert rows == [('10.0.0.1', port, 'tcp', 'Open', 0.012) for port in (21, 22, 23)]
+
+
+def test_states_filter(tmp_path):
+    path = tmp_path / 'open.jsonl'
+    _write_all([JsonlSink(str(path), states=['Open'])],
+               [_record(22), _record(23, state='Closed'), _record(24, state='Filtered')])
+    assert [json.loads(line)['port'] for line in path.read_text().splitlines()] == [22]
+
+
+class _Broken(BaseSink):
+    def write(self, record):
+        raise OSError('disk full')
+
+
+def test_failing_sink_does_not_stop_others(tmp_path):
+    path = tmp_path / 'scan.jsonl'
+    _write_all([_Broken(str(tmp_path / 'broken')), JsonlSink(str(path))], [_record(22), _record(80)])
+    assert len(path.read_text().splitlines()) == 2
+
+
+def test_sink_must_implement_write():
+    with pytest.raises(TypeError):
+        BaseSink('x')
+
+
+def test_create_sinks(tmp_path):
+    sinks = create_sinks([{'type': 'JSONL', 'path': 'a.jsonl'},
+                          {'type': 'sqlite', 'path': 'b.db', 'batch_size': 10, 'states': ['Open']}])
+    assert [type(sink) for sink in sinks] == [JsonlSink, SqliteSink]
+    assert sinks[1].batch_size == 10 and sinks[1].states == {'Open'}
+    assert create_sinks(None) == []
+    with pytest.raises(ValueError):
+        create_sinks([{'type': 'xml', 'path': 'c.xml'}])
@@ -0,0 +1,137 @@
+# core/parallel.py 멀티 프로세스 샤드 스캔 (설정 분배, 결과 순서 병합, 실제 워커 프로세스)
+import queue
+import socket
+
+import pytest
+
+from core.parallel import ParallelScan, resolve_processes, worker_config
+from core.scanner import PortScanner
+
+
+def _config(tmp_path, ports='20-40', **scan_options):
+    options = {'mode': 'ASYNC', 'timeout': 0.5, 'concurrency': 100, 'randomize_order': True, 'seed': 11}
+    options.update(scan_options)
+    return {
+        'target': {'ip': '127.0.0.1-127.0.0.2', 'ports': ports},
+        'scan_options': options,
+        'discovery': {'enabled': False},
+        'advanced': {'service_detection': False},
+        'output': [{'type': 'jsonl', 'path': str(tmp_path / 'out.jsonl')}],
+        'logging': {'console_output': 'none'},
+    }
+
+
+def _record(port):
+    return {'host': '127.0.0.1', 'port': port, 'proto': 'tcp', 'state': 'Closed', 'service': 'Unknown'}
+
+
+def test_resolve_processes(monkeypatch):
+    monkeypatch.setattr('core.parallel.os.cpu_count', lambda: 6)
+    assert resolve_processes(None) == 1
+    assert resolve_processes('auto') == 6
+    assert resolve_processes('3') == 3
+    assert resolve_processes(0) == 1
+    with pytest.raises(ValueError):
+        resolve_processes('many')
+
+
+def test_worker_config_splits_limits(tmp_path):
+    config = _config(tmp_path, concurrency=1000, rate={'pps': 3000})
+    config['discovery']['enabled'] = True
+    split = worker_config(config, 4)
+    assert split['scan_options']['concurrency'] == 250
+    assert split['scan_options']['rate']['pps'] == 750
+    assert split['discovery']['enabled'] is False
+    assert 'output' not in split and split['logging']['console_output'] == 'none'
+    # 원본 설정은 그대로
+    assert config['scan_options']['concurrency'] == 1000 and 'output' in config
+
+
+class _Worker:
+    def __init__(self, alive=True, exitcode=None):
+        self.alive = alive
+        self.exitcode = exitcode
+
+    def is_alive(self):
+        return self.alive
+
+
+def _merger(tmp_path, processes=2):
+    parallel = ParallelScan(_config(tmp_path), processes)
+    parallel.state = {'finished': []}
+    published = []
+    parallel.scanner.listeners.append(lambda record: published.append(record['port']))
+    return parallel, published
+
+
+def test_merge_releases_records_in_scan_order(tmp_path):
+    """모든 워커의 bound 최솟값 미만인 위치만 순서대로 내보냄"""
+    parallel, published = _merger(tmp_path)
+    results = queue.Queue()
+    # 워커 0은 짝수 위치, 워커 1은 홀수 위치 (위치 = 포트로 표시)
+    results.put(('records', 0, [(0, _record(0)), (4, _record(4)), (2, _record(2))], 6))
+    results.put(('records', 1, [(1, _record(1))], 3))
+    results.put(('records', 1, [(None, _record(99))], 3))
+    results.put(('records', 1, [(5, _record(5)), (3, _record(3))], 7))
+    results.put(('done', 0, [], None))
+    results.put(('done', 1, [], None))
+    assert parallel._merge(results, [_Worker(), _Worker()]) is True
+    # 샤드 밖 레코드(None)는 바로, 나머지는 위치 순서
+    assert published == [0, 1, 2, 99, 3, 4, 5]
+    assert sorted(parallel.state['finished']) == [0, 1]
+
+
+def test_merge_reports_dead_worker(tmp_path, capsys):
+    parallel, published = _merger(tmp_path)
+    results = queue.Queue()
+    results.put(('records', 0, [(0, _record(0))], 1))
+    results.put(('done', 0, [], None))
+    assert parallel._merge(results, [_Worker(), _Worker(alive=False, exitcode=-9)]) is False
+    assert published == [0]
+    assert parallel.state['finished'] == [0]
+    assert 'exit code -9' in capsys.readouterr().out
+
+
+def test_merge_skips_finished_shards(tmp_path):
+    parallel, published = _merger(tmp_path)
+    results = queue.Queue()
+    results.put(('records', 1, [(3, _record(3)), (1, _record(1))], 5))
+    results.put(('done', 1, [], None))
+    # 이미 끝난 샤드(None)는 bound를 막지 않음
+    assert parallel._merge(results, [None, _Worker()]) is True
+    assert published == [1, 3]
+
+
+@pytest.fixture
+def listeners():
+    sockets = []
+    for _ in range(2):
+        listener = socket.socket()
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(16)
+        sockets.append(listener)
+    yield sorted(listener.getsockname()[1] for listener in sockets)
+    for listener in sockets:
+        listener.close()
+
+
+def test_parallel_scan_matches_single_process_order(tmp_path, listeners):
+    """워커 프로세스 2개의 결과가 단일 프로세스 스캔과 같은 순서, 같은 결과로 합쳐짐"""
+    ports = f"{listeners[0] - 4}-{listeners[0] + 4},{listeners[1]}"
+
+    single = PortScanner(_config(tmp_path / 'single', ports))
+    expected = {}
+    single.listeners.append(lambda record: expected.__setitem__((record['host'], record['port']), record['state']))
+    single.run()
+    # 단일 프로세스 엔진은 완료 순서로 내보내므로 비교는 스캔 순서(위치) 기준
+    order = [single.scheduler.at(position) for position in range(len(single.scheduler))]
+
+    parallel = ParallelScan(_config(tmp_path / 'parallel', ports), 2)
+    merged = []
+    parallel.scanner.listeners.append(lambda record: merged.append((record['host'], record['port'], record['state'])))
+    results = parallel.run()
+
+    assert [(host, port) for host, port, _ in merged] == order
+    assert {(host, port): state for host, port, state in merged} == expected
+    assert set(results) == {('127.0.0.1', port) for port in listeners}
+    assert len((tmp_path / 'parallel' / 'out.jsonl').read_text().splitlines()) == len(order)
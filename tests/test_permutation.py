@@ -0,0 +1,52 @@
+# core/permutation.py Feistel 순열 (일대일, 재현 가능, 중간부터 재개)
+import pytest
+
+from core.permutation import Permutation
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 5, 16, 17, 1000, 4099])
+def test_is_bijection(size):
+    permutation = Permutation(size, seed=1234)
+    values = list(permutation)
+    assert sorted(values) == list(range(size))
+
+
+def test_inverse():
+    permutation = Permutation(65535 * 3, seed=7)
+    for index in (0, 1, 12345, 65535 * 3 - 1):
+        assert permutation.inverse(permutation.forward(index)) == index
+
+
+def test_same_seed_same_order():
+    assert list(Permutation(500, seed=42)) == list(Permutation(500, seed=42))
+    assert list(Permutation(500, seed=42)) != list(Permutation(500, seed=43))
+
+
+def test_resume_from_middle():
+    permutation = Permutation(300, seed=99)
+    full = list(permutation)
+    assert list(Permutation(300, seed=99).iter_from(120)) == full[120:]
+
+
+def test_actually_shuffles():
+    values = list(Permutation(1000, seed=5))
+    assert values != list(range(1000))
+    # 앞쪽 구간이 원래 순서의 한쪽에 몰리지 않음
+    assert max(values[:100]) - min(values[:100]) > 500
+
+
+def test_random_seed_is_recorded():
+    permutation = Permutation(100)
+    assert list(Permutation(100, seed=permutation.seed)) == list(permutation)
+
+
+def test_bounds():
+    permutation = Permutation(10, seed=1)
+    assert len(permutation) == 10
+    with pytest.raises(IndexError):
+        permutation.forward(10)
+    with pytest.raises(IndexError):
+        permutation.inverse(-1)
+    assert list(Permutation(0, seed=1)) == []
+    with pytest.raises(ValueError):
+        Permutation(-1)
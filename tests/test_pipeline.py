@@ -0,0 +1,99 @@
+# core/pipeline.py 서비스 탐지 파이프라인 (스레드 워커 / 이벤트 루프)
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.pipeline import AsyncDetectionPipeline, DetectionPipeline
+
+
+class FakeDetector:
+    """get_banner/get_banner_async 호출을 기록하는 탐지기"""
+    def __init__(self, delay=0.0, fail=()):
+        self.delay = delay
+        self.fail = set(fail)
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def get_banner(self, ip, port, timeout=2, sock=None):
+        with self._lock:
+            self.calls.append((ip, port, timeout, sock))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            if port in self.fail:
+                raise RuntimeError('boom')
+            return f"svc-{port}"
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    async def get_banner_async(self, ip, port, timeout=2, sock=None, executor=None):
+        return await asyncio.get_running_loop().run_in_executor(executor, self.get_banner, ip, port, timeout, sock)
+
+
+@pytest.fixture(params=[DetectionPipeline, AsyncDetectionPipeline])
+def pipeline_class(request):
+    return request.param
+
+
+def test_results_and_callbacks(pipeline_class):
+    detector = FakeDetector(fail=[3])
+    seen = []
+    pipeline = pipeline_class(detector, on_result=lambda host, port, info, elapsed: seen.append((port, info)),
+                              workers=4, timeout_for=lambda host: 1.5).start()
+    for port in range(1, 6):
+        pipeline.submit('10.0.0.1', port, sock=f"sock-{port}")
+    pipeline.close()
+
+    assert pipeline.results[('10.0.0.1', 1)] == 'svc-1'
+    assert pipeline.results[('10.0.0.1', 3)] == 'Unknown (boom)'
+    assert sorted(seen) == sorted((port, pipeline.results[('10.0.0.1', port)]) for port in range(1, 6))
+    assert pipeline.backlog() == []
+    assert {(port, timeout, sock) for _, port, timeout, sock in detector.calls} == \
+        {(port, 1.5, f"sock-{port}") for port in range(1, 6)}
+
+
+def test_failing_callback_does_not_stall_submit(pipeline_class):
+    """on_result가 예외를 던져도 워커가 계속 대기열을 비움 (작은 대기열이 가득 차도 submit이 멈추지 않음)"""
+    detector = FakeDetector()
+
+    def on_result(host, port, info, elapsed):
+        raise ValueError('sink failed')
+
+    pipeline = pipeline_class(detector, on_result=on_result, workers=1, queue_size=1).start()
+    done = threading.Event()
+
+    def submit_all():
+        for port in range(1, 21):
+            pipeline.submit('10.0.0.1', port)
+        pipeline.close()
+        done.set()
+
+    threading.Thread(target=submit_all, daemon=True).start()
+    assert done.wait(5)
+    assert len(pipeline.results) == 20
+
+
+def test_worker_count_limits_concurrency():
+    detector = FakeDetector(delay=0.02)
+    pipeline = DetectionPipeline(detector, workers=3).start()
+    for port in range(1, 13):
+        pipeline.submit('10.0.0.1', port)
+    pipeline.close()
+    assert detector.peak <= 3
+    assert len(pipeline.results) == 12
+
+
+def test_backlog_lists_unfinished_targets():
+    detector = FakeDetector(delay=0.2)
+    pipeline = DetectionPipeline(detector, workers=1).start()
+    pipeline.submit('10.0.0.2', 22)
+    pipeline.submit('10.0.0.1', 80)
+    assert pipeline.backlog() == [('10.0.0.1', 80), ('10.0.0.2', 22)]
+    pipeline.close()
+    assert pipeline.backlog() == []
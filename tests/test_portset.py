@@ -0,0 +1,67 @@
+# core/portset.py 포트 명세 해석과 구간 기반 조회
+import pytest
+
+from core.portset import PortSet
+
+
+def test_parse_and_coalesce():
+    ports = PortSet('80, 22, 20-25, 24-30, 443')
+    assert ports.ranges == [(20, 30), (80, 80), (443, 443)]
+    assert len(ports) == 13
+    assert str(ports) == '20-30,80,443'
+
+
+def test_exclusions():
+    assert PortSet('1-100,!25,!50-60').ranges == [(1, 24), (26, 49), (61, 100)]
+    # 제외만 있으면 전체 포트에서 뺌
+    ports = PortSet('!1-1023')
+    assert ports.ranges == [(1024, 65535)]
+    assert len(ports) == 65535 - 1023
+
+
+def test_named_sets():
+    top100 = PortSet('top100')
+    assert len(top100) == 100
+    assert 22 in top100 and 3389 in top100 and 23 in top100
+    assert 24 not in top100
+    assert PortSet('well-known').ranges == [(1, 1023)]
+    assert PortSet('ALL').ranges == [(1, 65535)]
+    assert 22 not in PortSet('top100,!22')
+
+
+def test_rejected_parts():
+    ports = PortSet('22,abc,70000,90-80,80')
+    assert ports.ranges == [(22, 22), (80, 80)]
+    assert ports.rejected == ['abc', '70000', '90-80']
+
+
+def test_index_round_trip():
+    ports = PortSet('1-10,100-110,60000-65535')
+    for index in (0, 9, 10, 20, 21, len(ports) - 1):
+        assert ports.index(ports[index]) == index
+    assert ports[-1] == 65535
+    assert list(ports) == list(range(1, 11)) + list(range(100, 111)) + list(range(60000, 65536))
+    with pytest.raises(IndexError):
+        ports[len(ports)]
+    with pytest.raises(ValueError):
+        ports.index(50)
+
+
+def test_iter_from():
+    ports = PortSet('1-3,10-12')
+    assert list(ports.iter_from(2)) == [3, 10, 11, 12]
+    assert list(ports.iter_from(4)) == [11, 12]
+    assert list(ports.iter_from(6)) == []
+
+
+def test_set_operations():
+    ports = PortSet('1-100') - PortSet('10-20') | PortSet('8080')
+    assert ports.ranges == [(1, 9), (21, 100), (8080, 8080)]
+    assert not PortSet('!1-65535')
+
+
+def test_full_range_is_one_interval():
+    ports = PortSet('1-65535')
+    assert ports.ranges == [(1, 65535)]
+    assert ports[40000] == 40001
+    assert 65535 in ports and 0 not in ports
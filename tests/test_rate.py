@@ -0,0 +1,104 @@
+# core/rate.py 토큰 버킷, jitter 예약, 혼잡 윈도우(cwnd)
+import asyncio
+
+import pytest
+
+from core.rate import RateController
+
+
+def _epoch(rate, answered, dropped):
+    """한 epoch 분량의 프로브를 보내고 결과를 돌려줌"""
+    for _ in range(answered + dropped):
+        assert rate.try_acquire() is not None
+    for _ in range(answered):
+        rate.on_result("Open")
+    for _ in range(dropped):
+        rate.on_result("Filtered")
+
+
+def test_window_limits_probes_in_flight():
+    rate = RateController(cwnd_init=4, cwnd_min=1, epoch=100)
+    for _ in range(4):
+        assert rate.try_acquire() == 0.0
+    assert rate.try_acquire() is None
+    rate.on_result("Closed")
+    assert rate.in_flight == 3
+    assert rate.try_acquire() == 0.0
+
+
+def test_slow_start_then_additive_increase():
+    rate = RateController(cwnd_init=16, cwnd_max=100, epoch=16)
+    _epoch(rate, 16, 0)
+    assert rate.cwnd == 32
+    _epoch(rate, 16, 0)
+    assert rate.cwnd == 64
+    _epoch(rate, 16, 0)
+    assert rate.cwnd == 100
+
+
+def test_loss_halves_window_and_sets_ssthresh():
+    rate = RateController(cwnd_init=64, cwnd_min=16, epoch=20)
+    _epoch(rate, 20, 0)
+    assert rate.cwnd == 128
+    # 응답 비율이 기준치(1.0)의 절반 아래로 떨어짐 -> 혼잡
+    _epoch(rate, 4, 16)
+    assert rate.cwnd == 64 and rate.ssthresh == 64
+    # ssthresh 이상에서는 배로 늘리지 않고 조금씩 (10%)
+    _epoch(rate, 20, 0)
+    assert rate.cwnd == pytest.approx(70.4)
+
+
+def test_window_never_drops_below_minimum():
+    rate = RateController(cwnd_init=32, cwnd_min=16, epoch=10)
+    _epoch(rate, 10, 0)
+    for _ in range(5):
+        _epoch(rate, 0, 10)
+    assert rate.cwnd == 16
+
+
+def test_hosts_that_never_answer_do_not_shrink_window():
+    """처음부터 응답 비율이 거의 0이면(닫힌 대상) 혼잡으로 보지 않음"""
+    rate = RateController(cwnd_init=32, epoch=10)
+    _epoch(rate, 0, 10)
+    _epoch(rate, 0, 10)
+    assert rate.cwnd == 128
+
+
+def test_without_window_only_pacing_applies():
+    rate = RateController(cwnd_init=None)
+    for _ in range(1000):
+        assert rate.try_acquire() == 0.0
+    rate.on_result("Filtered")
+    assert rate.stats()['cwnd'] is None
+
+
+def test_token_bucket_schedules_future_slots():
+    rate = RateController(pps=100, cwnd_init=None)
+    # 용량(10ms 분량 = 1개)을 쓰고 나면 다음 슬롯은 약 1/pps초 뒤씩 예약
+    assert rate.try_acquire() == 0.0
+    assert rate.try_acquire() == pytest.approx(0.01, abs=0.002)
+    assert rate.try_acquire() == pytest.approx(0.02, abs=0.002)
+
+
+def test_jitter_spaces_out_slots():
+    rate = RateController(jitter_min=0.05, jitter_max=0.05, cwnd_init=None)
+    delays = [rate.try_acquire() for _ in range(3)]
+    assert delays[0] == 0.0
+    assert delays[1] == pytest.approx(0.05, abs=0.005)
+    assert delays[2] == pytest.approx(0.10, abs=0.005)
+
+
+def test_async_acquire_waits_for_window():
+    rate = RateController(cwnd_init=1, cwnd_min=1, epoch=100)
+
+    async def run():
+        await rate.acquire_async()
+        waiter = asyncio.ensure_future(rate.acquire_async())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        rate.on_result("Open")
+        await asyncio.wait_for(waiter, 1)
+
+    asyncio.run(run())
+    assert rate.in_flight == 1
+    assert rate.stats()['sent'] == 2
@@ -0,0 +1,83 @@
+# core/targets.py 대상 확장과 core/scheduler.py 호스트 x 포트 순회 순서
+import pytest
+
+from core.portset import PortSet
+from core.scheduler import ScanScheduler, ShardedScheduler, parse_shard
+from core.targets import TargetSet
+
+
+def test_target_forms():
+    targets = TargetSet('10.0.0.0/30, 10.0.0.2-5, 192.168.1.10-12')
+    # 겹치는 CIDR/범위는 구간 하나로 합쳐짐
+    assert len(targets.ranges) == 2
+    assert len(targets) == 9
+    assert list(targets) == ['10.0.0.0', '10.0.0.1', '10.0.0.2', '10.0.0.3', '10.0.0.4', '10.0.0.5',
+                             '192.168.1.10', '192.168.1.11', '192.168.1.12']
+    assert targets.index_of('192.168.1.11') == 7
+    assert targets[-1] == '192.168.1.12'
+    assert '10.0.0.6' not in targets
+    assert str(targets) == '10.0.0.0-10.0.0.5, 192.168.1.10-192.168.1.12'
+
+
+def test_large_range_is_not_expanded():
+    targets = TargetSet(['10.0.0.0/8'])
+    assert len(targets) == 2 ** 24
+    assert len(targets.ranges) == 1
+    assert targets[2 ** 24 - 1] == '10.255.255.255'
+
+
+@pytest.mark.parametrize('spec', ['', '10.0.0.5-10.0.0.1', '10.0.0.0/33', '::1', 'not an ip'])
+def test_invalid_targets(spec):
+    with pytest.raises(ValueError):
+        TargetSet(spec)
+
+
+def test_port_major_order():
+    scheduler = ScanScheduler(TargetSet('10.0.0.1-3'), PortSet('22,80'))
+    assert list(scheduler) == [('10.0.0.1', 22), ('10.0.0.2', 22), ('10.0.0.3', 22),
+                               ('10.0.0.1', 80), ('10.0.0.2', 80), ('10.0.0.3', 80)]
+    assert list(scheduler.iter_from(4)) == list(scheduler)[4:]
+    assert scheduler.position_of('10.0.0.2', 80) == 4
+    assert scheduler.at(4) == ('10.0.0.2', 80)
+
+
+def test_randomized_order_covers_space_once():
+    scheduler = ScanScheduler(TargetSet('10.0.0.0/28'), PortSet('1-50'), randomize=True, seed=11)
+    pairs = list(scheduler)
+    assert len(pairs) == len(set(pairs)) == 16 * 50
+    assert pairs != list(ScanScheduler(TargetSet('10.0.0.0/28'), PortSet('1-50')))
+    for position in (0, 123, 799):
+        assert scheduler.position_of(*scheduler.at(position)) == position
+    # 같은 seed로 만든 스케줄러는 중간 위치부터 그대로 이어짐
+    resumed = ScanScheduler(TargetSet('10.0.0.0/28'), PortSet('1-50'), randomize=True, seed=scheduler.seed)
+    assert list(resumed.iter_from(300)) == pairs[300:]
+
+
+def test_parse_shard():
+    assert parse_shard('1/4') == (0, 4)
+    assert parse_shard('4/4') == (3, 4)
+    for spec in ('0/4', '5/4', '1/0', '2', 'a/b'):
+        with pytest.raises(ValueError):
+            parse_shard(spec)
+
+
+@pytest.mark.parametrize('randomize', [False, True])
+def test_shards_partition_the_space(randomize):
+    base = ScanScheduler(TargetSet('10.0.0.1-7'), PortSet('1-13'), randomize=randomize, seed=3)
+    shards = [ShardedScheduler(base, index, 3) for index in range(3)]
+    assert sum(len(shard) for shard in shards) == len(base)
+    seen = [pair for shard in shards for pair in shard]
+    assert sorted(seen) == sorted(base)
+    for shard in shards:
+        assert list(shard.iter_from(5)) == list(shard)[5:]
+        for position, (host, port) in enumerate(shard):
+            assert shard.position_of(host, port) == position
+    with pytest.raises(ValueError):
+        shards[0].position_of(*shards[1].at(0))
+
+
+def test_nested_shards():
+    base = ScanScheduler(TargetSet('10.0.0.1-5'), PortSet('1-20'), randomize=True, seed=8)
+    machine = ShardedScheduler(base, 1, 2)
+    workers = [ShardedScheduler(machine, index, 3) for index in range(3)]
+    assert sorted(pair for worker in workers for pair in worker) == sorted(machine)
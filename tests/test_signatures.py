@@ -0,0 +1,79 @@
+# core/signatures.py 리터럴 사전 필터 + 정규식 시그니처 매처
+import re
+
+import pytest
+
+from core.analyzer import ServiceDetector
+from core.signatures import SignatureMatcher
+
+
+def test_first_match_in_rule_order():
+    matcher = SignatureMatcher([
+        ('SSH', rb'^SSH-([\d.]+)-(\S+)', '{2}'),
+        ('HTTP', re.compile(r'Server:\s*([^\r\n]+)', re.IGNORECASE), '{1}'),
+        ('FTP', rb'220\s+(\S+)', '{1}'),
+    ])
+    hit = matcher.first(b'SSH-2.0-OpenSSH_9.6\r\n')
+    assert (hit.service, hit.version) == ('SSH', 'OpenSSH_9.6')
+    hit = matcher.first(b'HTTP/1.1 200 OK\r\nSERVER: nginx/1.25\r\n')
+    assert str(hit) == 'HTTP (nginx/1.25)'
+    assert matcher.first(b'nothing here') is None
+
+
+def test_inline_ignorecase_flag():
+    """(?i)로 쓴 규칙도 대소문자 무시 필터에 들어가야 함"""
+    matcher = SignatureMatcher([('Apache', rb'(?i)apache/([\d.]+)', '{1}')])
+    assert matcher.rules[0].icase
+    hit = matcher.first(b'Server: Apache/2.4.58')
+    assert hit is not None and hit.version == '2.4.58'
+    assert matcher.first('server: APACHE/2.2').version == '2.2'
+
+
+def test_inline_multiline_flag_is_not_anchored_to_start():
+    matcher = SignatureMatcher([('SMTP', rb'(?m)^220 (\S+) ESMTP', '{1}')])
+    assert not matcher.rules[0].anchored
+    assert matcher.first(b'220-welcome\r\n220 mx.example.test ESMTP').version == 'mx.example.test'
+
+
+def test_anchored_literal_uses_prefix():
+    matcher = SignatureMatcher([('SSH', rb'^SSH-([\d.]+)', '{1}')])
+    assert matcher.rules[0].literal == b'SSH-' and matcher.rules[0].anchored
+    assert matcher.first(b'banner SSH-2.0') is None
+    assert matcher.first(b'SSH-2.0-x').version == '2.0'
+
+
+def test_rules_without_literal_always_run():
+    matcher = SignatureMatcher([('Version', rb'(\d+\.\d+\.\d+)', '{1}')])
+    assert matcher.rules[0].literal is None
+    assert matcher.first(b'MySQL 8.0.36-log').version == '8.0.36'
+
+
+def test_overlapping_literals_and_scan_all():
+    matcher = SignatureMatcher([
+        ('A', rb'OpenSSH_([\d.]+)', '{1}'),
+        ('B', rb'OpenSSH', None),
+        ('C', rb'Dropbear', None),
+    ])
+    assert [hit.service for hit in matcher.scan(b'SSH-2.0-OpenSSH_9.6')] == ['A', 'B']
+
+
+def test_scan_many_deduplicates():
+    matcher = SignatureMatcher([('FTP', rb'220 (\S+)', '{1}')])
+    results = matcher.scan_many({('a', 21): b'220 vsFTPd', ('b', 21): b'220 vsFTPd', ('c', 21): b'x'})
+    assert results[('a', 21)] is results[('b', 21)]
+    assert results[('a', 21)][0].version == 'vsFTPd'
+    assert results[('c', 21)] == []
+
+
+def test_detector_matches_raw_banner_without_cleaning(monkeypatch):
+    """시그니처는 받은 바이트 그대로 대조하고, 표시용 정리는 매칭되지 않았을 때만"""
+    detector = ServiceDetector()
+    monkeypatch.setattr(detector, '_clean_binary', lambda data: pytest.fail('cleaned a matched banner'))
+    greeting = b'J\x00\x00\x00\x0a8.0.36\x00\x08\x00\x00\x00\xa1\x9f\x07\xfe\x00\xff\xf7'
+    assert detector._analyze(greeting, 3307) == 'MySQL (8.0.36)'
+
+
+def test_detector_cleans_unmatched_binary_banner():
+    detector = ServiceDetector()
+    assert detector._analyze(b'\x00\x01\xfe\xffhello world\x00\x9f', 7000) == 'Unknown (hello world...)'
+    assert detector._analyze(b'', 7000) == 'Open (Empty Banner)'
@@ -0,0 +1,98 @@
+# core/protocols/smb.py 응답 해석 (impacket smbserver에서 캡처한 응답, NetBIOS 헤더 제외)
+import struct
+
+import pytest
+
+from core.protocols import smb
+
+
+def test_smb1_negotiate_extended_security(packet):
+    info = smb.parse_negotiate(packet('smb1_negotiate.bin'))
+    assert info == {
+        'version': 1,
+        'status': 0,
+        'dialect': 'NT LM 0.12',
+        'signing': 'disabled',
+        'extended_security': True,
+        'guid': '41414141-4141-4141-4141-414141414141',
+    }
+
+
+def test_smb1_negotiate_domain_and_server():
+    # 확장 보안이 없는 NT LM 0.12 응답: 8바이트 challenge 뒤에 UTF-16 도메인/서버 이름 (정렬 패딩 없음)
+    header = struct.pack('<4sBIBHH8sHHHHH', smb.SMB1_MAGIC, smb.SMB1_NEGOTIATE, 0, 0x98,
+                         smb.FLAGS2_UNICODE | smb.FLAGS2_NT_STATUS, 0, b'\x00' * 8, 0, 0, 0x4b2f, 0, 0)
+    words = struct.pack('<HBHHIIIIQhB', 5, 0x03, 50, 1, 16644, 65536, 0, smb.CAP_NT_STATUS, 0, 0, 8)
+    data = b'\x11' * 8 + 'WORKGROUP\x00'.encode('utf-16-le') + 'FILESRV\x00'.encode('utf-16-le')
+    response = header + b'\x11' + words + struct.pack('<H', len(data)) + data
+    info = smb.parse_negotiate(response)
+    assert info['dialect'] == 'NT LM 0.12'
+    assert info['extended_security'] is False
+    assert info['domain'] == 'WORKGROUP'
+    assert info['server'] == 'FILESRV'
+
+
+def test_smb1_session_setup_ntlmssp(packet):
+    info = smb.parse_smb1_session_setup(memoryview(packet('smb1_session_setup.bin')))
+    assert info == {
+        'os_build': '255.255.65535',
+        'netbios_name': 'udRTuZXY',
+        'dns_name': 'udRTuZXY',
+        'netbios_domain': 'NZYNVxYf',
+        'dns_domain': 'NZYNVxYf',
+        'native_os': 'UvAZRXpW',
+        'native_lanman': 'UvAZRXpW',
+    }
+
+
+def test_smb2_negotiate(packet):
+    info = smb.parse_negotiate(packet('smb2_negotiate.bin'))
+    assert info['version'] == 2
+    assert info['dialect_code'] == 0x0202
+    assert info['dialect'] == 'SMB 2.0.2'
+    assert info['signing'] == 'enabled'
+    assert info['guid'] == '41414141-4141-4141-4141-414141414141'
+
+
+def test_smb2_session_setup_ntlmssp(packet):
+    info = smb.parse_smb2_session_setup(memoryview(packet('smb2_session_setup.bin')))
+    assert info == {
+        'os_build': '255.255.65535',
+        'netbios_domain': 'BGRYGLET',
+        'dns_domain': 'BGRYGLET',
+        'netbios_name': 'XMRWDBDK',
+        'dns_name': 'XMRWDBDK',
+    }
+
+
+@pytest.mark.parametrize('name, parser', [
+    ('smb1_negotiate.bin', smb.parse_negotiate),
+    ('smb2_negotiate.bin', smb.parse_negotiate),
+    ('smb1_session_setup.bin', lambda data: smb.parse_smb1_session_setup(memoryview(data))),
+    ('smb2_session_setup.bin', lambda data: smb.parse_smb2_session_setup(memoryview(data))),
+])
+def test_truncated_responses_never_crash(packet, name, parser):
+    """잘린 응답은 ValueError 또는 일부 정보만 (IndexError/struct.error 등은 나오면 안 됨)"""
+    data = packet(name)
+    for size in range(len(data)):
+        try:
+            parser(data[:size])
+        except ValueError:
+            pass
+
+
+def test_banner_from_raw_netbios_message(packet):
+    data = packet('smb1_negotiate.bin')
+    raw = b'\x00' + len(data).to_bytes(3, 'big') + data
+    handler = smb.SmbProtocol(445, 1.0)
+    assert handler.parse(raw) == 'SMB (NT LM 0.12 | Signing: disabled | GUID: 41414141-4141-4141-4141-414141414141)'
+    assert handler.parse(b'\x00\x00\x00\x10\xffSMBgarbage').startswith('SMB (Malformed')
+
+
+def test_banner_from_session_info(packet):
+    info = smb.parse_negotiate(packet('smb2_negotiate.bin'))
+    info.update(smb.parse_smb2_session_setup(memoryview(packet('smb2_session_setup.bin'))))
+    assert smb.format_smb_info(info) == (
+        'SMB (SMB 2.0.2 | Signing: enabled | GUID: 41414141-4141-4141-4141-414141414141 | '
+        'Build: 255.255.65535 | Name: XMRWDBDK | Domain: BGRYGLET | DNS: BGRYGLET)'
+    )
@@ -0,0 +1,80 @@
+# core/protocols/ssh.py KEXINIT 해석 (paramiko 서버에서 캡처한 식별 문자열 + KEXINIT 패킷)
+import socket
+import struct
+import sys
+
+from core.protocols import ssh
+from core.protocols.ssh import SshProtocol, parse_kexinit
+from utils.logger import app_logger
+
+
+def _kexinit_payload(data):
+    """캡처 데이터에서 첫 바이너리 패킷의 payload (패딩 제외)"""
+    start = data.index(b'\r\n') + 2
+    packet_length, padding_length = struct.unpack_from('>IB', data, start)
+    return data[start + 5:start + 4 + packet_length - padding_length]
+
+
+def test_parse_kexinit(packet):
+    kexinit = parse_kexinit(_kexinit_payload(packet('ssh_server_hello.bin')))
+    assert kexinit['kex'][0] == 'curve25519-sha256@libssh.org'
+    assert 'kex-strict-s-v00@openssh.com' in kexinit['kex']
+    assert kexinit['host_keys'] == ['rsa-sha2-512', 'rsa-sha2-256']
+    assert kexinit['ciphers'][:3] == ['aes128-ctr', 'aes192-ctr', 'aes256-ctr']
+    assert 'hmac-md5' in kexinit['macs']
+    assert kexinit['compression'] == ['none']
+
+
+def test_parse_kexinit_memoryview(packet):
+    payload = _kexinit_payload(packet('ssh_server_hello.bin'))
+    assert parse_kexinit(memoryview(payload)) == parse_kexinit(payload)
+
+
+def test_truncated_or_foreign_payload(packet):
+    payload = _kexinit_payload(packet('ssh_server_hello.bin'))
+    for size in (0, 1, 16, 17, 20, 100, len(payload) - 6):
+        assert parse_kexinit(payload[:size]) is None
+    assert parse_kexinit(b'\x15' + payload[1:]) is None
+
+
+def test_handle_reads_only_kexinit(packet):
+    """식별 문자열 교환 후 KEXINIT만 읽고 끝냄 (키 교환 없이)"""
+    server, client = socket.socketpair()
+    try:
+        server.sendall(packet('ssh_server_hello.bin'))
+        handler = SshProtocol(22, 2.0)
+        assert handler.supports_async()
+        result = handler.handle(client)
+        assert server.recv(64) == b'SSH-2.0-SecurityScanner\r\n'
+    finally:
+        server.close()
+        client.close()
+    assert result['banner'] == 'SSH-2.0-paramiko_5.0.0'
+    assert result['host_keys'] == ['rsa-sha2-512', 'rsa-sha2-256']
+    banner = handler.parse(result)
+    assert banner.startswith('SSH (paramiko_5.0.0) | HostKey: [rsa-sha2-512, rsa-sha2-256]')
+    assert '3des-cbc' in banner and 'hmac-md5-96' in banner
+
+
+def test_handle_without_identification():
+    server, client = socket.socketpair()
+    try:
+        server.sendall(b'HTTP/1.0 400 Bad Request\r\n' * 10)
+        result = SshProtocol(22, 2.0).handle(client)
+    finally:
+        server.close()
+        client.close()
+    assert result == 'SSH Error (No identification string)'
+
+
+def test_deep_mode_without_paramiko_warns_once(monkeypatch):
+    warnings = []
+    monkeypatch.setitem(sys.modules, 'paramiko', None)     # import paramiko -> ImportError
+    monkeypatch.setattr(ssh, '_paramiko_missing_warned', False)
+    monkeypatch.setattr(app_logger, 'warning', lambda message, *args: warnings.append(message))
+    for port in (22, 2222, 22):
+        handler = SshProtocol(port, 1.0, deep=True)
+        assert not handler._use_paramiko()
+        assert handler.supports_async()
+    assert len(warnings) == 1
+    assert 'paramiko' in warnings[0]
@@ -0,0 +1,146 @@
+# core/scan_types/syn.py 수신 스레드의 응답 매칭 (raw 소켓 대신 데이터그램 소켓 쌍으로 패킷 주입)
+import collections
+import queue
+import socket
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('scapy')
+
+from core.scan_types.packet import TCP_ACK, TCP_RST, TCP_SYN, ProbeCookie, build_tcp_packet  # noqa: E402
+from core.scan_types.syn import SynScanner  # noqa: E402
+
+TARGET, LOCAL = '192.0.2.20', '192.0.2.1'
+
+
+class CountingRate:
+    def __init__(self):
+        self.responses = 0
+        self.drops = 0
+
+    def on_response(self):
+        self.responses += 1
+
+    def on_drop(self):
+        self.drops += 1
+
+
+class RecordingSocket:
+    def __init__(self):
+        self.sent = []
+
+    def sendto(self, packet, address):
+        self.sent.append(packet)
+
+
+class Receiver:
+    """_receive_loop을 스레드로 띄우고 응답 패킷을 주입"""
+    def __init__(self, scanner):
+        self.scanner = scanner
+        self.cookie = ProbeCookie()
+        self.pending, self.answered, self.lock = set(), {}, threading.Lock()
+        self.stop = threading.Event()
+        self.inject, self.recv_skt = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.send_skt = RecordingSocket()
+        self.thread = threading.Thread(
+            target=scanner._receive_loop,
+            args=(self.recv_skt, self.send_skt, self.cookie, self.pending, self.answered, self.lock, self.stop),
+            daemon=True)
+        self.thread.start()
+
+    def reply(self, port, src_port, flags):
+        ack = (self.cookie.make(TARGET, port, src_port) + 1) & 0xffffffff
+        self.inject.send(build_tcp_packet(TARGET, LOCAL, port, src_port, 1000, ack=ack, flags=flags))
+        # 수신 스레드가 처리할 시간
+        time.sleep(0.05)
+
+    def close(self):
+        self.stop.set()
+        self.thread.join(1.0)
+        self.inject.close()
+        self.recv_skt.close()
+
+
+@pytest.fixture
+def receiver():
+    scanner = SynScanner(timeout=0.1, rate=CountingRate())
+    receiver = Receiver(scanner)
+    yield receiver
+    receiver.close()
+
+
+def test_duplicate_syn_ack_counted_once(receiver):
+    receiver.pending.add((TARGET, 22))
+    receiver.reply(22, 40000, TCP_SYN | TCP_ACK)
+    receiver.reply(22, 40000, TCP_SYN | TCP_ACK)
+    assert receiver.answered == {(TARGET, 22): 'Open'}
+    assert receiver.scanner.rate.responses == 1
+    # 두 SYN-ACK 모두 RST로 끊음
+    assert len(receiver.send_skt.sent) == 2
+
+
+def test_late_reply_after_finalize_is_ignored(receiver):
+    scanner, results = receiver.scanner, queue.Queue()
+    in_flight = [([(TARGET, 80)], {TARGET}, time.monotonic())]
+    receiver.pending.add((TARGET, 80))
+    scanner._finalize(collections.deque(in_flight), receiver.pending, receiver.answered,
+                      receiver.lock, results)
+    assert results.get_nowait() == (TARGET, 80, 'Filtered')
+    assert scanner.rate.drops == 1
+
+    receiver.reply(80, 40001, TCP_SYN | TCP_ACK)
+    receiver.reply(80, 40001, TCP_RST | TCP_ACK)
+    assert receiver.answered == {}
+    assert scanner.rate.responses == 0
+    # 늦게 온 SYN-ACK도 상대 쪽 half-open 연결은 RST로 정리
+    assert len(receiver.send_skt.sent) == 1
+
+
+def test_answered_probe_finalizes_once(receiver):
+    scanner, results = receiver.scanner, queue.Queue()
+    receiver.pending.update({(TARGET, 443), (TARGET, 444)})
+    receiver.reply(443, 40002, TCP_SYN | TCP_ACK)
+    receiver.reply(444, 40003, TCP_RST | TCP_ACK)
+    in_flight = collections.deque([([(TARGET, 443), (TARGET, 444)], {TARGET}, time.monotonic())])
+    scanner._finalize(in_flight, receiver.pending, receiver.answered, receiver.lock, results)
+    assert [results.get_nowait() for _ in range(2)] == [(TARGET, 443, 'Open'), (TARGET, 444, 'Closed')]
+    # 판정 이후 재전송된 SYN-ACK
+    receiver.reply(443, 40002, TCP_SYN | TCP_ACK)
+    assert scanner.rate.responses == 2 and scanner.rate.drops == 0
+    assert not receiver.pending and not receiver.answered
+
+
+def test_reply_with_wrong_cookie_is_ignored(receiver):
+    receiver.pending.add((TARGET, 25))
+    receiver.inject.send(build_tcp_packet(TARGET, LOCAL, 25, 40004, 1000, ack=12345, flags=TCP_SYN | TCP_ACK))
+    time.sleep(0.05)
+    assert receiver.answered == {}
+    assert receiver.send_skt.sent == []
+
+
+def test_send_socket_is_closed_when_receive_socket_fails(monkeypatch):
+    """수신용 raw 소켓 생성이 실패해도 먼저 만든 송신 소켓은 닫힘"""
+    created = []
+
+    class FakeSocket:
+        def __init__(self, family, kind, proto):
+            if proto == socket.IPPROTO_TCP:
+                raise PermissionError(1, 'Operation not permitted')
+            self.closed = False
+            created.append(self)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self.closed = True
+
+        def setsockopt(self, *args):
+            pass
+
+    monkeypatch.setattr('core.scan_types.syn.socket.socket', FakeSocket)
+    with pytest.raises(PermissionError):
+        list(SynScanner(timeout=0.1).scan_batch([(TARGET, 80)]))
+    assert len(created) == 1 and created[0].closed
@@ -0,0 +1,94 @@
+# core/protocols/telnet.py 협상 상태 기계와 배너 수집 (소켓 쌍으로 서버 흉내)
+import socket
+import threading
+import time
+
+from core.protocols.telnet import DO, DONT, IAC, SB, SE, WILL, WONT, TelnetProtocol, TelnetStream
+
+ECHO, SUPPRESS_GO_AHEAD, TERMINAL_TYPE = 1, 3, 24
+
+
+def test_negotiation_is_refused_and_removed_from_text():
+    stream = TelnetStream()
+    reply = stream.feed(bytes((IAC, DO, TERMINAL_TYPE, IAC, WILL, ECHO)) + b'Ubuntu 22.04\r\n')
+    assert reply == bytes((IAC, WONT, TERMINAL_TYPE, IAC, DONT, ECHO))
+    assert stream.requested == [('DO', TERMINAL_TYPE), ('WILL', ECHO)]
+    assert bytes(stream.text) == b'Ubuntu 22.04\r\n'
+
+
+def test_sequences_split_across_chunks():
+    stream = TelnetStream()
+    data = bytes((IAC, DO, ECHO, IAC, SB, TERMINAL_TYPE, 1, IAC, SE, IAC, WILL, SUPPRESS_GO_AHEAD)) + b'hi'
+    replies = b''.join(stream.feed(data[i:i + 1]) for i in range(len(data)))
+    assert replies == bytes((IAC, WONT, ECHO, IAC, DONT, SUPPRESS_GO_AHEAD))
+    assert bytes(stream.text) == b'hi'
+
+
+def test_escaped_iac_and_ignored_commands():
+    stream = TelnetStream()
+    # IAC IAC = 데이터 0xff, DONT/WONT에는 응답하지 않음, 그 외 2바이트 명령(NOP)은 무시
+    assert stream.feed(bytes((IAC, IAC, IAC, DONT, ECHO, IAC, WONT, ECHO, IAC, 241)) + b'x') == b''
+    assert bytes(stream.text) == b'\xffx'
+
+
+def test_prompt_detection():
+    stream = TelnetStream()
+    stream.feed(b'Welcome\r\n')
+    assert not stream.at_prompt()
+    stream.feed(b'metasploitable login: ')
+    assert stream.at_prompt()
+    shell = TelnetStream()
+    shell.feed(b'router# ')
+    assert shell.at_prompt()
+
+
+def _serve(script):
+    """script(conn)를 서버 쪽에서 실행하고 (클라이언트 소켓, 서버 스레드, 서버가 받은 데이터) 반환"""
+    client, server = socket.socketpair()
+    received = bytearray()
+
+    def run():
+        with server:
+            script(server, received)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return client, thread, received
+
+
+def test_handle_stops_at_login_prompt():
+    def script(conn, received):
+        conn.sendall(bytes((IAC, DO, TERMINAL_TYPE)))
+        received.extend(conn.recv(16))
+        conn.sendall(b'Ubuntu 8.04\r\nmetasploitable login: ')
+        # 클라이언트가 연결을 닫을 때까지 더 보내지 않음
+        conn.recv(16)
+
+    client, thread, received = _serve(script)
+    started = time.monotonic()
+    raw = TelnetProtocol(23, timeout=1.0).handle(client)
+    assert time.monotonic() - started < 1.0
+    thread.join()
+    assert received == bytes((IAC, WONT, TERMINAL_TYPE))
+    assert TelnetProtocol(23, 1.0).parse(raw) == 'Telnet (Ubuntu 8.04 | metasploitable login:)'
+
+
+def test_silent_server_gets_one_newline():
+    def script(conn, received):
+        received.extend(conn.recv(16))
+        conn.sendall(b'Password: ')
+        conn.recv(16)
+
+    client, thread, received = _serve(script)
+    raw = TelnetProtocol(23, timeout=0.2).handle(client)
+    thread.join()
+    assert received == b'\r\n'
+    assert raw == b'Password: '
+
+
+def test_parse_skips_ascii_art_and_strips_negotiation():
+    art = b' __  __ _ \r\n|  \\/  | |\r\n'
+    data = bytes((IAC, WILL, ECHO)) + art + b'Router firmware 1.2.3\r\n'
+    assert TelnetProtocol(23, 1.0).parse(data) == 'Telnet (Router firmware 1.2.3)'
+    assert TelnetProtocol(23, 1.0).parse(b'\r\nhello there\r\n') == 'Telnet (hello there)'
+    assert TelnetProtocol(23, 1.0).parse(b'') is None
@@ -0,0 +1,58 @@
+# core/timing.py 호스트별 RTT 추정과 적응형 timeout (RFC 6298 방식)
+import pytest
+
+from core.timing import RttEstimator
+
+
+def test_first_sample_sets_srtt_and_half_variance():
+    rtt = RttEstimator(initial_timeout=2.0, min_timeout=0.01)
+    rtt.observe('10.0.0.1', 0.1)
+    assert rtt.srtt('10.0.0.1') == pytest.approx(0.1)
+    # SRTT + 4 * RTTVAR = 0.1 + 4 * 0.05
+    assert rtt.timeout_for('10.0.0.1') == pytest.approx(0.3)
+
+
+def test_smoothing_follows_rfc6298():
+    rtt = RttEstimator(initial_timeout=2.0, min_timeout=0.01)
+    rtt.observe('10.0.0.1', 0.1)
+    rtt.observe('10.0.0.1', 0.3)
+    # RTTVAR = 0.75 * 0.05 + 0.25 * |0.1 - 0.3|, SRTT = 0.875 * 0.1 + 0.125 * 0.3
+    assert rtt.srtt('10.0.0.1') == pytest.approx(0.125)
+    assert rtt.timeout_for('10.0.0.1') == pytest.approx(0.125 + 4 * 0.0875)
+
+
+def test_timeout_is_clamped():
+    rtt = RttEstimator(initial_timeout=1.0, min_timeout=0.05)
+    rtt.observe('fast', 0.001)
+    rtt.observe('slow', 5.0)
+    assert rtt.timeout_for('fast') == 0.05
+    # max_timeout 기본값은 initial_timeout
+    assert rtt.timeout_for('slow') == 1.0
+
+
+def test_unsampled_host_never_waits_less_than_initial_timeout():
+    """빠른 호스트들이 전체 통계를 끌어내려도 표본 없는 호스트는 initial_timeout 이상"""
+    rtt = RttEstimator(initial_timeout=1.0, min_timeout=0.01, max_timeout=3.0)
+    assert rtt.timeout_for('new') == 1.0
+    for _ in range(20):
+        rtt.observe('fast', 0.001)
+    assert rtt.timeout_for('new') == 1.0
+    for _ in range(20):
+        rtt.observe('slow', 0.8)
+    assert 1.0 < rtt.timeout_for('new') <= 3.0
+
+
+def test_negative_samples_are_ignored():
+    rtt = RttEstimator()
+    rtt.observe('10.0.0.1', -0.5)
+    assert rtt.srtt('10.0.0.1') is None
+
+
+def test_scaled_timeout_for_banner_grabbing():
+    rtt = RttEstimator(initial_timeout=1.0, min_timeout=0.01)
+    # 표본이 전혀 없으면 상한 그대로
+    assert rtt.scaled_timeout('10.0.0.1', 4, 0.5, 5.0) == 5.0
+    rtt.observe('10.0.0.1', 0.05)
+    assert rtt.scaled_timeout('10.0.0.1', 4, 0.5, 5.0) == pytest.approx(0.6)
+    assert rtt.scaled_timeout('10.0.0.1', 2, 0.5, 5.0) == 0.5
+    assert rtt.scaled_timeout('10.0.0.1', 10, 0.1, 5.0) == pytest.approx(1.5)
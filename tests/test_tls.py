@@ -0,0 +1,97 @@
+# core/tls.py 인증서 해석 (openssl로 만든 DER 인증서)
+import datetime
+import hashlib
+import os
+import socket
+import ssl
+import threading
+
+from conftest import FIXTURES
+from core.analyzer import ServiceDetector
+from core.probes import DEFAULT_PROBES, ProbeDatabase
+from core.tls import TlsInspector, format_tls_info, parse_certificate
+
+
+def test_certificate_with_san(packet):
+    der = packet('tls_certificate.der')
+    certificate = parse_certificate(der)
+    assert certificate['subject'] == {'O': 'Example Corp', 'CN': 'scanner.example.test'}
+    assert certificate['issuer'] == certificate['subject']
+    assert certificate['not_after'] == datetime.datetime(2036, 10, 15, 17, 37, 23, tzinfo=datetime.timezone.utc)
+    assert certificate['sans'] == ['scanner.example.test', 'www.example.test', '192.0.2.10']
+    assert certificate['fingerprint'] == hashlib.sha256(der).hexdigest()
+
+
+def test_certificate_without_extensions(packet):
+    # 만료일이 2050년 이후라 GeneralizedTime으로 인코딩된 인증서
+    certificate = parse_certificate(packet('tls_certificate_no_extensions.der'))
+    assert certificate['subject'] == {'CN': 'legacy-device'}
+    assert certificate['not_after'] == datetime.datetime(2126, 9, 24, 17, 39, 23, tzinfo=datetime.timezone.utc)
+    assert certificate['sans'] == []
+
+
+def test_unparsable_certificate_is_cached_by_fingerprint(packet):
+    der = packet('tls_certificate.der')[:300]
+    inspector = TlsInspector()
+    certificate = inspector._certificate(der)
+    assert certificate == {'fingerprint': hashlib.sha256(der).hexdigest()}
+    assert inspector._certificate(der) is certificate
+
+
+def test_certificate_cache_is_bounded(packet):
+    inspector = TlsInspector(max_certificates=1)
+    first = inspector._certificate(packet('tls_certificate.der'))
+    assert inspector._certificate(packet('tls_certificate.der')) is first
+    inspector._certificate(packet('tls_certificate_no_extensions.der'))
+    assert len(inspector.certificates) == 1
+    assert inspector._certificate(packet('tls_certificate.der')) is not first
+
+
+def test_banner(packet):
+    info = {'version': 'TLSv1.3', 'cipher': 'TLS_AES_256_GCM_SHA384', 'resumed': False,
+            'certificate': parse_certificate(packet('tls_certificate.der'))}
+    assert format_tls_info(info) == (
+        'TLS (TLSv1.3, TLS_AES_256_GCM_SHA384) | CN: scanner.example.test'
+        ' | SAN: scanner.example.test, www.example.test, 192.0.2.10 | Issuer: Example Corp'
+        ' | Expires: 2036-10-15 | SHA256: f70b2e75bfee31aa'
+    )
+
+
+def _tls_server(accepted):
+    """인증서를 보내는 TLS 서버 (받은 연결 수를 accepted에 기록)"""
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(os.path.join(FIXTURES, 'tls_server.pem'))
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(4)
+
+    def serve():
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except OSError:
+                return
+            accepted.append(conn)
+            try:
+                with context.wrap_socket(conn, server_side=True) as tls:
+                    tls.recv(1)
+            except (OSError, ssl.SSLError):
+                pass
+
+    threading.Thread(target=serve, daemon=True).start()
+    return listener
+
+
+def test_tls_probe_handshakes_on_the_open_connection():
+    """TLS_PORTS가 아닌 포트에서 TLS 프로브가 맞으면 같은 연결에서 인증서까지 확인 (추가 연결 없음)"""
+    accepted = []
+    listener = _tls_server(accepted)
+    port = listener.getsockname()[1]
+    probes = [spec for spec in DEFAULT_PROBES if spec['name'] in ('NULL', 'TLSSessionReq')]
+    detector = ServiceDetector(probe_db=ProbeDatabase(probes=probes))
+    try:
+        banner = detector.get_banner('127.0.0.1', port, timeout=2)
+    finally:
+        listener.close()
+    assert banner.startswith('TLS (TLS') and 'CN: localhost' in banner
+    assert len(accepted) == 1
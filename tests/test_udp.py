@@ -0,0 +1,130 @@
+# core/scan_types/udp.py UDP 스캔 판정과 ICMP 속도 제한 대응, core/udp_probes.py 페이로드/응답 해석
+import socket
+import threading
+
+import pytest
+
+from core.scan_types import udp
+from core.scan_types.udp import UdpScanner, _HostIcmp
+from core.udp_probes import describe_reply, payload_for
+
+
+@pytest.fixture
+def udp_server():
+    """받은 데이터그램을 기록하고 reply(data)가 돌려준 값이 있으면 응답하는 127.0.0.1 UDP 서버"""
+    servers = []
+
+    def start(reply=lambda data: None):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind(('127.0.0.1', 0))
+        sock.settimeout(0.05)
+        received = []
+        stop = threading.Event()
+
+        def run():
+            while not stop.is_set():
+                try:
+                    data, address = sock.recvfrom(2048)
+                except socket.timeout:
+                    continue
+                received.append(data)
+                answer = reply(data)
+                if answer is not None:
+                    sock.sendto(answer, address)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        servers.append((sock, stop, thread))
+        return sock.getsockname()[1], received
+
+    yield start
+    for sock, stop, thread in servers:
+        stop.set()
+        thread.join()
+        sock.close()
+
+
+def _closed_port():
+    holder = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    holder.bind(('127.0.0.1', 0))
+    port = holder.getsockname()[1]
+    holder.close()
+    return port
+
+
+def test_open_closed_and_silent_ports(udp_server):
+    echo_port, _ = udp_server(lambda data: b'pong')
+    silent_port, received = udp_server()
+    closed_port = _closed_port()
+    scanner = UdpScanner(timeout=0.3, retries=0)
+    results = {port: status for _, port, status in
+               scanner.scan_batch([('127.0.0.1', port) for port in (echo_port, closed_port)])}
+    assert results == {echo_port: 'Open', closed_port: 'Closed'}
+    assert scanner.take_service('127.0.0.1', echo_port) == 'Unknown (4 bytes)'
+    assert scanner.take_service('127.0.0.1', echo_port) is None
+
+    # ICMP를 보낸 적 없는 호스트의 무응답은 재전송 없이 바로 확정
+    other = UdpScanner(timeout=0.2, retries=3)
+    assert other.scan('127.0.0.1', silent_port, None) == 'Open|Filtered'
+    assert len(received) == 1
+
+
+def test_silence_after_icmp_is_paced_and_retried(udp_server, monkeypatch):
+    """ICMP를 보내던 호스트가 조용해지면 속도 제한으로 보고 간격을 두어 재전송"""
+    monkeypatch.setattr(udp, 'MAX_PACE_INTERVAL', 0.1)
+    silent_port, received = udp_server()
+    closed_port = _closed_port()
+    scanner = UdpScanner(timeout=0.2, retries=2)
+    results = dict((port, status) for _, port, status in
+                   scanner.scan_batch([('127.0.0.1', closed_port), ('127.0.0.1', silent_port)]))
+    assert results == {closed_port: 'Closed', silent_port: 'Open|Filtered'}
+    assert len(received) == 3
+
+
+def test_host_pacing_interval():
+    host = _HostIcmp()
+    now = 100.0
+    for offset in range(4):
+        host.on_icmp(now + offset * 0.1, now)
+    # 최근 2초 동안 ICMP 4개 -> 초당 2개 -> 간격 0.5초
+    host.on_silence(now + 1, now + 0.5)
+    assert host.interval == pytest.approx(0.5)
+    # 간격을 정한 뒤 보낸 프로브의 무응답은 간격을 늘리고, ICMP는 조금씩 줄임
+    host.on_silence(now + 2, now + 1.5)
+    assert host.interval == pytest.approx(1.0)
+    host.on_icmp(now + 2.1, now + 1.6)
+    assert host.interval == pytest.approx(0.9)
+    # 간격을 정하기 전에 몰아 보낸 프로브의 결과로는 바꾸지 않음
+    host.on_silence(now + 3, now + 0.9)
+    assert host.interval == pytest.approx(0.9)
+
+
+def test_known_service_payloads():
+    assert payload_for(9999) == b''
+    ntp = payload_for(123)
+    assert len(ntp) == 48 and ntp[0] == 0xe3
+    # 트랜잭션 ID가 매번 달라짐
+    assert len({payload_for(53)[:2] for _ in range(8)}) > 1
+    assert payload_for(1900).startswith(b'M-SEARCH * HTTP/1.1\r\n')
+
+
+def test_reply_descriptions():
+    reply = bytearray(48)
+    reply[0] = (4 << 3) | 4
+    reply[1] = 1
+    reply[12:16] = b'GPS\x00'
+    assert describe_reply(123, bytes(reply)) == 'NTP (v4, stratum 1, refid GPS)'
+    assert describe_reply(1900, b'HTTP/1.1 200 OK\r\nSERVER: Linux UPnP/1.0 miniupnpd/2.1\r\n\r\n') == \
+        'SSDP (Linux UPnP/1.0 miniupnpd/2.1)'
+    text = b'Linux router 5.10'
+    snmp = b'\x30\x20' + b'\x06\x08' + bytes.fromhex('2b06010201010100') + b'\x04' + bytes([len(text)]) + text
+    assert describe_reply(161, snmp) == 'SNMP (sysDescr: Linux router 5.10)'
+    assert describe_reply(137, b'\x00' * 10) == 'NetBIOS'
+    assert describe_reply(40000, b'abc') == 'Unknown (3 bytes)'
+
+
+def test_netbios_name_table():
+    names = [(b'FILESERVER', 0x00, 0x04), (b'WORKGROUP', 0x00, 0x84)]
+    body = bytes([len(names)]) + b''.join(name.ljust(15) + bytes([suffix, flags, 0]) for name, suffix, flags in names)
+    data = b'\x00' * 56 + body
+    assert describe_reply(137, data) == 'NetBIOS (Name: FILESERVER, Workgroup: WORKGROUP)'